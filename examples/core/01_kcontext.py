@@ -21,7 +21,7 @@ def main():
         print(f"Retrieved {retrieved.name}: {retrieved}")
 
     # 4. Check all symbols
-    print(f"All symbols in context: {list(ctx._objects.keys())}")
+    print(f"All symbols in context: {[obj.name for obj in ctx.local_objects()]}")
 
 if __name__ == "__main__":
     main()
@@ -12,7 +12,7 @@ def main():
     print(f"Code: {code}")
     
     ctx = KContext()
-    tokens = [t for t in ktokenize(code) if t.token_type.name != "WHITESPACE"]
+    tokens = ktokenize(code)
     ast_program = kparse(tokens)
     
     # In Kira, AstProgram usually contains statements. 
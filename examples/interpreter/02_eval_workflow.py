@@ -14,7 +14,7 @@ workflow calculate_total(price, tax) -> total:
     print(f"Defining workflow:\n{code}")
     
     ctx = KContext()
-    tokens = [t for t in ktokenize(code) if t.token_type.name != "WHITESPACE"]
+    tokens = ktokenize(code)
     ast_program = kparse(tokens)
     
     print("\nWorkflow parsed into AST.")
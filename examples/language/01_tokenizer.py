@@ -8,8 +8,7 @@ def main():
     print(f"\nTokenizing: '{expr1}'")
     tokens1 = ktokenize(expr1)
     for t in tokens1:
-        # Skip whitespace for cleaner output if desired, but here we show all
-        print(f"  {t.token_type.name:20} : '{t.sym_str}'")
+        print(f"  {t.token_type.name:20} : '{t.sym_str}' (line {t.line}, column {t.column})")
 
     # Example 2: Workflow definition
     expr2 = """
@@ -19,9 +18,7 @@ def main():
     """
     print(f"\nTokenizing workflow...")
     tokens2 = ktokenize(expr2)
-    # Filter out whitespace for a more readable summary
-    filtered_tokens = [t for t in tokens2 if t.token_type.name != "WHITESPACE"]
-    for t in filtered_tokens:
+    for t in tokens2:
          print(f"  {t.token_type.name:20} : '{t.sym_str}'")
 
 if __name__ == "__main__":
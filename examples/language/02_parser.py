@@ -27,11 +27,6 @@ def main():
     print(f"Parsing: {code}")
     
     tokens = ktokenize(code)
-    # Filter WHITESPACE if the parser expects it, though kparse usually handles tokens as they come
-    # Looking at kparse, it doesn't explicitly skip whitespace, let's see if it's needed.
-    # Actually, kparse in kast.py uses stream.current which might be WHITESPACE.
-    # Most hand-written parsers for Kira skip whitespace during tokenization or in the stream.
-    tokens = [t for t in tokens if t.token_type.name != "WHITESPACE"]
     
     ast = kparse(tokens)
     print("\nGenerated AST Structure:")
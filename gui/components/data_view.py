@@ -55,7 +55,8 @@ def get_icon_for_dtype(dtype) -> QIcon:
         icon_name = "number.svg"
     elif pd.api.types.is_datetime64_any_dtype(dtype) or "datetime" in str(dtype):
         icon_name = "calendar.svg"
-    elif pd.api.types.is_string_dtype(dtype) or dtype == "object" or str(dtype) == "string":
+    elif pd.api.types.is_string_dtype(dtype) or dtype == "object" or str(dtype) == "string" \
+            or isinstance(dtype, pd.CategoricalDtype):
         icon_name = "type.svg"
     
     # Use a subtle neutral color for header icons
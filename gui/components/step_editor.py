@@ -180,22 +180,8 @@ def decompose_variable_code(code: str) -> Tuple[str, str, List[str]]:
     steps : list[str]
         Remaining pipe-step strings (e.g. ``["head(10)", "select([\"R\"])"]``).
     """
-    from kira.klanguage.ktokenizer import ktokenize, KTokenType
-
-    tokens = ktokenize(code)
-    # Strip whitespace tokens for analysis but keep positions in source
-    meaningful = [(t, i) for i, t in enumerate(tokens) if t.token_type != KTokenType.WHITESPACE]
-
     # --- Find assignment '=' ---
-    assign_char_pos = None
-    for t, _ in meaningful:
-        if t.token_type == KTokenType.ASSIGN:
-            # Find position in original code string
-            # We'll locate by scanning the code for '=' that's not '=='
-            break
-
-    # Simpler: find first '=' that is ASSIGN (not '==') by re-scanning code
-    # We'll use a character-offset approach instead
+    # Find first '=' that is ASSIGN (not '==') with a character-offset scan of the code
     assign_idx = _find_assign_offset(code)
     if assign_idx is None:
         # No assignment — treat entire code as source
@@ -882,6 +868,8 @@ class StepEditorPanel(QWidget):
         self._steps: List[PipelineStep] = []
         self._cards: List[ExpressionCard] = []
         self._committing = False
+        # Parse of the last committed pipeline, the next commit only reparses the edited steps
+        self._last_parse = None
         self._context_state: dict = {}
         self._func_model = QStandardItemModel()
         self._mixed_model = QStandardItemModel()
@@ -1200,21 +1188,22 @@ class StepEditorPanel(QWidget):
                 if expr:
                     code += f" |> {expr}"
 
-            # Validate
-            from kira.klanguage.ktokenizer import ktokenize, KTokenType
-            from kira.klanguage.kast import kparse
+            # Validate, reusing the steps that did not change since the last commit
+            from kira.klanguage.kincremental import kparse_pipeline
 
-            tokens = ktokenize(code)
-            clean = [t for t in tokens if t.token_type != KTokenType.WHITESPACE]
             try:
-                ast = kparse(clean)
+                parse, diff = kparse_pipeline(code, self._last_parse)
             except SyntaxError as e:
                 logger.warning(f"Parse error — not committing: {e} - code: {code}")
                 return
 
-            from kproject.kevent import KEventTypes
-            self.project.process_event(KEventTypes.AddVariable, self.variable_name, code)
-            logger.info(f"Committed: {code}")
+            if diff.is_empty:
+                logger.debug(f"Unchanged, not committing: {code}")
+            else:
+                from kproject.kevent import KEventTypes
+                self.project.process_event(KEventTypes.AddVariable, self.variable_name, code)
+                self._last_parse = parse
+                logger.info(f"Committed from step {diff.first_changed}: {code}")
 
             # Ensure trailing empty card
             has_trailing = self._steps and not self._steps[-1].raw_expression
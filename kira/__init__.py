@@ -1,26 +1,75 @@
-from kira.core.kobject import KObject, KTypeInfo
-from kira.core.kcontext import KContext
-from kira.core.ksymbol import KSymbol
-from kira.core.kprogram import KProgram
+__version__ = "0.1.0"
 
-from kira.knodes.knode import KNode, KNodeType, KNodeTypeInfo
-from kira.knodes.kfunction import KFunction
-from kira.knodes.kworkflow import KWorkflow
+import importlib
+from typing import TYPE_CHECKING
 
-from kira.kexpections.kexception import KException, KExceptionTypeInfo
-from kira.kexpections.knode_exception import KNodeException, KNodeExceptionType
-from kira.kexpections.missing_result import KMissingResult
-from kira.kexpections.kgenericexception import KGenericException
+# The public API is imported on first access (PEP 562), importing one part of Kira
+# (e.g. the tokenizer) does not load the whole package and its dependencies.
+_EXPORTS = {
+    "kira.core.kobject": ["KObject", "KTypeInfo"],
+    "kira.core.kcontext": ["KContext"],
+    "kira.core.ksymbol": ["KSymbol"],
+    "kira.core.kprogram": ["KProgram"],
+    "kira.knodes.knode": ["KNode", "KNodeType", "KNodeTypeInfo"],
+    "kira.knodes.kfunction": ["KFunction"],
+    "kira.knodes.kworkflow": ["KWorkflow"],
+    "kira.kexpections.kexception": ["KException", "KExceptionTypeInfo"],
+    "kira.kexpections.knode_exception": ["KNodeException", "KNodeExceptionType"],
+    "kira.kexpections.missing_result": ["KMissingResult"],
+    "kira.kexpections.kgenericexception": ["KGenericException"],
+    "kira.kdata.kdata": ["KData", "KDataType"],
+    "kira.kdata.kliteral": ["KLiteral", "KLiteralType", "K_INTEGER_TYPE", "K_NUMBER_TYPE", "K_STRING_TYPE", "K_BOOLEAN_TYPE", "K_DATE_TYPE", "K_DATETIME_TYPE", "KLiteralTypeInfo"],
+    "kira.kdata.ktable": ["KTable", "K_TABLE_TYPE", "KTableTypeInfo"],
+    "kira.kdata.karray": ["KArray", "K_ARRAY_TYPE", "K_ARRAY_NUMBER_TYPE", "K_ARRAY_STRING_TYPE", "K_ARRAY_BOOLEAN_TYPE", "K_ARRAY_DATE_TYPE", "K_ARRAY_INTEGER_TYPE", "K_ARRAY_DATETIME_TYPE", "KArrayTypeInfo"],
+    "kira.kdata.kcollection": ["KCollection"],
+    "kira.knodes.knode_instance": ["KNodeInstance"],
+    "kira.klanguage.ktokenizer": ["KToken", "KTokenType", "ktokenize"],
+    "kira.klanguage.kast": ["AstNode", "AstExpression", "AstLiteral", "AstSymbol", "AstCall", "AstAssignment", "AstExpressionStmt", "AstWorkflow", "AstArray", "AstProgram", "kparse", "parse_expression"],
+    "kira.klanguage.kcache": ["KParseCache", "kparse_cached"],
+    "kira.klanguage.kincremental": ["KPipelineParse", "KPipelineDiff", "kparse_pipeline"],
+    "kira.klanguage.kbuilder": ["kbuild_program", "kbuild_workflow", "kbuild_expression", "kbuild_assignment", "keval_script"],
+    "kira.klanguage.kserializer": ["kdump_program", "kload_program"],
+}
 
-from kira.kdata.kdata import KData, KDataType
-from kira.kdata.kliteral import KLiteral, KLiteralType, KLiteral, K_INTEGER_TYPE, K_NUMBER_TYPE, K_STRING_TYPE, K_BOOLEAN_TYPE, K_DATE_TYPE, K_DATETIME_TYPE, KLiteralTypeInfo
-from kira.kdata.ktable import KTable, K_TABLE_TYPE, KTableTypeInfo
-from kira.kdata.karray import KArray, K_ARRAY_TYPE, K_ARRAY_NUMBER_TYPE, K_ARRAY_STRING_TYPE, K_ARRAY_BOOLEAN_TYPE, K_ARRAY_DATE_TYPE, K_ARRAY_INTEGER_TYPE, K_ARRAY_DATETIME_TYPE, KArrayTypeInfo
-from kira.kdata.kcollection import KCollection
+_LAZY_ATTRS = {name: module for module, names in _EXPORTS.items() for name in names}
 
-from kira.knodes.knode_instance import KNodeInstance
+__all__ = list(_LAZY_ATTRS)
 
-from kira.klanguage.ktokenizer import KToken, KTokenType, ktokenize
-from kira.klanguage.kast import AstNode, AstExpression, AstLiteral, AstSymbol, AstCall, AstAssignment, AstExpressionStmt, AstWorkflow, AstArray, AstProgram, kparse
-from kira.klanguage.kbuilder import kbuild_program, kbuild_workflow, kbuild_expression, kbuild_assignment, keval_script
 
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'kira' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from kira.core.kobject import KObject, KTypeInfo
+    from kira.core.kcontext import KContext
+    from kira.core.ksymbol import KSymbol
+    from kira.core.kprogram import KProgram
+    from kira.knodes.knode import KNode, KNodeType, KNodeTypeInfo
+    from kira.knodes.kfunction import KFunction
+    from kira.knodes.kworkflow import KWorkflow
+    from kira.kexpections.kexception import KException, KExceptionTypeInfo
+    from kira.kexpections.knode_exception import KNodeException, KNodeExceptionType
+    from kira.kexpections.missing_result import KMissingResult
+    from kira.kexpections.kgenericexception import KGenericException
+    from kira.kdata.kdata import KData, KDataType
+    from kira.kdata.kliteral import KLiteral, KLiteralType, K_INTEGER_TYPE, K_NUMBER_TYPE, K_STRING_TYPE, K_BOOLEAN_TYPE, K_DATE_TYPE, K_DATETIME_TYPE, KLiteralTypeInfo
+    from kira.kdata.ktable import KTable, K_TABLE_TYPE, KTableTypeInfo
+    from kira.kdata.karray import KArray, K_ARRAY_TYPE, K_ARRAY_NUMBER_TYPE, K_ARRAY_STRING_TYPE, K_ARRAY_BOOLEAN_TYPE, K_ARRAY_DATE_TYPE, K_ARRAY_INTEGER_TYPE, K_ARRAY_DATETIME_TYPE, KArrayTypeInfo
+    from kira.kdata.kcollection import KCollection
+    from kira.knodes.knode_instance import KNodeInstance
+    from kira.klanguage.ktokenizer import KToken, KTokenType, ktokenize
+    from kira.klanguage.kast import AstNode, AstExpression, AstLiteral, AstSymbol, AstCall, AstAssignment, AstExpressionStmt, AstWorkflow, AstArray, AstProgram, kparse, parse_expression
+    from kira.klanguage.kcache import KParseCache, kparse_cached
+    from kira.klanguage.kincremental import KPipelineParse, KPipelineDiff, kparse_pipeline
+    from kira.klanguage.kbuilder import kbuild_program, kbuild_workflow, kbuild_expression, kbuild_assignment, keval_script
+    from kira.klanguage.kserializer import kdump_program, kload_program
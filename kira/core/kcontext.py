@@ -1,4 +1,7 @@
 from __future__ import annotations
+import threading
+from types import MappingProxyType
+
 from kira.core.kobject import KObject
 from kira.kexpections.kgenericexception import KGenericException
 from kira.kdata.kdata import KData
@@ -6,11 +9,20 @@ from kira.knodes.knode import KNode
 from kira.library.node_library import KLibrary
 
 class KContext:
+    __slots__ = ("_parent", "_objects")
+
     def __init__(self, parent: KContext | None = None):
         self._parent = parent
-        self._objects = {}
+        # Allocated on the first registration, most local contexts never hold anything
+        self._objects = None
+
+    @property
+    def parent(self) -> KContext | None:
+        return self._parent
 
     def register_object(self, obj: KObject):
+        if self._objects is None:
+            self._objects = {}
 
         self._objects[obj.name] = obj
 
@@ -21,18 +33,41 @@ class KContext:
 
         return self
 
+    def lookup_local(self, name: str) -> KObject | None:
+        """The object registered under `name` in this context only, None if missing."""
+        if self._objects is None:
+            return None
+        return self._objects.get(name)
+
     def get_object(self, name: str) -> KObject:
-        if name not in self._objects:
-            if self._parent is not None:
-                return self._parent.get_object(name)
+        ctx = self
+        while ctx is not None:
+            obj = ctx.lookup_local(name)
+            if obj is not None:
+                return obj
+            ctx = ctx._parent
 
-            return KData(name, None, KGenericException(f"Object '{name}' not found in context"))
+        return KData(name, None, KGenericException(f"Object '{name}' not found in context"))
 
-        return self._objects[name]
+    def local_objects(self) -> list[KObject]:
+        return list(self._objects.values()) if self._objects is not None else []
+
+    def visible_objects(self) -> list[KObject]:
+        """The objects reachable from this context, including its parents; inner definitions shadow outer ones."""
+        seen = set()
+        objs = []
+        ctx = self
+        while ctx is not None:
+            for obj in ctx.local_objects():
+                if obj.name not in seen:
+                    seen.add(obj.name)
+                    objs.append(obj)
+            ctx = ctx._parent
+        return objs
 
     def get_context_state(self) -> dict:
         state = {"node": [], "data": [], "library": []}
-        for obj in self._objects.values():
+        for obj in self.visible_objects():
             if isinstance(obj, KNode):
                 state["node"].append(obj)
             elif isinstance(obj, KData):
@@ -40,3 +75,86 @@ class KContext:
             elif isinstance(obj, KLibrary):
                 state["library"].append(obj)
         return state
+
+
+class KFrameLayout:
+    """
+    Slot assignment of the local names of a workflow, computed once when the workflow is built.
+    Symbols bound to a layout resolve to (depth, slot) instead of walking the contexts by name.
+    """
+    __slots__ = ("_slots",)
+
+    def __init__(self, names: list[str]):
+        self._slots = {}
+        for name in names:
+            self._slots.setdefault(name, len(self._slots))
+
+    def slot(self, name: str) -> int | None:
+        return self._slots.get(name)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._slots
+
+
+class KFrame(KContext):
+    """
+    The context of a single workflow call: the names of its layout are stored in a flat list.
+    The independent branches of the workflow register their results from the threads they run on.
+    """
+    __slots__ = ("_layout", "_values", "_lock")
+
+    def __init__(self, layout: KFrameLayout, parent: KContext | None = None):
+        super().__init__(parent)
+        self._layout = layout
+        self._values = [None] * len(layout)
+        self._lock = threading.Lock()
+
+    @property
+    def layout(self) -> KFrameLayout:
+        return self._layout
+
+    def register_object(self, obj: KObject):
+        slot = self._layout.slot(obj.name)
+        with self._lock:
+            if slot is None:
+                return super().register_object(obj)
+            self._values[slot] = obj
+        return self
+
+    def lookup_local(self, name: str) -> KObject | None:
+        slot = self._layout.slot(name)
+        if slot is None:
+            return super().lookup_local(name)
+        return self._values[slot]
+
+    def get_slot(self, slot: int) -> KObject | None:
+        return self._values[slot]
+
+    def local_objects(self) -> list[KObject]:
+        return [obj for obj in self._values if obj is not None] + super().local_objects()
+
+
+class KNamespace(KContext):
+    """
+    A frozen context shared by many roots, e.g. the default libraries.
+    It is built once and never modified, so it is safe to share between projects and threads.
+    """
+    __slots__ = ()
+
+    def __init__(self, objs: list[KObject], parent: KContext | None = None):
+        super().__init__(parent)
+        self._objects = MappingProxyType({obj.name: obj for obj in objs})
+
+    @classmethod
+    def from_libraries(cls, libraries: list[KLibrary]) -> KNamespace:
+        objs = []
+        for lib in libraries:
+            objs.append(lib)
+            objs.extend(lib.objects())
+        return cls(objs)
+
+    def register_object(self, obj: KObject):
+        raise TypeError(f"Cannot register '{obj.name}': the namespace is frozen")
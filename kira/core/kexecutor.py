@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+
+
+def _mark_worker():
+    _worker_state.is_worker = True
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The thread pool shared by every parallel evaluation (workflow branches, map, group_apply)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                               thread_name_prefix="kira-worker",
+                                               initializer=_mark_worker)
+    return _executor
+
+
+def in_worker() -> bool:
+    """True when running on a thread of the shared pool."""
+    return getattr(_worker_state, "is_worker", False)
+
+
+def run_parallel(tasks: Iterable[Callable[[], object]]) -> list:
+    """
+    Runs the tasks on the shared pool and returns their results in order.
+    Tasks started from a pool thread run sequentially, waiting on the pool from
+    inside the pool could starve it. Every task runs in a copy of the caller's
+    context variables (e.g. the progress scope of the evaluation).
+    """
+    tasks = list(tasks)
+    if len(tasks) <= 1 or in_worker():
+        return [task() for task in tasks]
+
+    futures = [get_executor().submit(contextvars.copy_context().run, task) for task in tasks]
+    return [future.result() for future in futures]
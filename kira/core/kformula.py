@@ -1,16 +1,33 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from kira.core.kcontext import KContext
 from kira.core.kobject import KObject, KTypeInfo
+from kira.kdata.kdata import KData, KDataValue
+from kira.ktypeinfo.union_type import KUnionTypeInfo
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from kira.kdata.kliteral import KLiteral
+    from kira.kdata.ktable import KTable
+
+# Comparison nodes by the operator they apply, and the operator to use when the operands are swapped
+COMPARISONS = {
+    "==": "==", "equals": "==", "!=": "!=", "not_equals": "!=",
+    ">": ">", "greater": ">", "<": "<", "less": "<",
+    ">=": ">=", "greater_equal": ">=", "<=": "<=", "less_equal": "<=",
+}
+MIRRORED = {"==": "==", "!=": "!=", ">": "<", "<": ">", ">=": "<=", "<=": ">="}
 
 
 class KFormula(KObject):
     """
     KFormula wraps an unevaluated expression.
-    When a formula is evaluated during node input resolution, it immediately 
+    When a formula is evaluated during node input resolution, it immediately
     evaluates its inner expression using the provided context.
-    
-    This allows pipelines to pass deferred logic where 
+
+    This allows pipelines to pass deferred logic where
     dependencies are resolved locally.
     """
     def __init__(self, name: str, obj: KObject):
@@ -18,9 +35,169 @@ class KFormula(KObject):
         self._obj = obj
         print(f"KFormula: {name} initialized with {obj}")
 
+    @property
+    def expression(self) -> KObject:
+        return self._obj
+
     @property
     def type(self) -> KTypeInfo:
         return self._obj.type
 
+    @property
+    def referenced_symbols(self) -> set[str]:
+        return self._obj.referenced_symbols
+
     def eval(self, context: KContext) -> KObject:
         return self._obj.eval(context)
+
+
+class KFormulaContext(KContext):
+    """
+    Context in which formulas are evaluated.
+    The columns of the bound tables are resolved on first lookup, so a formula only
+    pays for the columns it references. Tables bound later shadow earlier ones.
+    """
+    __slots__ = ("_tables",)
+
+    def __init__(self, parent: KContext | None = None):
+        super().__init__(parent)
+        self._tables: list[KTable] = []
+
+    def bind_table(self, table: KTable):
+        self._tables.append(table)
+        return self
+
+    def lookup_local(self, name: str) -> KObject | None:
+        obj = super().lookup_local(name)
+        if obj is None:
+            for table in reversed(self._tables):
+                if table.has_column(name):
+                    from kira.kdata.karray import KArray
+
+                    # Positional like the arrays formulas are combined with, no copy under CoW
+                    column = table.column(name).reset_index(drop=True)
+                    obj = KData(name, KArray(column))
+                    self.register_object(obj)
+                    break
+        return obj
+
+
+class KFormulaTypeInfo(KTypeInfo):
+    """
+    Marks a node input that accepts a deferred formula.
+
+    When a `$...$` argument is bound to such an input, KNodeInstance does not
+    evaluate it: the node receives a KFormulaValue and decides itself when and
+    against which table the formula is evaluated (e.g. `filter` on a lazy table).
+    """
+
+    def match(self, value: KObject) -> bool:
+        return isinstance(value, KData) and bool(value) and isinstance(value.value, KFormulaValue)
+
+    def __repr__(self) -> str:
+        return "KFormulaTypeInfo()"
+
+
+K_FORMULA_TYPE = KFormulaTypeInfo()
+
+
+def accepts_formula(type_info: KTypeInfo) -> bool:
+    """True if a node input declared with `type_info` takes formulas unevaluated."""
+    if isinstance(type_info, KFormulaTypeInfo):
+        return True
+    if isinstance(type_info, KUnionTypeInfo):
+        return any(accepts_formula(t) for t in type_info.types)
+    return False
+
+
+class KFormulaValue(KDataValue):
+    """
+    A formula captured together with the context it was written in.
+    Table columns are bound as local symbols when it is evaluated against a DataFrame.
+    """
+
+    def __init__(self, formula: KFormula, context: KContext):
+        self._formula = formula
+        self._context = context
+
+    @property
+    def value(self) -> KFormula:
+        return self._formula
+
+    @property
+    def symbols(self) -> set[str]:
+        return self._formula.referenced_symbols
+
+    def evaluate(self, table: KTable | pd.DataFrame | None = None) -> KData:
+        from kira.kdata.ktable import KTable
+
+        ctx = KFormulaContext(self._context)
+        if table is not None:
+            ctx.bind_table(table if isinstance(table, KTable) else KTable(table))
+        return self._formula.eval(ctx)
+
+    def is_row_local(self, columns: list[str]) -> bool:
+        """
+        True if the formula only combines the `columns` of a row with scalars through element-wise
+        nodes, so evaluating it on a slice of the rows gives the same result as on the whole table.
+        """
+        return self._is_row_local(self._formula.expression, set(columns))
+
+    def _is_row_local(self, obj: KObject, columns: set[str]) -> bool:
+        from kira.core.ksymbol import KSymbol
+        from kira.kdata.kliteral import KLiteral
+        from kira.knodes.knode import KNode
+        from kira.knodes.knode_instance import KNodeInstance
+
+        if isinstance(obj, KData):
+            return isinstance(obj.value, KLiteral)
+        if isinstance(obj, KSymbol):
+            if obj.name in columns:
+                return True
+            outer = self._context.get_object(obj.name)
+            return isinstance(outer, KData) and isinstance(outer.value, KLiteral)
+        if isinstance(obj, KNodeInstance):
+            node = self._context.get_object(obj.target_name)
+            return isinstance(node, KNode) and node.is_vectorizable(self._context) and \
+                all(self._is_row_local(node_input, columns) for node_input in obj.node_inputs)
+        return False
+
+    def comparisons(self) -> tuple[list[tuple[str, str, KLiteral]], bool]:
+        """
+        The `symbol <op> literal` terms joined by `and` at the top of the formula, as (symbol, op, literal)
+        with the symbol on the left (e.g. `price > 10 and 2 < qty` gives price > 10 and qty > 2).
+        The flag is True if the formula is made of these terms only.
+        """
+        return self._comparisons(self._formula.expression)
+
+    def _comparisons(self, obj: KObject) -> tuple[list[tuple[str, str, KLiteral]], bool]:
+        from kira.core.ksymbol import KSymbol
+        from kira.kdata.kliteral import KLiteral
+        from kira.knodes.knode_instance import KNodeInstance
+
+        if not isinstance(obj, KNodeInstance):
+            return [], False
+        if obj.target_name == "and":
+            terms, complete = [], True
+            for node_input in obj.node_inputs:
+                input_terms, input_complete = self._comparisons(node_input)
+                terms.extend(input_terms)
+                complete = complete and input_complete
+            return terms, complete
+        if obj.target_name not in COMPARISONS or len(obj.node_inputs) != 2:
+            return [], False
+
+        op = COMPARISONS[obj.target_name]
+        left, right = obj.node_inputs
+        if isinstance(left, KData) and isinstance(right, KSymbol):
+            left, right, op = right, left, MIRRORED[op]
+        if not (isinstance(left, KSymbol) and isinstance(right, KData) and isinstance(right.value, KLiteral)):
+            return [], False
+        return [(left.name, op, right.value)], True
+
+    @property
+    def type(self) -> KTypeInfo:
+        return K_FORMULA_TYPE
+
+    def __repr__(self):
+        return f"KFormulaValue({self._formula.name})"
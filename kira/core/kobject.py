@@ -42,6 +42,11 @@ class KObject(ABC):
     def name(self):
         return self.__name
 
+    @property
+    def referenced_symbols(self) -> set[str]:
+        """Names of the symbols this object reads from the context when evaluated."""
+        return set()
+
     def __hash__(self):
         return hash(self.__name)
 
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Receives the completed fraction (0 to 1) of the long running operation of the current evaluation
+_progress_callback: ContextVar[Callable[[float], None] | None] = ContextVar("kira_progress_callback", default=None)
+
+
+@contextmanager
+def progress_scope(callback: Callable[[float], None]):
+    """Routes the progress reported while the block runs (in this thread or in tasks started from it) to `callback`."""
+    token = _progress_callback.set(callback)
+    try:
+        yield
+    finally:
+        _progress_callback.reset(token)
+
+
+def report_progress(fraction: float):
+    """Reports the progress of the current operation, a no-op outside a progress scope."""
+    callback = _progress_callback.get()
+    if callback is not None:
+        callback(min(max(fraction, 0.0), 1.0))
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from kira.core.kcontext import KContext
+from kira.core.kcontext import KContext, KFrame, KFrameLayout
 from kira.core.kobject import KObject, KTypeInfo
 from kira.ktypeinfo.no_type import KNoTypeInfo
 
@@ -9,10 +9,31 @@ class KSymbol(KObject):
 
     def __init__(self, name: str):
         super().__init__(name)
+        self._binding: tuple[KFrameLayout, int, int] | None = None
+
+    def bind(self, layout: KFrameLayout, depth: int, slot: int):
+        """Resolve this symbol to `slot` of the frame `depth` contexts above the one it is evaluated in."""
+        self._binding = (layout, depth, slot)
 
     def eval(self, ctx: KContext) -> KObject:
+        if self._binding is not None:
+            layout, depth, slot = self._binding
+            frame = ctx
+            for _ in range(depth):
+                if frame is None:
+                    break
+                frame = frame.parent
+            if isinstance(frame, KFrame) and frame.layout is layout:
+                obj = frame.get_slot(slot)
+                if obj is not None:
+                    return obj
+        # Unbound, or not assigned yet in this frame: resolve by name
         return ctx.get_object(self.name)
 
+    @property
+    def referenced_symbols(self) -> set[str]:
+        return {self.name}
+
     @property
     def type(self) -> KTypeInfo:
         return KNoTypeInfo()
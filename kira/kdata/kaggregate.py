@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.api.types as ptypes
+
+from kira.core.kexecutor import run_parallel
+
+# Tables longer than this are aggregated in one partition per core
+AGGREGATE_PARALLEL_ROWS = 1_000_000
+
+# Aggregations computed natively over the groups of a table, by their Kira name
+AGGREGATIONS = ("sum", "mean", "min", "max", "count", "median", "std", "var", "first", "last", "nunique")
+# Aggregations computed natively over a rolling window
+ROLLING_AGGREGATIONS = ("sum", "mean", "min", "max", "count", "median", "std", "var")
+# Rolling aggregations of an integer column that are integers
+_INTEGER_ROLLING = ("sum", "min", "max")
+
+# Aggregations whose partial results per partition can be combined, and how
+_COMBINE = {"sum": "sum", "count": "sum", "min": "min", "max": "max", "first": "first", "last": "last"}
+# What each aggregation is computed from on a partition (mean: its sum and count)
+_PARTIALS = {"mean": ("sum", "count")}
+
+
+def result_name(column: str, function: str) -> str:
+    """The name of the column holding `function` of `column`, e.g. price_mean."""
+    return f"{column}_{function}"
+
+
+def _partitions(n: int) -> list[tuple[int, int]]:
+    parts = min(os.cpu_count() or 1, -(-n // AGGREGATE_PARALLEL_ROWS)) if n > AGGREGATE_PARALLEL_ROWS else 1
+    bounds = np.linspace(0, n, parts + 1).astype(np.int64)
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def _groupby(df: pd.DataFrame | pd.Series, by, sort: bool):
+    # Missing keys form a group of their own, dictionary-encoded keys only give the groups present
+    return df.groupby(by, sort=sort, dropna=False, observed=True)
+
+
+def group_rows(df: pd.DataFrame, by: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The rows of every group, in the order of `aggregate`: returns (order, bounds), the rows of
+    group i are order[bounds[i]:bounds[i + 1]] (in table order).
+    """
+    codes = _groupby(df, by, sort=True).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(codes[order])) + 1, [len(order)]])
+    return order, bounds
+
+
+def aggregate(df: pd.DataFrame, by: list[str], aggregations: list[tuple[str, str]]) -> pd.DataFrame:
+    """
+    One row per distinct key of the `by` columns (sorted, missing keys last) with the `by` columns and
+    the (column, function) `aggregations`, see AGGREGATIONS and result_name.
+
+    The rows are grouped once for all the aggregations. Long tables are split in partitions aggregated
+    in parallel on the shared pool when every aggregation can be combined from partial results.
+    """
+    partitions = _partitions(len(df))
+    if len(partitions) > 1 and all(f in _COMBINE or f in _PARTIALS for _, f in aggregations):
+        return _aggregate_partitions(df, by, aggregations, partitions)
+
+    named = {result_name(c, f): (c, f) for c, f in aggregations}
+    return _groupby(df, by, sort=True).agg(**named).reset_index()
+
+
+def _aggregate_partitions(df: pd.DataFrame, by: list[str], aggregations: list[tuple[str, str]],
+                          partitions: list[tuple[int, int]]) -> pd.DataFrame:
+    partials = {}
+    for column, function in aggregations:
+        for partial in _PARTIALS.get(function, (function,)):
+            partials[result_name(column, partial)] = (column, partial)
+
+    def task(lo, hi):
+        return _groupby(df.iloc[lo:hi], by, sort=False).agg(**partials)
+
+    parts = run_parallel([lambda lo=lo, hi=hi: task(lo, hi) for lo, hi in partitions])
+    combined = pd.concat(parts).groupby(level=list(range(len(by))), sort=True, dropna=False, observed=True) \
+        .agg(**{name: (name, _COMBINE[partial]) for name, (_, partial) in partials.items()})
+
+    columns = {}
+    for column, function in aggregations:
+        if function == "mean":
+            columns[result_name(column, function)] = \
+                combined[result_name(column, "sum")] / combined[result_name(column, "count")]
+        else:
+            columns[result_name(column, function)] = combined[result_name(column, function)]
+    result = pd.DataFrame(columns, index=combined.index).reset_index()
+    result.columns = list(by) + list(columns)
+    return result
+
+
+def rolling(df: pd.DataFrame, window: int, aggregations: list[tuple[str, str]]) -> pd.DataFrame:
+    """
+    The table with one more column per (column, function) of `aggregations`: the function over the
+    last `window` rows, missing until the window is full or when it holds a missing value.
+    Long columns are computed in parallel partitions that overlap by window - 1 rows.
+    """
+    values = {column: df[column].to_numpy(dtype=np.float64, na_value=np.nan) for column, _ in aggregations}
+    partitions = _partitions(len(df))
+
+    def task(column, function, lo, hi):
+        start = max(0, lo - window + 1)
+        out = pd.Series(values[column][start:hi]).rolling(window).agg(function).to_numpy()
+        return out[lo - start:]
+
+    results = run_parallel([lambda c=c, f=f, lo=lo, hi=hi: task(c, f, lo, hi)
+                            for c, f in aggregations for lo, hi in partitions])
+    columns = {}
+    for i, (column, function) in enumerate(aggregations):
+        out = np.concatenate(results[i * len(partitions):(i + 1) * len(partitions)])
+        series = pd.Series(pd.array(out, dtype="Float64"), index=df.index)
+        if function == "count" or (function in _INTEGER_ROLLING and ptypes.is_integer_dtype(df[column].dtype)):
+            series = series.astype("Int64")
+        columns[result_name(column, function)] = series
+    return df.assign(**columns)
+
+
+def is_rolling_column(series: pd.Series) -> bool:
+    """True if a rolling window can be computed over the column (numbers and booleans)."""
+    return ptypes.is_numeric_dtype(series.dtype) or ptypes.is_bool_dtype(series.dtype)
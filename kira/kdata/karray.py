@@ -48,14 +48,146 @@ K_ARRAY_BOOLEAN_TYPE = KArrayTypeInfo(KLiteralTypeInfo(KLiteralType.BOOLEAN))
 K_ARRAY_DATE_TYPE = KArrayTypeInfo(KLiteralTypeInfo(KLiteralType.DATE))
 K_ARRAY_DATETIME_TYPE = KArrayTypeInfo(KLiteralTypeInfo(KLiteralType.DATETIME))
 
+# Kira's canonical pandas dtypes, a Series already in one of them is stored as is
+_CANONICAL_TYPES = {
+    "Int64": KLiteralType.INTEGER,
+    "Float64": KLiteralType.NUMBER,
+    "boolean": KLiteralType.BOOLEAN,
+    "string": KLiteralType.STRING,
+}
+
+# Date and datetime arrays are datetime64 Series whose unit tells them apart, as the unit of a
+# datetime64 literal does: dates are midnights in seconds, datetimes use a finer unit (microseconds
+# when Kira converts them). The type is read from the dtype, the values are only scanned when a Series
+# in seconds is given without a type: it may come from outside Kira, with times of day (see has_times).
+DATE_UNIT = "s"
+DATETIME_UNIT = "us"
+
+# String columns with at most this share of distinct values are dictionary-encoded when loaded
+DICTIONARY_MAX_RATIO = 0.5
+# Shorter columns are not worth encoding
+DICTIONARY_MIN_LENGTH = 1024
+
+# NumPy dtype kind -> element type of the arrays backed by a plain buffer
+_BUFFER_KINDS = {
+    "b": KLiteralType.BOOLEAN,
+    "i": KLiteralType.INTEGER,
+    "u": KLiteralType.INTEGER,
+    "f": KLiteralType.NUMBER,
+}
+
+
+def is_dictionary_strings(dtype) -> bool:
+    """True for dictionary-encoded strings: a categorical dtype whose categories are strings."""
+    return isinstance(dtype, pd.CategoricalDtype) and \
+        (ptypes.is_string_dtype(dtype.categories.dtype) or dtype.categories.inferred_type in ("string", "empty"))
+
+
+def is_string_dtype(dtype) -> bool:
+    """True for the dtypes of string arrays, plain or dictionary-encoded."""
+    return ptypes.is_string_dtype(dtype) or is_dictionary_strings(dtype)
+
+
+def to_canonical_strings(data: pd.Series) -> pd.Series:
+    """Converts to the `string` dtype, dictionary-encoded strings stay encoded (with `string` categories)."""
+    if is_dictionary_strings(data.dtype):
+        if str(data.cat.categories.dtype) == "string":
+            return data
+        return data.cat.rename_categories(data.cat.categories.astype("string"))
+    return data.astype("string")
+
+
+def dictionary_encode(data: pd.Series) -> pd.Series:
+    """
+    Dictionary-encodes a string column with few distinct values (see DICTIONARY_MAX_RATIO): every cell
+    becomes a small integer code into the sorted distinct values, instead of one Python object per cell.
+    """
+    if len(data) < DICTIONARY_MIN_LENGTH or is_dictionary_strings(data.dtype) or not ptypes.is_string_dtype(data.dtype):
+        return data
+    codes, categories = pd.factorize(data, sort=True)
+    if len(categories) > DICTIONARY_MAX_RATIO * len(data):
+        return data
+    dtype = pd.CategoricalDtype(pd.Index(categories, dtype="string"))
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=data.index, name=data.name)
+
+
+def datetime_type(dtype) -> KLiteralType:
+    """DATE or DATETIME for a datetime64 dtype, from its unit (see DATE_UNIT)."""
+    return KLiteralType.DATE if np.datetime_data(np.dtype(getattr(dtype, "base", dtype)))[0] == DATE_UNIT \
+        else KLiteralType.DATETIME
+
+
+def has_times(data: pd.Series) -> bool:
+    """True if a datetime Series has a value that is not a midnight."""
+    non_null = data.dropna()
+    return bool((non_null != non_null.dt.normalize()).any())
+
+
+def to_canonical_dates(data: pd.Series, lit_type: KLiteralType) -> pd.Series:
+    """
+    Converts datetimes to the canonical DATE or DATETIME array (see DATE_UNIT). Dates are normalized
+    to midnight unless they already are dates, datetimes in seconds are converted to microseconds.
+    """
+    if not ptypes.is_datetime64_any_dtype(data.dtype):
+        data = pd.to_datetime(data)
+    is_date_unit = datetime_type(data.dtype) == KLiteralType.DATE
+    if lit_type == KLiteralType.DATE:
+        return data if is_date_unit else data.dt.normalize().dt.as_unit(DATE_UNIT)
+    return data.dt.as_unit(DATETIME_UNIT) if is_date_unit else data
+
+
 class KArray(KDataValue):
+    """
+    An array of literals of one type, stored as a pandas Series in Kira's canonical dtypes.
+
+    Numeric and boolean arrays can also be backed by a plain NumPy buffer with an optional validity
+    mask (`from_numpy`, `buffer`): element-wise functions compute on the buffer directly and the
+    Series is only built (without copying the buffer) when `value` is read.
+
+    String arrays are either `string` Series or dictionary-encoded (categorical with `string`
+    categories, see dictionary_encode); both are STRING arrays and pandas keeps the encoding
+    through filters, slices and sorts.
+    """
     def __init__(self, data, lit_type: KLiteralType = None):
+        self._buffer = None
+
+        if isinstance(data, pd.Series) and is_dictionary_strings(data.dtype):
+            data = to_canonical_strings(data)
+            if lit_type is not None and lit_type not in (KLiteralType.ANY, KLiteralType.STRING):
+                raise ValueError(
+                    f"Invalid array type: {lit_type} for KArray, suggested type: {KLiteralType.STRING}")
+            self._type = KLiteralType.STRING
+            self._data = data
+            return
+
+        if isinstance(data, np.ndarray) and data.dtype.kind == "M":
+            # As for literals: datetime64 values in days are dates
+            data = pd.Series(data).dt.as_unit(DATE_UNIT if np.datetime_data(data.dtype)[0] == "D" else DATETIME_UNIT)
+
+        if isinstance(data, pd.Series) and ptypes.is_datetime64_any_dtype(data.dtype):
+            # Dates and datetimes convert into each other, the type comes from the dtype otherwise
+            if lit_type is not None and lit_type not in (KLiteralType.ANY, KLiteralType.DATE, KLiteralType.DATETIME):
+                raise ValueError(
+                    f"Invalid array type: {lit_type} for KArray, suggested type: {datetime_type(data.dtype)}")
+            self._type = lit_type if lit_type in (KLiteralType.DATE, KLiteralType.DATETIME) else self.infer_type(data)
+            self._data = to_canonical_dates(data, self._type)
+            return
+
+        if isinstance(data, pd.Series) and str(data.dtype) in _CANONICAL_TYPES:
+            # Already canonical (e.g. produced by another node): no inference, validation or cast
+            self._type = _CANONICAL_TYPES[str(data.dtype)]
+            if lit_type is not None and lit_type != KLiteralType.ANY and lit_type != self._type:
+                raise ValueError(
+                    f"Invalid array type: {lit_type} for KArray, suggested type: {self._type}")
+            self._data = data
+            return
+
         if not isinstance(data, pd.Series):
             data = pd.Series(data)
 
         inferred_type = self.infer_type(data)
 
-        if lit_type is not None and not self.validate_type(data, lit_type):
+        if lit_type is not None and lit_type != KLiteralType.ANY and lit_type != inferred_type:
             raise ValueError(
                 f"Invalid array type: {lit_type} for KArray, suggested type: {inferred_type}")
 
@@ -69,18 +201,43 @@ class KArray(KDataValue):
         elif self._type == KLiteralType.NUMBER:
             self._data = data.astype("Float64")
         elif self._type == KLiteralType.STRING:
-            self._data = data.astype("string")
-        elif self._type == KLiteralType.DATETIME:
-            self._data = pd.to_datetime(data)
-        elif self._type == KLiteralType.DATE:
-            # Pandas does not have a native "Date-only" Series type, datetimes are used.
-            # We normalize to datetime, normalizing the time component.
-            self._data = pd.to_datetime(data).dt.normalize()
+            self._data = to_canonical_strings(data)
+        elif self._type in (KLiteralType.DATE, KLiteralType.DATETIME):
+            # Pandas does not have a native "Date-only" Series type, see DATE_UNIT
+            self._data = to_canonical_dates(data, self._type)
         else:
             self._data = data
 
+    @classmethod
+    def from_numpy(cls, values: np.ndarray, mask: np.ndarray | None = None, index: pd.Index | None = None) -> "KArray":
+        """
+        An array backed by `values` (bool, integer or float) without copying it. `mask` marks the
+        missing elements (None if there are none), `index` labels the elements of `value`.
+        """
+        lit_type = _BUFFER_KINDS.get(values.dtype.kind)
+        if lit_type is None or values.ndim != 1:
+            return cls(pd.Series(values, index=index))
+
+        if lit_type == KLiteralType.INTEGER and values.dtype != np.int64:
+            values = values.astype(np.int64)
+        elif lit_type == KLiteralType.NUMBER and values.dtype != np.float64:
+            values = values.astype(np.float64)
+
+        if lit_type == KLiteralType.NUMBER:
+            # NaN is a missing number in Kira, as when a float Series is cast to Float64
+            nan = np.isnan(values)
+            mask = nan if mask is None else mask | nan
+
+        arr = cls.__new__(cls)
+        arr._type = lit_type
+        arr._data = None
+        arr._buffer = (values, mask if mask is not None and mask.any() else None, index)
+        return arr
+
     @staticmethod
     def infer_type(data: pd.Series) -> KLiteralType:
+        if is_dictionary_strings(data.dtype):
+            return KLiteralType.STRING
         if ptypes.is_bool_dtype(data.dtype):
             return KLiteralType.BOOLEAN
         if ptypes.is_integer_dtype(data.dtype):
@@ -88,12 +245,9 @@ class KArray(KDataValue):
         if ptypes.is_float_dtype(data.dtype) or ptypes.is_numeric_dtype(data.dtype):
             return KLiteralType.NUMBER
         if ptypes.is_datetime64_any_dtype(data.dtype):
-            # Distinguish DATE vs DATETIME heuristically if needed, or default to DATETIME
-            # For simplicity, if all times are midnight we could call it DATE,
-            # but usually type is explicit or defaults to DATETIME.
-            if hasattr(data.dt, "time") and (data.dropna().dt.time == pd.Timestamp("00:00:00").time()).all() and len(data.dropna()) > 0:
-                return KLiteralType.DATE
-            return KLiteralType.DATETIME
+            lit_type = datetime_type(data.dtype)
+            # Seconds with times of day are datetimes that were not made by Kira
+            return KLiteralType.DATETIME if lit_type == KLiteralType.DATE and has_times(data) else lit_type
         if ptypes.is_object_dtype(data.dtype):
             # Check if elements are KDataValue objects (e.g. KCollection, KErrorValue)
             if len(data) > 0:
@@ -114,8 +268,35 @@ class KArray(KDataValue):
 
     @property
     def value(self) -> pd.Series:
+        if self._data is None:
+            values, mask, index = self._buffer
+            if mask is None:
+                mask = np.zeros(len(values), dtype=bool)
+            if self._type == KLiteralType.BOOLEAN:
+                array = pd.arrays.BooleanArray(values, mask)
+            elif self._type == KLiteralType.INTEGER:
+                array = pd.arrays.IntegerArray(values, mask)
+            else:
+                array = pd.arrays.FloatingArray(values, mask)
+            self._data = pd.Series(array, index=index, copy=False)
         return self._data
 
+    @property
+    def buffer(self) -> tuple[np.ndarray, np.ndarray | None, pd.Index | None] | None:
+        """
+        The array as (values, mask, index) without copying: `mask` marks the missing elements (None if
+        there are none) and `index` labels the elements (None for positions). None if the array is not
+        numeric or boolean.
+        """
+        if self._buffer is None and self._type in (KLiteralType.BOOLEAN, KLiteralType.INTEGER, KLiteralType.NUMBER):
+            array = self._data.array
+            # Masked extension arrays keep their values and validity mask as ndarrays
+            values, mask = getattr(array, "_data", None), getattr(array, "_mask", None)
+            if not isinstance(values, np.ndarray) or not isinstance(mask, np.ndarray):
+                return None
+            self._buffer = (values, mask if mask.any() else None, self._data.index)
+        return self._buffer
+
     @property
     def lit_type(self) -> KLiteralType:
         return self._type
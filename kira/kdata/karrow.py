@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import importlib.util
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+
+from kira.kdata.karray import DATE_UNIT
+from kira.kdata.kcsv import to_canonical, encode_strings
+from kira.kdata.kliteral import KLiteralType
+
+# pyarrow is optional and only imported when an Arrow file is read
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# Kira format name -> (pyarrow.dataset format, display name)
+ARROW_FORMATS = {
+    "parquet": ("parquet", "Parquet"),
+    "feather": ("feather", "Feather"),
+    "arrow": ("ipc", "Arrow IPC"),
+}
+# Row numbers appended to the key columns of a file to find the positions of the rows a filter keeps
+_ROW_COLUMN = "__kira_row"
+
+def require_pyarrow(feature: str):
+    """Raises ImportError if the optional pyarrow dependency needed by `feature` is missing."""
+    if not HAS_PYARROW:
+        raise ImportError(f"{feature} requires pyarrow (pip install pyarrow)")
+
+
+def _types_mapper(arrow_type):
+    """Maps Arrow types straight to the nullable dtypes Kira uses, so nulls do not turn integers into floats."""
+    import pyarrow as pa
+
+    if pa.types.is_integer(arrow_type):
+        return pd.Int64Dtype()
+    if pa.types.is_floating(arrow_type):
+        return pd.Float64Dtype()
+    if pa.types.is_boolean(arrow_type):
+        return pd.BooleanDtype()
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype()
+    return None
+
+
+def to_pandas(data, types: dict[str, KLiteralType] | None = None) -> pd.DataFrame:
+    """
+    Converts an Arrow table or record batch to a DataFrame with Kira's canonical dtypes.
+    Arrow dictionary arrays stay dictionary-encoded, low-cardinality string columns are encoded.
+    """
+    import pyarrow as pa
+
+    # Arrow tells dates from timestamps, no need to look at the values
+    dates = {f.name: KLiteralType.DATE if pa.types.is_date(f.type) else KLiteralType.DATETIME
+             for f in data.schema if pa.types.is_date(f.type) or pa.types.is_timestamp(f.type)}
+    df = data.to_pandas(types_mapper=_types_mapper, date_as_object=False)
+    return encode_strings(to_canonical(df, dates | (types or {})))
+
+
+class KArrowDataset:
+    """
+    A Parquet, Feather or Arrow IPC file opened through pyarrow.dataset.
+    Local files are memory-mapped, so only the pages of the projected columns
+    (and, for Parquet, of the row groups whose statistics match the filter) are read.
+    """
+
+    def __init__(self, filepath: str, fmt: str):
+        require_pyarrow(f"reading {ARROW_FORMATS[fmt][1]} files")
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        self._dataset = ds.dataset(filepath, format=ARROW_FORMATS[fmt][0], filesystem=fs.LocalFileSystem(use_mmap=True))
+
+    @property
+    def schema(self):
+        return self._dataset.schema
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._dataset.schema.names)
+
+    def read(self, columns: list[str], nrows: int | None = None, predicates=()) -> pd.DataFrame:
+        """
+        The rows as a DataFrame. Rows are labelled by their position in the file, as the rows of the
+        whole table filtered in memory would be, even when `predicates` skipped some.
+        """
+        df = to_pandas(self.read_table(columns, nrows, predicates))
+        terms = self._filter_terms(predicates)
+        if terms:
+            df.index = _RowLabels(self._kept_rows(terms)).take(len(df))
+        return df
+
+    def read_table(self, columns: list[str], nrows: int | None = None, predicates=()):
+        """Like `read`, but returns the pyarrow.Table (e.g. for tables kept in Arrow, see KTable)."""
+        arrow_filter = self.arrow_filter(predicates)
+        if nrows is not None:
+            return self._dataset.head(nrows, columns=columns, filter=arrow_filter)
+        return self._dataset.to_table(columns=columns, filter=arrow_filter)
+
+    def iter_batches(self, columns: list[str], predicates=()) -> Iterator[pd.DataFrame]:
+        terms = self._filter_terms(predicates)
+        labels = _RowLabels(self._kept_rows(terms)) if terms else None
+        offset = 0
+        for batch in self._dataset.to_batches(columns=columns, filter=self.arrow_filter(predicates)):
+            # Row labels continue across batches, as in `read`
+            df = to_pandas(batch)
+            df.index = labels.take(len(df)) if labels is not None else pd.RangeIndex(offset, offset + len(df))
+            offset += len(df)
+            yield df
+
+    def _kept_rows(self, terms: list[tuple]) -> Iterator[np.ndarray]:
+        """
+        The positions in the file of the rows the filter of `terms` keeps, batch by batch, in the order of
+        the filtered reads. Only the columns of the terms are read.
+        """
+        import pyarrow as pa
+
+        expression = _filter_expression(terms)
+        offset = 0
+        for batch in self._dataset.to_batches(columns=sorted({column for column, _, _ in terms})):
+            rows = pa.array(np.arange(offset, offset + batch.num_rows, dtype=np.int64))
+            offset += batch.num_rows
+            table = pa.Table.from_batches([batch]).append_column(_ROW_COLUMN, rows)
+            yield table.filter(expression).column(_ROW_COLUMN).to_numpy()
+
+    def arrow_filter(self, predicates):
+        """
+        The part of the formula `predicates` that pyarrow can evaluate, as a dataset expression (None if nothing).
+        Only `column <op> literal` terms joined by `and` are translated, the others are left out: the
+        filter only has to keep a superset of the matching rows since the plan applies the formulas afterwards.
+        """
+        terms = self._filter_terms(predicates)
+        return _filter_expression(terms) if terms else None
+
+    def _filter_terms(self, predicates) -> list[tuple]:
+        terms = []
+        for predicate in predicates:
+            for column, op, literal in predicate.comparisons()[0]:
+                value = self._arrow_literal(column, literal)
+                if value is not None:
+                    terms.append((column, op, value))
+        return terms
+
+    def _arrow_literal(self, column: str, literal):
+        """The literal as a Python value comparable to the column, None if the types do not match."""
+        import pyarrow as pa
+
+        if column not in self.schema.names:
+            return None
+        arrow_type = self.schema.field(column).type
+        value = literal.value.item() if hasattr(literal.value, "item") else literal.value
+        if literal.lit_type == KLiteralType.BOOLEAN:
+            return bool(value) if pa.types.is_boolean(arrow_type) else None
+        if literal.lit_type in (KLiteralType.INTEGER, KLiteralType.NUMBER):
+            return value if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) else None
+        if literal.lit_type == KLiteralType.STRING:
+            return str(value) if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) else None
+        return None
+
+
+def _filter_expression(terms: list[tuple]):
+    import pyarrow.compute as pc
+
+    expression = None
+    for column, op, literal in terms:
+        field = pc.field(column)
+        term = {"==": field == literal, "!=": field != literal, ">": field > literal,
+                "<": field < literal, ">=": field >= literal, "<=": field <= literal}[op]
+        expression = term if expression is None else expression & term
+    return expression
+
+
+class _RowLabels:
+    """Hands out the row labels of consecutive filtered batches from the kept positions (see _kept_rows)."""
+
+    def __init__(self, kept: Iterator[np.ndarray]):
+        self._kept = kept
+        self._buffer = np.zeros(0, dtype=np.int64)
+
+    def take(self, n: int) -> pd.Index:
+        while len(self._buffer) < n:
+            self._buffer = np.concatenate([self._buffer, next(self._kept)])
+        labels, self._buffer = self._buffer[:n], self._buffer[n:]
+        return pd.Index(labels)
+
+
+# Tables kept in Arrow (the "arrow" table backend of KTable)
+
+_ARROW_TYPE_NAMES = {
+    KLiteralType.INTEGER: "int64",
+    KLiteralType.NUMBER: "float64",
+    KLiteralType.BOOLEAN: "bool_",
+    KLiteralType.STRING: "string",
+    KLiteralType.DATETIME: "timestamp",
+    KLiteralType.DATE: "date32",
+}
+
+
+def read_csv_table(filepath: str,
+                   sep: str = ",",
+                   usecols: list[str] | None = None,
+                   nrows: int | None = None,
+                   types: dict[str, KLiteralType] | None = None):
+    """Reads a CSV file into a pyarrow.Table with the multi-threaded Arrow reader."""
+    require_pyarrow("the arrow table backend")
+    import pyarrow as pa
+    from pyarrow import csv
+
+    column_types = {}
+    for name, lit_type in (types or {}).items():
+        type_name = _ARROW_TYPE_NAMES.get(lit_type)
+        if type_name is not None:
+            column_types[name] = pa.timestamp("us") if type_name == "timestamp" else getattr(pa, type_name)()
+    table = csv.read_csv(filepath,
+                         parse_options=csv.ParseOptions(delimiter=sep),
+                         convert_options=csv.ConvertOptions(include_columns=usecols, column_types=column_types))
+    return table.slice(0, nrows) if nrows is not None else table
+
+
+def from_pandas(df: pd.DataFrame):
+    require_pyarrow("the arrow table backend")
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # DATE columns (datetimes in seconds, see DATE_UNIT) are Arrow dates
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type) and field.type.unit == DATE_UNIT and field.type.tz is None:
+            table = table.set_column(i, field.name, table.column(i).cast(pa.date32()))
+    return table
+
+
+def filter_table(table, mask):
+    """The rows of `table` where the boolean `mask` (array-like, NA counts as false) is true."""
+    import pyarrow as pa
+
+    return table.filter(pa.array(mask, type=pa.bool_()), null_selection_behavior="drop")
+
+
+def sort_table(table, by: list[str], ascending: bool):
+    """A stable sort with nulls last, as DataFrame.sort_values."""
+    order = "ascending" if ascending else "descending"
+    return table.sort_by([(column, order) for column in by])
+
+
+def concat_tables(tables: list):
+    """Stacks tables with the same columns, None if their schemas cannot be unified."""
+    import pyarrow as pa
+
+    try:
+        return pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError, NotImplementedError):
+        return None
+
+
+def join_tables(left, right, on: list[str], how: str, suffixes: tuple[str, str]):
+    """
+    An inner or left join in left-key order (the left rows, then the matches of each in the order
+    of the right table, as kjoin.join), None for the other join types.
+    """
+    import pyarrow as pa
+
+    if how not in ("inner", "left"):
+        return None
+    left_row, right_row = "__kira_left_row", "__kira_right_row"
+    left = left.append_column(left_row, pa.array(range(len(left)), type=pa.int64()))
+    right = right.append_column(right_row, pa.array(range(len(right)), type=pa.int64()))
+
+    overlapping = (set(left.column_names) & set(right.column_names)) - set(on)
+    joined = left.join(right, keys=on, join_type="inner" if how == "inner" else "left outer",
+                       left_suffix=suffixes[0] if overlapping else None,
+                       right_suffix=suffixes[1] if overlapping else None,
+                       coalesce_keys=True, use_threads=True)
+    joined = joined.sort_by([(left_row, "ascending"), (right_row, "ascending")])
+
+    # pd.merge column order: the left columns, then the right ones but the keys
+    columns = [c + (suffixes[0] if c in overlapping else "") for c in left.column_names if c != left_row] + \
+              [c + (suffixes[1] if c in overlapping else "") for c in right.column_names if c not in on and c != right_row]
+    return joined.select(columns)
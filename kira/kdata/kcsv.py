@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+
+import pandas as pd
+import pandas.api.types as ptypes
+
+from kira.core.kprogress import report_progress
+from kira.kdata.karray import KArray, dictionary_encode, has_times, to_canonical_dates, to_canonical_strings
+from kira.kdata.kliteral import KLiteralType
+
+# Rows per chunk of the fallback reader, the first chunk is also the sample used to infer the schema
+CSV_CHUNK_ROWS = 200_000
+
+# Kira's canonical pandas dtypes, the ones KArray converts every column to
+_CANONICAL_DTYPES = {
+    KLiteralType.INTEGER: "Int64",
+    KLiteralType.NUMBER: "Float64",
+    KLiteralType.BOOLEAN: "boolean",
+    KLiteralType.STRING: "string",
+}
+
+# What an inferred column becomes when a later chunk does not fit its type
+_WIDER_TYPES = {
+    KLiteralType.INTEGER: KLiteralType.NUMBER,
+    KLiteralType.NUMBER: KLiteralType.STRING,
+    KLiteralType.BOOLEAN: KLiteralType.STRING,
+}
+
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def parse_csv_types(specs: list[str]) -> dict[str, KLiteralType]:
+    """Parses column types written as "column:type" (e.g. "price:number"), raises ValueError if malformed."""
+    types = {}
+    for spec in specs:
+        column, sep, type_name = spec.rpartition(":")
+        if not sep or not column:
+            raise ValueError(f"Invalid column type '{spec}', expected 'column:type'")
+        try:
+            types[column.strip()] = KLiteralType[type_name.strip().upper()]
+        except KeyError:
+            raise ValueError(f"Unknown type '{type_name.strip()}' for column '{column.strip()}'")
+    return types
+
+
+def _convert_column(series: pd.Series, lit_type: KLiteralType) -> pd.Series:
+    if lit_type == KLiteralType.STRING:
+        return to_canonical_strings(series)
+    if lit_type in _CANONICAL_DTYPES:
+        return series.astype(_CANONICAL_DTYPES[lit_type])
+    if lit_type in (KLiteralType.DATE, KLiteralType.DATETIME):
+        return to_canonical_dates(series, lit_type)
+    return series
+
+
+def infer_column_type(series: pd.Series) -> KLiteralType:
+    """
+    The type of a column as read from a file. Readers give datetimes in any unit, they are dates when every
+    value is a midnight: the only scan of the values, once converted the unit tells them apart (see DATE_UNIT).
+    """
+    if ptypes.is_datetime64_any_dtype(series.dtype):
+        if series.notna().any() and not has_times(series):
+            return KLiteralType.DATE
+        return KLiteralType.DATETIME
+    return KArray.infer_type(series)
+
+
+def _convert(df: pd.DataFrame, types: dict[str, KLiteralType], fixed: set[str]) -> pd.DataFrame:
+    """
+    Converts the columns of a chunk to their canonical dtype. Inferred types are widened
+    (integer -> number -> string) when the chunk does not fit them, `types` is updated in place.
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        while True:
+            try:
+                columns[name] = _convert_column(series, types[name])
+                break
+            except (ValueError, TypeError):
+                if name in fixed or types[name] not in _WIDER_TYPES:
+                    raise ValueError(f"Column '{name}' cannot be read as {types[name].name.lower()}")
+                types[name] = _WIDER_TYPES[types[name]]
+    return pd.DataFrame(columns, index=df.index)
+
+
+def encode_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Dictionary-encodes the low-cardinality string columns of a table that was just read, see dictionary_encode."""
+    encoded = {name: dictionary_encode(df[name]) for name in df.columns if ptypes.is_string_dtype(df[name].dtype)}
+    encoded = {name: series for name, series in encoded.items() if series is not df[name]}
+    return df.assign(**encoded) if encoded else df
+
+
+def to_canonical(df: pd.DataFrame, types: dict[str, KLiteralType] | None = None) -> pd.DataFrame:
+    """Converts a whole DataFrame to the canonical dtypes, `types` fixes the type of some columns."""
+    inferred = {name: infer_column_type(df[name]) for name in df.columns}
+    return _convert(df, inferred | (types or {}), set(types or {}))
+
+
+def _read_pyarrow(filepath: str, sep: str, usecols: list[str] | None) -> pd.DataFrame:
+    return pd.read_csv(filepath, sep=sep, usecols=usecols, engine="pyarrow", dtype_backend="numpy_nullable")
+
+
+def concat_chunks(chunks: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates converted chunks, keeping their index labels. A column widened by a later chunk is widened in the
+    earlier ones as well (mixed canonical dtypes that pandas can only join as objects become strings). The earlier
+    chunks of a column widened to strings hold the text of their parsed values: see read_text_columns for the text
+    of the file.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    df = pd.concat(chunks)
+    for name in df.columns:
+        if ptypes.is_object_dtype(df[name].dtype) and \
+                all(ptypes.is_extension_array_dtype(chunk[name].dtype) for chunk in chunks if name in chunk):
+            df[name] = df[name].astype("string")
+    return df
+
+
+def read_text_columns(filepath: str, sep: str, columns: list[str], nrows: int | None = None) -> pd.DataFrame:
+    """The `columns` of a CSV file as the strings written in it, missing values stay missing."""
+    df = pd.read_csv(filepath, sep=sep, usecols=columns, nrows=nrows, dtype=str)
+    return pd.DataFrame({name: to_canonical_strings(df[name]) for name in df.columns}, index=df.index)
+
+
+def iter_csv(filepath: str,
+             sep: str = ",",
+             usecols: list[str] | None = None,
+             nrows: int | None = None,
+             types: dict[str, KLiteralType] | None = None,
+             chunk_rows: int | None = None,
+             widened: set[str] | None = None):
+    """
+    Yields the rows of a CSV file in chunks of `chunk_rows`, converted to Kira's canonical dtypes.
+    The schema is inferred from the first chunk and a column is only widened (integer -> number ->
+    string) when a later chunk does not fit it, see concat_chunks. The columns widened to strings
+    after the first chunk are added to `widened`: the chunks already yielded hold their parsed values
+    (e.g. 2.0 for "2"), the caller reads their text again with read_text_columns. `types` fixes the
+    type of some columns. Progress is reported through kira.core.kprogress as the file is consumed.
+    """
+    fixed = set(types or {})
+    size = os.path.getsize(filepath) or 1
+    schema: dict[str, KLiteralType] | None = None
+    report_progress(0.0)
+    with open(filepath, "rb") as f:
+        reader = pd.read_csv(f, sep=sep, usecols=usecols, nrows=nrows, chunksize=chunk_rows or CSV_CHUNK_ROWS)
+        for chunk in reader:
+            if schema is None:
+                # The first chunk is the sample the schema is inferred from
+                schema = {name: infer_column_type(chunk[name]) for name in chunk.columns}
+                schema.update({name: t for name, t in (types or {}).items() if name in schema})
+                yield _convert(chunk, schema, fixed)
+            else:
+                previous = dict(schema)
+                yield _convert(chunk, schema, fixed)
+                if widened is not None:
+                    widened.update(name for name, t in schema.items()
+                                   if t == KLiteralType.STRING and previous[name] != KLiteralType.STRING)
+            report_progress(f.tell() / size)
+
+
+def read_csv(filepath: str,
+             sep: str = ",",
+             usecols: list[str] | None = None,
+             nrows: int | None = None,
+             types: dict[str, KLiteralType] | None = None,
+             chunk_rows: int | None = None) -> pd.DataFrame:
+    """
+    Reads a CSV file straight into Kira's canonical dtypes (Int64, Float64, boolean, string).
+
+    Whole files are parsed by the multi-threaded pyarrow engine when it is installed. Otherwise
+    (or when only the first `nrows` are needed, or with `chunk_rows`) the file is read in chunks
+    by the C parser, see iter_csv.
+    """
+    if _HAS_PYARROW and nrows is None and chunk_rows is None:
+        report_progress(0.0)
+        df = encode_strings(to_canonical(_read_pyarrow(filepath, sep, usecols), types))
+        report_progress(1.0)
+        return df
+
+    widened = set()
+    chunks = list(iter_csv(filepath, sep, usecols, nrows, types, chunk_rows, widened))
+    if not chunks:
+        # Header only
+        return pd.read_csv(filepath, sep=sep, usecols=usecols, nrows=0)
+    df = concat_chunks(chunks)
+    if widened:
+        df = df.assign(**read_text_columns(filepath, sep, sorted(widened), nrows))
+    df = encode_strings(df)
+    report_progress(1.0)
+    return df
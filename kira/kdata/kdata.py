@@ -26,6 +26,13 @@ class KDataTypeInfo(KTypeInfo):
         return "KDataTypeInfo()"
 
 
+class KDataValueError(ValueError):
+    """
+    Raised when a deferred value (e.g. a lazy KTable) cannot be computed once it is read.
+    Functions reading such values turn it into an error value (see kfunction).
+    """
+
+
 class KDataValue(ABC):
 
     @property
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import datetime
+import re
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from kira.kdata.karray import DATE_UNIT, DATETIME_UNIT, KArray, to_canonical_dates
+from kira.kdata.kliteral import KLiteral, KLiteralType
+from kira.kdata.kstrings import map_strings
+
+# Units of date_trunc, date_add and date_diff, from the shortest
+DATE_UNITS = ("second", "minute", "hour", "day", "week", "month", "quarter", "year")
+# Business days, Monday to Friday: a unit of date_add and date_diff only
+WORKDAY = "workday"
+# Parts of a date returned by date_part, by the name of their pandas .dt attribute
+DATE_PARTS = {"year": "year", "quarter": "quarter", "month": "month", "day": "day", "weekday": "dayofweek",
+              "day_of_year": "dayofyear", "hour": "hour", "minute": "minute", "second": "second"}
+
+# NumPy datetime64 unit of the units that are a whole number of NumPy units
+_NUMPY_UNITS = {"second": "s", "minute": "m", "hour": "h", "day": "D", "year": "Y", "month": "M"}
+# Length of the fixed-length units in microseconds (the DATETIME_UNIT)
+_MICROSECONDS = {"second": 10 ** 6, "minute": 60 * 10 ** 6, "hour": 3600 * 10 ** 6, "day": 86400 * 10 ** 6,
+                 "week": 7 * 86400 * 10 ** 6}
+# Length of the calendar units in months
+_MONTHS = {"month": 1, "quarter": 3, "year": 12}
+
+# Guessed strptime format of the strings of each shape (digits replaced by 0), see guess_format
+_FORMATS: dict[str, str | None] = {}
+_FORMATS_MAX = 1024
+_DIGITS = re.compile(r"\d")
+
+
+def guess_format(sample: str) -> str | None:
+    """
+    The strptime format of `sample`, guessed once for all the strings with the same shape
+    (e.g. "2024-01-31" and "1999-12-01"): a parse then only costs the parse. None if unknown.
+    """
+    shape = _DIGITS.sub("0", sample)
+    if shape not in _FORMATS:
+        if len(_FORMATS) >= _FORMATS_MAX:
+            _FORMATS.clear()
+        _FORMATS[shape] = guess_datetime_format(sample)
+    return _FORMATS[shape]
+
+
+def parse_datetimes(values: pd.Series, fmt: str = "") -> pd.Series:
+    """
+    Parses a string array (see map_strings: dictionary-encoded ones parse their distinct values only)
+    with `fmt`, or the format guessed from the first value; strings not in the guessed format are
+    parsed one by one. Raises ValueError for a string that is not a date.
+    """
+    def kernel(strings: pd.Series) -> pd.Series:
+        first = strings.first_valid_index()
+        guessed = fmt or (guess_format(str(strings.loc[first])) if first is not None else None)
+        try:
+            parsed = pd.to_datetime(strings, format=guessed or "mixed")
+        except ValueError:
+            if fmt:
+                raise
+            parsed = pd.to_datetime(strings, format="mixed")
+        # Parsed strings are datetimes whatever unit pandas picks, see DATE_UNIT
+        return parsed.dt.as_unit(DATETIME_UNIT)
+    return map_strings(values, kernel)
+
+
+def parse_datetime(value: str, fmt: str = "") -> datetime.datetime:
+    """A single string parsed as parse_datetimes does, through strptime when the format is known."""
+    guessed = fmt or guess_format(value)
+    if guessed:
+        try:
+            return datetime.datetime.strptime(value, guessed)
+        except ValueError:
+            if fmt:
+                raise
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def to_literal(value, lit_type: KLiteralType) -> KLiteral:
+    """A date or datetime literal from a timestamp (days for dates, microseconds for datetimes)."""
+    value = pd.Timestamp(value).to_datetime64()
+    if lit_type == KLiteralType.DATE:
+        return KLiteral(value.astype("datetime64[D]"), KLiteralType.DATE)
+    return KLiteral(value.astype(f"datetime64[{DATETIME_UNIT}]"), KLiteralType.DATETIME)
+
+
+def as_series(x: KLiteral | KArray) -> pd.Series:
+    """The datetimes of a date or datetime literal or array, a literal as an array of one value."""
+    if isinstance(x, KArray):
+        return x.value
+    return pd.Series([x.value]).dt.as_unit(DATE_UNIT if x.lit_type == KLiteralType.DATE else DATETIME_UNIT)
+
+
+def date_function(x: KLiteral | KArray, kernel: Callable[[pd.Series], pd.Series],
+                  lit_type: KLiteralType | None = None) -> KLiteral | KArray | None:
+    """
+    `kernel` applied to a date or datetime literal or array. `lit_type` is the type of datetime results
+    (DATE or DATETIME), None for kernels that give numbers. None for a missing result of a literal.
+    """
+    result = kernel(as_series(x))
+    if lit_type is not None:
+        result = to_canonical_dates(result, lit_type)
+    if isinstance(x, KArray):
+        return KArray(result, lit_type)
+    value = result.iloc[0]
+    if pd.isna(value):
+        return None
+    return to_literal(value, lit_type) if lit_type is not None else KLiteral(value.item() if hasattr(value, "item") else value)
+
+
+def _buffer(values: pd.Series) -> np.ndarray:
+    # The datetimes as a datetime64 buffer in microseconds, NaT where missing
+    return values.to_numpy(dtype=f"datetime64[{DATETIME_UNIT}]", na_value=np.datetime64("NaT"))
+
+
+def _trunc_toward_zero(values: np.ndarray, step: int) -> np.ndarray:
+    return np.sign(values) * (np.abs(values) // step)
+
+
+def truncate(values: pd.Series, unit: str) -> pd.Series:
+    """
+    Every datetime truncated to the start of its `unit` (weeks start on Monday): the key of the period
+    it falls in, to group or resample a table by.
+    """
+    buffer = _buffer(values)
+    if unit in _NUMPY_UNITS:
+        out = buffer.astype(f"datetime64[{_NUMPY_UNITS[unit]}]")
+    elif unit == "quarter":
+        months = buffer.astype("datetime64[M]").astype(np.int64)
+        out = (months - months % 3).astype("datetime64[M]")
+    else:
+        # 1970-01-01, day 0, is a Thursday
+        days = buffer.astype("datetime64[D]").astype(np.int64)
+        out = (days - (days + 3) % 7).astype("datetime64[D]")
+    out = np.where(np.isnat(buffer), np.datetime64("NaT"), out.astype(f"datetime64[{DATETIME_UNIT}]"))
+    return pd.Series(out, index=values.index)
+
+
+def date_part(values: pd.Series, part: str) -> pd.Series:
+    """The `part` (see DATE_PARTS) of every datetime as integers, weekdays from 0 (Monday)."""
+    return getattr(values.dt, DATE_PARTS[part]).astype("Int64")
+
+
+def add(values: pd.Series, n: int, unit: str) -> pd.Series:
+    """
+    Every datetime moved by `n` units. Calendar units keep the day of the month, clamped to the last
+    day of shorter months; workdays move to the n-th business day, from the next one for a weekend.
+    """
+    if unit in _MONTHS:
+        return values + pd.DateOffset(months=n * _MONTHS[unit])
+    if unit == WORKDAY:
+        buffer = _buffer(values)
+        missing = np.isnat(buffer)
+        days = np.where(missing, np.datetime64("1970-01-01"), buffer.astype("datetime64[D]"))
+        moved = np.busday_offset(days, n, roll="forward").astype(f"datetime64[{DATETIME_UNIT}]")
+        # The time of day is kept
+        out = moved + (buffer - buffer.astype("datetime64[D]"))
+        return pd.Series(np.where(missing, np.datetime64("NaT"), out), index=values.index)
+    return values + np.timedelta64(n * _MICROSECONDS[unit], "us")
+
+
+def _add_months(values: np.ndarray, months_start: np.ndarray, months) -> np.ndarray:
+    """`values` (in their months starting at `months_start`) moved by `months`, the day clamped to the month."""
+    target = months_start + np.asarray(months).astype("timedelta64[M]")
+    last_day = ((target + np.timedelta64(1, "M")).astype("datetime64[D]") - target.astype("datetime64[D]")) - 1
+    day = np.minimum(values.astype("datetime64[D]") - months_start.astype("datetime64[D]"), last_day)
+    return target.astype("datetime64[D]") + day + (values - values.astype("datetime64[D]"))
+
+
+def difference(start: pd.Series, end: pd.Series, unit: str) -> pd.Series:
+    """
+    The number of whole units from `start` to `end` (negative when end is earlier), element-wise with
+    either side of length one broadcast. Calendar units count the months start can be moved by with
+    date_add without passing end (2024-01-31 to 2024-02-29 is 1 month, to 2024-02-28 is 0), workdays
+    count the business days from start to the day before end.
+    """
+    s, e = _buffer(start), _buffer(end)
+    missing = np.isnat(s) | np.isnat(e)
+    s, e = np.where(np.isnat(s), np.datetime64(0, "us"), s), np.where(np.isnat(e), np.datetime64(0, "us"), e)
+    if unit in _MONTHS:
+        s_month = s.astype("datetime64[M]")
+        months = e.astype("datetime64[M]").astype(np.int64) - s_month.astype(np.int64)
+        # A month is complete when start moved by it (as date_add does) is not past end
+        moved = _add_months(s, s_month, months)
+        months = months - ((months > 0) & (moved > e)) + ((months < 0) & (moved < e))
+        out = _trunc_toward_zero(months, _MONTHS[unit])
+    elif unit == WORKDAY:
+        out = np.busday_count(s.astype("datetime64[D]"), e.astype("datetime64[D]")).astype(np.int64)
+    else:
+        out = _trunc_toward_zero((e - s).astype(np.int64), _MICROSECONDS[unit])
+    return pd.Series(pd.arrays.IntegerArray(np.asarray(out, dtype=np.int64), np.broadcast_to(missing, np.shape(out)).copy()))
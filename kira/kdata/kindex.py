@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import io
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import pandas.api.types as ptypes
+
+from kira.kdata.karray import is_dictionary_strings, is_string_dtype
+from kira.kdata.kjoin import expand_ranges
+from kira.kdata.kliteral import KLiteral, KLiteralType
+
+if TYPE_CHECKING:
+    from kira.core.kformula import KFormulaValue
+    from kira.kdata.ktable import KTable
+
+# Rows per block of the zone maps
+ZONE_ROWS = 65_536
+# Lookups that can match more than this fraction of the rows leave them to a scan, which is as fast
+INDEX_MAX_FRACTION = 0.5
+# The sorted permutation of a column is built on its second lookup: a single filter is cheaper as a scan
+INDEX_BUILD_LOOKUPS = 2
+
+
+def is_indexable(column: pd.Series) -> bool:
+    """True for the columns a KColumnIndex can sort: numbers, booleans and strings."""
+    dtype = column.dtype
+    return ptypes.is_numeric_dtype(dtype) or ptypes.is_bool_dtype(dtype) or \
+        (is_string_dtype(dtype) and not ptypes.is_object_dtype(dtype))
+
+
+def _keys(column: pd.Series) -> tuple[np.ndarray, np.ndarray, pd.Index | None]:
+    """
+    (sort key, is valid) of every row and, for strings, their sorted distinct values: numbers are
+    their own keys, strings are keyed by their rank among the distinct values.
+    """
+    valid = column.notna().to_numpy(dtype=bool)
+    dtype = column.dtype
+    if is_dictionary_strings(dtype) and dtype.categories.is_monotonic_increasing:
+        # Dictionary-encoded columns (see dictionary_encode) already have sorted dictionaries
+        return column.cat.codes.to_numpy().astype(np.int64), valid, dtype.categories
+    if is_string_dtype(dtype):
+        codes, uniques = pd.factorize(column.astype("string"), sort=True)
+        return codes.astype(np.int64), valid, pd.Index(uniques)
+    if ptypes.is_bool_dtype(dtype) or ptypes.is_integer_dtype(dtype):
+        return column.to_numpy(dtype=np.int64, na_value=0), valid, None
+    keys = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    # NaN compares false to everything, like a missing value
+    return keys, valid & ~np.isnan(keys), None
+
+
+def _literal_value(column: pd.Series, literal: KLiteral):
+    """The literal as a value comparable to the keys of the column, None if they are not comparable."""
+    value = literal.value.item() if hasattr(literal.value, "item") else literal.value
+    dtype = column.dtype
+    if literal.lit_type in (KLiteralType.INTEGER, KLiteralType.NUMBER):
+        numeric = ptypes.is_numeric_dtype(dtype) and not ptypes.is_bool_dtype(dtype)
+        return value if numeric and not (isinstance(value, float) and np.isnan(value)) else None
+    if literal.lit_type == KLiteralType.STRING:
+        return str(value) if is_string_dtype(dtype) and not ptypes.is_object_dtype(dtype) else None
+    return None
+
+
+# The comparisons an index answers
+_BOUNDS = ("==", "<", "<=", ">", ">=")
+
+
+class KColumnIndex:
+    """
+    Secondary index of a table column (see KTable.column_index), each part built on first need:
+
+    - the sorted permutation of the rows, for equality and range lookups and for sort_by;
+    - the zone maps, the min and max of every block of ZONE_ROWS rows, which let a range lookup
+      skip the blocks that cannot match when the column is clustered (e.g. dates in load order).
+
+    Missing values are not indexed: no comparison matches them and sorts put them last.
+    """
+
+    def __init__(self, column: pd.Series):
+        self._column = column
+        self._lookups = 0
+        # Rows sorted by key (stable, missing ones last), the keys of the valid ones, string dictionary
+        self._order: np.ndarray | None = None
+        self._sorted_keys: np.ndarray | None = None
+        self._uniques: pd.Index | None = None
+        # Min and max key of every block, numeric columns only
+        self._zone_min: np.ndarray | None = None
+        self._zone_max: np.ndarray | None = None
+
+    @property
+    def is_sorted(self) -> bool:
+        """True once the sorted permutation is built."""
+        return self._order is not None
+
+    def _build_order(self):
+        keys, valid, uniques = _keys(self._column)
+        valid_rows = np.flatnonzero(valid)
+        order = valid_rows[np.argsort(keys[valid_rows], kind="stable")]
+        self._sorted_keys = keys[order]
+        self._uniques = uniques
+        self._order = np.concatenate([order, np.flatnonzero(~valid)])
+
+    def sorted_rows(self, ascending: bool = True) -> np.ndarray:
+        """
+        The row positions sorted by the column, as DataFrame.sort_values with a stable sort:
+        equal values keep their order and missing values come last.
+        """
+        if self._order is None:
+            self._build_order()
+        order, n = self._order, len(self._sorted_keys)
+        if ascending:
+            return order
+        # Descending: the runs of equal keys in reverse order, each keeping its rows in table order
+        starts = np.flatnonzero(np.r_[True, self._sorted_keys[1:] != self._sorted_keys[:-1]]) if n else \
+            np.zeros(0, dtype=np.int64)
+        lengths = np.diff(np.r_[starts, n])
+        return np.concatenate([order[expand_ranges(starts[::-1], lengths[::-1])], order[n:]])
+
+    def lookup(self, terms: list[tuple[str, KLiteral]]) -> tuple[np.ndarray, bool] | None:
+        """
+        The rows (in table order) where every `column <op> literal` of `terms` can hold, and True if they
+        hold on exactly these rows (False: a superset, from the zone maps). None if the index cannot narrow
+        the rows down: the terms it cannot answer (e.g. !=) are left out.
+        """
+        values = [(op, _literal_value(self._column, literal)) for op, literal in terms]
+        values = [(op, value) for op, value in values if value is not None and op in _BOUNDS]
+        if not values:
+            return None
+        self._lookups += 1
+        if self._order is None and self._lookups >= INDEX_BUILD_LOOKUPS:
+            self._build_order()
+        if self._order is not None:
+            lo, hi = 0, len(self._sorted_keys)
+            for op, value in values:
+                term_lo, term_hi = self._bounds(op, value)
+                lo, hi = max(lo, term_lo), min(hi, term_hi)
+            if hi - lo > INDEX_MAX_FRACTION * len(self._order):
+                return None
+            return np.sort(self._order[lo:max(lo, hi)]), len(values) == len(terms)
+        if is_string_dtype(self._column.dtype):
+            return None
+        return self._zone_lookup(values)
+
+    def _position(self, value, side: str) -> int:
+        # Strings are found by their rank: the number of distinct values before them
+        if self._uniques is not None:
+            value, side = self._uniques.searchsorted(value, side=side), "left"
+        return int(np.searchsorted(self._sorted_keys, value, side=side))
+
+    def _bounds(self, op: str, value) -> tuple[int, int]:
+        """The slice of the valid sorted rows where `key <op> value`."""
+        n = len(self._sorted_keys)
+        if op == "==":
+            return self._position(value, "left"), self._position(value, "right")
+        if op == ">":
+            return self._position(value, "right"), n
+        if op == ">=":
+            return self._position(value, "left"), n
+        if op == "<":
+            return 0, self._position(value, "left")
+        return 0, self._position(value, "right")
+
+    def _build_zones(self):
+        keys, valid, _ = _keys(self._column)
+        if keys.dtype == np.float64:
+            low, high = np.inf, -np.inf
+        else:
+            low, high = np.iinfo(np.int64).max, np.iinfo(np.int64).min
+        # Missing values never match: they are left out of the min and max of their block
+        starts = np.arange(0, len(keys), ZONE_ROWS)
+        self._zone_min = np.minimum.reduceat(np.where(valid, keys, low), starts) if len(keys) else keys
+        self._zone_max = np.maximum.reduceat(np.where(valid, keys, high), starts) if len(keys) else keys
+
+    def _zone_lookup(self, values: list[tuple[str, object]]) -> tuple[np.ndarray, bool] | None:
+        if self._zone_min is None:
+            self._build_zones()
+        lo, hi = self._zone_min, self._zone_max
+        candidates = np.ones(len(lo), dtype=bool)
+        for op, value in values:
+            candidates &= {"==": (lo <= value) & (hi >= value), ">": hi > value, ">=": hi >= value,
+                           "<": lo < value, "<=": lo <= value}[op]
+        n = len(self._column)
+        starts = np.flatnonzero(candidates) * ZONE_ROWS
+        lengths = np.minimum(starts + ZONE_ROWS, n) - starts
+        if lengths.sum() > INDEX_MAX_FRACTION * n:
+            return None
+        return expand_ranges(starts, lengths), False
+
+    def to_bytes(self) -> bytes:
+        """The parts of the index built so far, to store alongside the table (see from_bytes)."""
+        parts = {}
+        if self._order is not None:
+            parts["order"], parts["sorted_keys"] = self._order, self._sorted_keys
+            if self._uniques is not None:
+                parts["uniques"] = self._uniques.to_numpy(dtype=object)
+        if self._zone_min is not None:
+            parts["zone_min"], parts["zone_max"] = self._zone_min, self._zone_max
+        buffer = io.BytesIO()
+        np.savez(buffer, **parts)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, column: pd.Series, data: bytes) -> KColumnIndex:
+        """The index of `column` stored by to_bytes (the column must be the one it was built on)."""
+        index = cls(column)
+        with np.load(io.BytesIO(data), allow_pickle=True) as parts:
+            if "order" in parts:
+                index._order, index._sorted_keys = parts["order"], parts["sorted_keys"]
+                if "uniques" in parts:
+                    index._uniques = pd.Index(parts["uniques"], dtype="string")
+            if "zone_min" in parts:
+                index._zone_min, index._zone_max = parts["zone_min"], parts["zone_max"]
+        return index
+
+
+def index_lookup(table: KTable, condition: KFormulaValue) -> tuple[np.ndarray, bool] | None:
+    """
+    The rows of `table` that can satisfy the filter `condition`, found through the indexes of the columns
+    it compares to literals: (rows in table order, True if these are exactly the rows satisfying it).
+    None if the indexes do not narrow the rows down, or the condition has to see the whole table.
+    """
+    terms, exact = condition.comparisons()
+    if not terms or not (exact or condition.is_row_local(table.columns)):
+        return None
+
+    by_column: dict[str, list[tuple[str, KLiteral]]] = {}
+    for column, op, literal in terms:
+        by_column.setdefault(column, []).append((op, literal))
+
+    rows = None
+    for column, column_terms in by_column.items():
+        found = None
+        if table.has_column(column) and is_indexable(table.column(column)):
+            found = table.column_index(column).lookup(column_terms)
+        if found is None:
+            exact = False
+            continue
+        rows = found[0] if rows is None else np.intersect1d(rows, found[0], assume_unique=True)
+        exact = exact and found[1]
+    return None if rows is None else (rows, exact)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.api.types as ptypes
+
+from kira.core.kexecutor import run_parallel
+from kira.kdata.karray import is_dictionary_strings
+
+# Left tables longer than this are probed in one partition per core
+JOIN_PARALLEL_ROWS = 1_000_000
+# An inner join indexes the left table instead when it is this many times shorter than the right one
+JOIN_BUILD_LEFT_RATIO = 4
+# The `how` of the join node
+JOIN_TYPES = ("inner", "left", "right", "outer")
+
+
+class KJoinIndex:
+    """
+    The rows of a table grouped by the values of its key columns, built once and reused by every
+    join against the table (see KTable.join_index).
+
+    Keys that are a single sorted numeric column are matched by binary search on the column itself
+    (sort-merge); the others go through a hash table of the distinct keys (hash join). Rows with the
+    same key keep their order, so joins return the rows in left-key order: the left rows in order,
+    each followed by its matches in the order of the right table.
+    """
+
+    def __init__(self, df: pd.DataFrame, on: list[str]):
+        self._on = list(on)
+        keys = [df[column] for column in on]
+
+        key = keys[0]
+        self._is_sorted = len(keys) == 1 and ptypes.is_numeric_dtype(key.dtype) and \
+            not ptypes.is_bool_dtype(key.dtype) and key.is_monotonic_increasing
+        if self._is_sorted:
+            # Sort-merge: the column is its own index
+            self._sorted_keys = key.to_numpy(dtype=np.float64 if ptypes.is_float_dtype(key.dtype) else np.int64)
+            self._unique_keys = len(key) < 2 or bool((self._sorted_keys[1:] != self._sorted_keys[:-1]).all())
+            return
+
+        # Hash: codes of the distinct keys, rows ordered (stably) by code
+        codes, self._uniques = _factorize(keys)
+        self._order = np.argsort(codes, kind="stable")
+        self._counts = np.bincount(codes, minlength=len(self._uniques))
+        self._starts = np.cumsum(self._counts) - self._counts
+        self._unique_keys = len(self._uniques) == len(codes)
+
+    @property
+    def on(self) -> list[str]:
+        return self._on
+
+    @property
+    def unique_keys(self) -> bool:
+        """True if no two indexed rows have the same key, every probe row then has at most one match."""
+        return self._unique_keys
+
+    @property
+    def algorithm(self) -> str:
+        return "sort-merge" if self._is_sorted else "hash"
+
+    def matches(self, probe: list[pd.Series]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        For each probe row (in order) the positions of the indexed rows with the same key (in order):
+        returns (match count per probe row, indexed row of every match).
+        """
+        if self._is_sorted:
+            key = probe[0]
+            if self._sorted_keys.dtype == np.int64 and ptypes.is_integer_dtype(key.dtype) and not key.hasnans:
+                values = key.to_numpy(dtype=np.int64)
+            else:
+                # Missing probe keys become NaN, which sorts after every key and matches none
+                values = key.to_numpy(dtype=np.float64, na_value=np.nan)
+            lo = np.searchsorted(self._sorted_keys, values, side="left")
+            counts = np.searchsorted(self._sorted_keys, values, side="right") - lo
+            if self._unique_keys:
+                return counts, lo[counts > 0]
+            return counts, expand_ranges(lo, counts)
+
+        codes = self._lookup(probe)
+        found = codes >= 0
+        if self._unique_keys:
+            # At most one match per probe row: no need to expand the groups
+            return found.astype(np.int64), self._order[codes[found]]
+        counts = np.where(found, self._counts[np.where(found, codes, 0)], 0)
+        return counts, self._order[expand_ranges(self._starts[np.where(found, codes, 0)], counts)]
+
+    def _lookup(self, probe: list[pd.Series]) -> np.ndarray:
+        if len(probe) == 1:
+            return self._uniques.get_indexer(_plain(probe[0]))
+        return self._uniques.get_indexer(pd.MultiIndex.from_arrays([_plain(key) for key in probe]))
+
+
+def _plain(key: pd.Series):
+    # Dictionary-encoded keys are compared by value, their dictionaries may differ
+    return key.astype("string") if is_dictionary_strings(key.dtype) else key
+
+
+def _factorize(keys: list[pd.Series]) -> tuple[np.ndarray, pd.Index]:
+    if len(keys) == 1:
+        codes, uniques = pd.factorize(_plain(keys[0]), use_na_sentinel=False)
+        return codes, pd.Index(uniques)
+    index = pd.MultiIndex.from_arrays([_plain(key) for key in keys])
+    codes, uniques = pd.factorize(index, use_na_sentinel=False)
+    return codes, uniques
+
+
+def expand_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """The positions starts[i], starts[i] + 1, ..., starts[i] + counts[i] - 1 for every i, concatenated."""
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    group_starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + (np.arange(total) - group_starts)
+
+
+def _compatible(left: pd.Series, right: pd.Series) -> bool:
+    """Keys that pd.merge would compare by value (the others keep its errors and conversions)."""
+    def kind(dtype):
+        if is_dictionary_strings(dtype) or ptypes.is_string_dtype(dtype):
+            return "string"
+        if ptypes.is_bool_dtype(dtype):
+            return "bool"
+        if ptypes.is_numeric_dtype(dtype):
+            return "number"
+        return str(dtype)
+    return kind(left.dtype) == kind(right.dtype) and kind(left.dtype) in ("string", "bool", "number")
+
+
+def _take(column: pd.Series, positions: np.ndarray, missing: np.ndarray | None) -> pd.Series:
+    """The rows at `positions`, missing values where `missing` is set (positions there are -1)."""
+    # Taken from the array: the row labels are dropped anyway
+    values = column.array.take(positions, allow_fill=missing is not None and bool(missing.any()))
+    return pd.Series(values, name=column.name, copy=False)
+
+
+def _probe(index: KJoinIndex, probe_keys: list[pd.Series]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (probe row, indexed row) of every match and the match count of every probe row.
+    Long inputs are probed in one partition per core.
+    """
+    n = len(probe_keys[0])
+    partitions = min(os.cpu_count() or 1, -(-n // JOIN_PARALLEL_ROWS)) if n > JOIN_PARALLEL_ROWS else 1
+    bounds = np.linspace(0, n, partitions + 1).astype(np.int64)
+
+    def task(lo, hi):
+        counts, matched = index.matches([key.iloc[lo:hi] for key in probe_keys])
+        probe_rows = lo + (np.flatnonzero(counts) if index.unique_keys else np.repeat(np.arange(hi - lo), counts))
+        return probe_rows, matched, counts
+
+    results = run_parallel([lambda lo=lo, hi=hi: task(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])])
+    probe_rows = np.concatenate([r[0] for r in results])
+    matched = np.concatenate([r[1] for r in results])
+    counts = np.concatenate([r[2] for r in results])
+    return probe_rows, matched, counts
+
+
+def can_join(left_df: pd.DataFrame, right_df: pd.DataFrame, on: list[str], how: str) -> bool:
+    """True if `join` handles these tables: inner and left joins on string, boolean and numeric keys."""
+    if how not in ("inner", "left"):
+        return False
+    if any(c not in left_df.columns or c not in right_df.columns for c in on) or len(right_df) == 0:
+        return False
+    return all(_compatible(left_df[c], right_df[c]) for c in on)
+
+
+def join(left, right, on: list[str], how: str, suffixes: tuple[str, str]) -> pd.DataFrame | None:
+    """
+    Joins two KTables on their `on` columns like pd.merge (same rows, columns and suffixes for the
+    overlapping columns), with a reusable join index. The rows are in left-key order, which
+    pd.merge does not always keep for inner joins. Handles inner and left joins on string, boolean
+    and numeric keys; returns None for the others, left to pd.merge.
+    """
+    left_df, right_df = left.value, right.value
+    if not can_join(left_df, right_df, on, how):
+        return None
+
+    # Index the dimension (right) side, or the left one when it is much shorter for an inner join
+    build_left = how == "inner" and not right.has_join_index(on) and \
+        len(left_df) * JOIN_BUILD_LEFT_RATIO < len(right_df)
+    if build_left:
+        right_rows, left_rows, _ = _probe(left.join_index(on), [right_df[c] for c in on])
+        # Back to left-key order: left rows, then their matches in right order
+        order = np.lexsort((right_rows, left_rows))
+        left_rows, right_rows, missing = left_rows[order], right_rows[order], None
+        same_left_rows = False
+    else:
+        left_rows, right_rows, counts = _probe(right.join_index(on), [left_df[c] for c in on])
+        missing = None
+        # Every left row kept once, in order: the left columns are reused as they are
+        same_left_rows = bool((counts == 1).all()) if how == "inner" else bool((counts <= 1).all())
+        if how == "left" and (counts == 0).any():
+            # Unmatched left rows are kept once, with missing right values
+            keep = np.maximum(counts, 1)
+            slots = np.repeat(np.arange(len(counts)), keep)
+            filled = np.full(len(slots), -1, dtype=np.int64)
+            matched_slots = np.repeat(counts > 0, keep)
+            filled[matched_slots] = right_rows
+            left_rows, right_rows = slots, filled
+            missing = right_rows < 0
+
+    overlapping = (set(left_df.columns) & set(right_df.columns)) - set(on)
+    columns = {}
+    for name in left_df.columns:
+        column = left_df[name]
+        if name in on and column.dtype != right_df[name].dtype:
+            # pd.merge decodes a dictionary-encoded key joined with a differently typed one
+            column = _plain(column)
+        if same_left_rows:
+            column = column.reset_index(drop=True)
+        else:
+            column = _take(column, left_rows, None)
+        columns[name + suffixes[0] if name in overlapping else name] = column
+    for name in right_df.columns:
+        if name not in on:
+            columns[name + suffixes[1] if name in overlapping else name] = _take(right_df[name], right_rows, missing)
+    return pd.DataFrame(columns)
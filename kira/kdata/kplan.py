@@ -0,0 +1,837 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import pandas.api.types as ptypes
+
+from kira.kdata.karray import KArray, is_dictionary_strings
+from kira.kdata.karrow import KArrowDataset
+from kira.kdata.kcsv import read_csv, iter_csv, concat_chunks, encode_strings, read_text_columns
+from kira.kdata.kdata import KDataValueError
+from kira.kdata.kjoin import join
+from kira.kdata.kliteral import KLiteralType
+
+if TYPE_CHECKING:
+    from kira.kdata.ktable import KTable
+
+
+# Sources larger than this are streamed in chunks through the plan
+PLAN_STREAM_MIN_BYTES = 64 * 1024 * 1024
+# Rows a blocking sort keeps in memory before spilling a sorted run to disk
+PLAN_SPILL_ROWS = 2_000_000
+# Rows of each piece a spilled run is written in, the merge holds one piece per run
+PLAN_MERGE_ROWS = 100_000
+# Rows of the source a filter formula is checked on before it is added to a plan (see KPlanNode.sample)
+PLAN_SAMPLE_ROWS = 100
+
+
+def _prepend(first: pd.DataFrame, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    yield first
+    yield from chunks
+
+
+class KPlanNode(ABC):
+    """
+    A node of the logical plan of a lazy KTable. Every node but the source has exactly one child.
+
+    `load_csv(p) |> select(cols) |> filter($x > 0$) |> sort_by("x") |> head(10)` is recorded as
+    KPlanSlice(KPlanSort(KPlanFilter(KPlanSelect(KPlanCsvScan(p))))) and nothing is read until
+    the table is observed. The plan is then optimized and executed in one pass:
+    - projection pushdown: only the columns needed by the output, the predicates and the
+      sort keys are parsed from the source (`usecols`);
+    - predicate pushdown: formula filters are moved below sorts;
+    - top-k: a sort followed by `head(n)` uses `argpartition` instead of a full sort;
+    - row limits: a `head(n)` that only follows column operations is pushed into the reader;
+    - filter pushdown: the sources that can (Parquet/Arrow) skip the rows the leading filters drop.
+
+    Large sources are streamed: the rows flow through the plan in chunks (`stream`), so row-local
+    operations (column operations, row-local predicates, joins with an in-memory table) only ever
+    hold one chunk of the input, `head` stops reading early and top-k keeps n rows. Blocking
+    operations collect their input, sorts spill their sorted runs to disk while the source is read.
+    """
+
+    def __init__(self, child: KPlanNode | None = None):
+        self._child = child
+
+    @property
+    def child(self) -> KPlanNode | None:
+        return self._child
+
+    @property
+    def columns(self) -> list[str]:
+        return self.output_columns(self._child.columns)
+
+    @property
+    def source(self) -> KPlanSource:
+        """The source at the bottom of the plan."""
+        node = self
+        while node.child is not None:
+            node = node.child
+        return node
+
+    @property
+    def num_rows(self) -> int | None:
+        """The number of rows of the output if it is known without executing the plan, None otherwise."""
+        return self._child.num_rows
+
+    def output_columns(self, input_columns: list[str]) -> list[str]:
+        return input_columns
+
+    def sample(self, nrows: int = PLAN_SAMPLE_ROWS) -> pd.DataFrame:
+        """
+        Some rows with the columns and types of the output, from the first `nrows` rows of the source:
+        enough to check a formula against the plan before extending it. Filters keep all their rows.
+        """
+        return self.apply(self._child.sample(nrows))
+
+    def needed_columns(self, needed: set[str], input_columns: list[str]) -> set[str]:
+        """Columns this operation needs from its input to produce `needed`."""
+        return needed
+
+    @abstractmethod
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        pass
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Applies the operation to a stream of row chunks. By default the whole input is collected first."""
+        yield self.apply(concat_chunks(list(chunks)))
+
+    # Builders used by the table library
+
+    def select(self, columns: list[str]) -> KPlanNode:
+        return KPlanSelect(self, columns)
+
+    def drop(self, columns: list[str]) -> KPlanNode:
+        return KPlanDrop(self, columns)
+
+    def rename(self, mapping: dict[str, str]) -> KPlanNode:
+        return KPlanRename(self, mapping)
+
+    def filter(self, condition) -> KPlanNode:
+        return KPlanFilter(self, condition)
+
+    def sort(self, by: list[str], ascending: bool) -> KPlanNode:
+        return KPlanSort(self, by, ascending)
+
+    def head(self, n: int) -> KPlanNode:
+        return KPlanSlice(self, n, from_end=False)
+
+    def tail(self, n: int) -> KPlanNode:
+        return KPlanSlice(self, n, from_end=True)
+
+    def join(self, right: KTable, on: list[str], how: str, suffixes: tuple[str, str]) -> KPlanNode:
+        return KPlanJoin(self, right, on, how, suffixes)
+
+    def execute(self, columns: list[str] | None = None) -> pd.DataFrame:
+        return execute_plan(self, columns)
+
+
+class KPlanSource(KPlanNode, ABC):
+
+    def __init__(self):
+        super().__init__(None)
+
+    @property
+    def prunes_columns(self) -> bool:
+        """True if reading some of the columns is cheaper than reading them all (see KTable.column)."""
+        return True
+
+    @property
+    def num_rows(self) -> int | None:
+        return None
+
+    def sample(self, nrows: int = PLAN_SAMPLE_ROWS) -> pd.DataFrame:
+        return self.read(self.columns, nrows)
+
+    @property
+    @abstractmethod
+    def columns(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    def read(self, columns: list[str], nrows: int | None = None) -> pd.DataFrame:
+        pass
+
+    def read_chunks(self, columns: list[str], nrows: int | None = None, predicates=(),
+                    widened: set[str] | None = None) -> Iterator[pd.DataFrame]:
+        """
+        The rows of `read` in chunks, at least one (possibly empty). `predicates` are the formulas
+        of the filters the rows go through first: a source may use them to skip rows, the filters
+        are still applied to what it returns. A source that widens a column to strings after its
+        first chunk adds it to `widened` and gives its text with `read_text` (see iter_csv).
+        """
+        yield self.read(columns, nrows)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df
+
+
+class KPlanCsvScan(KPlanSource):
+    """
+    Reads a CSV file into Kira's canonical dtypes (see kira.kdata.kcsv).
+    The header is parsed eagerly so that errors surface at load time.
+    """
+
+    def __init__(self, filepath: str, sep: str = ",", types: dict[str, KLiteralType] | None = None):
+        super().__init__()
+        self._filepath = filepath
+        self._sep = sep
+        self._types = types
+        self._columns = list(pd.read_csv(filepath, sep=sep, nrows=0).columns)
+
+    @property
+    def columns(self) -> list[str]:
+        return self._columns
+
+    def read(self, columns: list[str], nrows: int | None = None) -> pd.DataFrame:
+        if not columns:
+            # Nothing to parse but the row count
+            return pd.read_csv(self._filepath, sep=self._sep, usecols=[0], nrows=nrows).iloc[:, :0]
+        return read_csv(self._filepath, sep=self._sep, usecols=columns, nrows=nrows, types=self._types)
+
+    def read_chunks(self, columns: list[str], nrows: int | None = None, predicates=(),
+                    widened: set[str] | None = None) -> Iterator[pd.DataFrame]:
+        if not columns or os.path.getsize(self._filepath) < PLAN_STREAM_MIN_BYTES:
+            yield self.read(columns, nrows)
+            return
+
+        empty = True
+        for chunk in iter_csv(self._filepath, sep=self._sep, usecols=columns, nrows=nrows, types=self._types,
+                              widened=widened):
+            empty = False
+            yield chunk
+        if empty:
+            yield self.read(columns, 0)
+
+    def read_text(self, columns: list[str], nrows: int | None = None) -> pd.DataFrame:
+        return read_text_columns(self._filepath, self._sep, columns, nrows)
+
+    def __repr__(self):
+        return f"KPlanCsvScan({self._filepath!r})"
+
+
+class KPlanArrowScan(KPlanSource):
+    """
+    Reads a Parquet, Feather or Arrow IPC file (see kira.kdata.karrow). Only the projected columns
+    are read and the leading row-local filters are pushed into the reader, which skips the Parquet
+    row groups whose statistics cannot match them.
+    """
+
+    def __init__(self, filepath: str, fmt: str):
+        super().__init__()
+        self._filepath = filepath
+        self._dataset = KArrowDataset(filepath, fmt)
+
+    @property
+    def dataset(self) -> KArrowDataset:
+        return self._dataset
+
+    @property
+    def columns(self) -> list[str]:
+        return self._dataset.columns
+
+    def read(self, columns: list[str], nrows: int | None = None, predicates=()) -> pd.DataFrame:
+        return self._dataset.read(columns, nrows, predicates)
+
+    def read_chunks(self, columns: list[str], nrows: int | None = None, predicates=(),
+                    widened: set[str] | None = None) -> Iterator[pd.DataFrame]:
+        if nrows is not None or os.path.getsize(self._filepath) < PLAN_STREAM_MIN_BYTES:
+            yield self.read(columns, nrows, predicates)
+            return
+
+        empty = True
+        for chunk in self._dataset.iter_batches(columns, predicates):
+            empty = False
+            yield chunk
+        if empty:
+            yield self.read(columns, 0)
+
+    def __repr__(self):
+        return f"KPlanArrowScan({self._filepath!r})"
+
+
+class KPlanFrame(KPlanSource):
+    """
+    An in-memory table as the source of a plan, so that the operations applied to it can be fused
+    (e.g. `head(sort_by(df, "x"), 10)` selects the top 10 rows instead of sorting the table).
+    """
+
+    def __init__(self, table: KTable):
+        super().__init__()
+        self._table = table
+
+    @property
+    def columns(self) -> list[str]:
+        return self._table.columns
+
+    @property
+    def prunes_columns(self) -> bool:
+        return False
+
+    @property
+    def num_rows(self) -> int | None:
+        return len(self._table.value)
+
+    def read(self, columns: list[str], nrows: int | None = None) -> pd.DataFrame:
+        df = self._table.value[columns]
+        return df if nrows is None else df.head(nrows)
+
+    def sorted_rows(self, by: list[str], ascending: bool, built_only: bool = False) -> np.ndarray | None:
+        """
+        The rows of the table sorted by `by`, from the column index of a single key column (see
+        KTable.column_index), None for other keys or, with `built_only`, if the index is not sorted yet.
+        """
+        from kira.kdata.kindex import is_indexable
+
+        if len(by) != 1 or not self._table.has_column(by[0]) or not is_indexable(self._table.column(by[0])):
+            return None
+        index = self._table.column_index(by[0])
+        if built_only and not index.is_sorted:
+            return None
+        return index.sorted_rows(ascending)
+
+    def __repr__(self):
+        return "KPlanFrame()"
+
+
+class KPlanSelect(KPlanNode):
+
+    def __init__(self, child: KPlanNode, columns: list[str]):
+        super().__init__(child)
+        self._select = list(columns)
+
+    def output_columns(self, input_columns: list[str]) -> list[str]:
+        return self._select
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[[c for c in self._select if c in df.columns]]
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.apply(chunk)
+
+    def __repr__(self):
+        return f"KPlanSelect({self._select!r})"
+
+
+class KPlanDrop(KPlanNode):
+
+    def __init__(self, child: KPlanNode, columns: list[str]):
+        super().__init__(child)
+        self._drop = set(columns)
+
+    def output_columns(self, input_columns: list[str]) -> list[str]:
+        return [c for c in input_columns if c not in self._drop]
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.drop(columns=[c for c in df.columns if c in self._drop])
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.apply(chunk)
+
+    def __repr__(self):
+        return f"KPlanDrop({sorted(self._drop)!r})"
+
+
+class KPlanRename(KPlanNode):
+
+    def __init__(self, child: KPlanNode, mapping: dict[str, str]):
+        super().__init__(child)
+        self._mapping = dict(mapping)
+
+    def output_columns(self, input_columns: list[str]) -> list[str]:
+        return [self._mapping.get(c, c) for c in input_columns]
+
+    def needed_columns(self, needed: set[str], input_columns: list[str]) -> set[str]:
+        inverse = {new: old for old, new in self._mapping.items()}
+        return {inverse.get(c, c) for c in needed}
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.rename(columns=self._mapping)
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.apply(chunk)
+
+    def __repr__(self):
+        return f"KPlanRename({self._mapping!r})"
+
+
+class KPlanFilter(KPlanNode):
+    """
+    Keeps the rows matching a condition. The condition is either a boolean mask
+    (positional, bound to the row order at this point of the plan) or a deferred
+    formula predicate (row-local, evaluated on the rows reaching this operation).
+    """
+
+    def __init__(self, child: KPlanNode, condition):
+        super().__init__(child)
+        self._condition = condition
+
+    @property
+    def is_predicate(self) -> bool:
+        return hasattr(self._condition, "evaluate")
+
+    @property
+    def condition(self):
+        return self._condition
+
+    @property
+    def num_rows(self) -> int | None:
+        return None
+
+    def sample(self, nrows: int = PLAN_SAMPLE_ROWS) -> pd.DataFrame:
+        return self._child.sample(nrows)
+
+    def needed_columns(self, needed: set[str], input_columns: list[str]) -> set[str]:
+        if self.is_predicate:
+            return needed | (self._condition.symbols & set(input_columns))
+        return needed
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        if not self.is_predicate:
+            # A mask is checked against the length of the whole table
+            yield from super().stream(chunks)
+            return
+
+        first = next(chunks, None)
+        if first is None:
+            return
+        if not self._condition.is_row_local(list(first.columns)):
+            # e.g. $x > mean(x)$ needs every row at once
+            yield from super().stream(_prepend(first, chunks))
+            return
+        for chunk in _prepend(first, chunks):
+            yield self.apply(chunk)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        if not self.is_predicate:
+            mask = np.asarray(self._condition, dtype=bool)
+        else:
+            res = self._condition.evaluate(df)
+            if not res:
+                raise KDataValueError(f"Filter condition failed: {res.error}")
+            if not (isinstance(res.value, KArray) and res.value.lit_type == KLiteralType.BOOLEAN):
+                raise KDataValueError(f"The filter condition must be an array of booleans, got {res.value} instead!")
+            mask = res.value.value.fillna(False).to_numpy(dtype=bool)
+
+        if len(mask) != len(df):
+            raise KDataValueError(f"The table and the condition must have the same length, "
+                             f"got {len(df)} and {len(mask)} instead!")
+        return df[mask]
+
+    def __repr__(self):
+        return f"KPlanFilter({'predicate' if self.is_predicate else 'mask'})"
+
+
+class KPlanSort(KPlanNode):
+
+    def __init__(self, child: KPlanNode, by: list[str], ascending: bool = True, frame: KPlanFrame | None = None):
+        super().__init__(child)
+        self._by = list(by)
+        self._ascending = ascending
+        # Set by the optimizer when the sort receives all the rows of an in-memory table
+        self._frame = frame
+
+    def on_frame(self, frame: KPlanFrame) -> KPlanSort:
+        return KPlanSort(self.child, self._by, self._ascending, frame)
+
+    def needed_columns(self, needed: set[str], input_columns: list[str]) -> set[str]:
+        return needed | set(self._by)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._frame is not None:
+            # The column index of the table keeps the sorted permutation for the next sorts
+            rows = self._frame.sorted_rows(self._by, self._ascending)
+            if rows is not None:
+                return df.iloc[rows]
+        return df.sort_values(by=self._by, ascending=self._ascending)
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Sorts the input in runs of PLAN_SPILL_ROWS rows that are spilled to disk while the input is read,
+        then merges them (see merge_sorted_runs): the rows come out in chunks of at most one piece of
+        PLAN_MERGE_ROWS rows per run, never the whole input at once.
+        """
+        if self._frame is not None:
+            # Already in memory, nothing to spill
+            yield self.apply(concat_chunks(list(chunks)))
+            return
+
+        buffer, buffered = [], 0
+        with tempfile.TemporaryDirectory(prefix="kira-sort-") as spill_dir:
+            runs = []
+            for chunk in chunks:
+                buffer.append(chunk)
+                buffered += len(chunk)
+                if buffered >= PLAN_SPILL_ROWS:
+                    runs.append(self._spill(concat_chunks(buffer), os.path.join(spill_dir, f"run_{len(runs)}")))
+                    buffer, buffered = [], 0
+
+            if not runs:
+                yield self.apply(concat_chunks(buffer))
+                return
+            pieces = [_load_pieces(paths) for paths in runs]
+            if buffer:
+                last = concat_chunks(buffer).sort_values(by=self._by, ascending=self._ascending, kind="stable")
+                pieces.append(_split_rows(last, PLAN_MERGE_ROWS))
+            yield from merge_sorted_runs(pieces, self._by, self._ascending)
+
+    def _spill(self, df: pd.DataFrame, prefix: str) -> list[str]:
+        """Writes the rows of `df` stably sorted, in pieces of PLAN_MERGE_ROWS rows. Returns their paths."""
+        paths = []
+        for piece in _split_rows(df.sort_values(by=self._by, ascending=self._ascending, kind="stable"), PLAN_MERGE_ROWS):
+            paths.append(f"{prefix}_{len(paths)}.pkl")
+            piece.to_pickle(paths[-1])
+        return paths
+
+    def __repr__(self):
+        return f"KPlanSort({self._by!r}, ascending={self._ascending})"
+
+
+class KPlanSlice(KPlanNode):
+
+    def __init__(self, child: KPlanNode, n: int, from_end: bool = False):
+        super().__init__(child)
+        self._n = int(n)
+        self._from_end = from_end
+
+    @property
+    def num_rows(self) -> int | None:
+        rows = self._child.num_rows
+        return None if rows is None else min(rows, self._n)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.tail(self._n) if self._from_end else df.head(self._n)
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        if self._from_end:
+            # Keep the last n rows seen so far
+            last = None
+            for chunk in chunks:
+                last = chunk.tail(self._n) if last is None else concat_chunks([last, chunk]).tail(self._n)
+            if last is not None:
+                yield last
+            return
+
+        remaining = self._n
+        for chunk in chunks:
+            yield chunk.head(remaining)
+            remaining -= min(remaining, len(chunk))
+            if remaining == 0:
+                # Stop pulling, the source stops reading
+                return
+
+    def __repr__(self):
+        return f"KPlanSlice({self._n}, from_end={self._from_end})"
+
+
+class KPlanTopK(KPlanNode):
+    """A sort immediately followed by `head(n)` (or `tail(n)`, `from_end`), fused by the optimizer."""
+
+    def __init__(self, sort: KPlanSort, n: int, from_end: bool = False):
+        super().__init__(sort.child)
+        self._sort = sort
+        self._by = sort._by
+        self._ascending = sort._ascending
+        self._n = n
+        self._from_end = from_end
+
+    @property
+    def num_rows(self) -> int | None:
+        rows = self._child.num_rows
+        return None if rows is None else min(rows, self._n)
+
+    def on_frame(self, frame: KPlanFrame) -> KPlanTopK:
+        return KPlanTopK(self._sort.on_frame(frame), self._n, self._from_end)
+
+    def needed_columns(self, needed: set[str], input_columns: list[str]) -> set[str]:
+        return needed | set(self._by)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._sort._frame is not None:
+            # A sorted permutation already built is cheaper than a selection
+            rows = self._sort._frame.sorted_rows(self._by, self._ascending, built_only=True)
+            if rows is not None:
+                return df.iloc[rows[-self._n:] if self._from_end else rows[:self._n]] if self._n > 0 else df.iloc[:0]
+        return top_k(df, self._by, self._n, self._ascending, self._from_end)
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        # The best n rows so far come before the chunk, so ties still keep the input order
+        best = None
+        for chunk in chunks:
+            best = self.apply(chunk if best is None else concat_chunks([best, chunk]))
+        if best is not None:
+            yield best
+
+    def __repr__(self):
+        return f"KPlanTopK({self._by!r}, {self._n}, ascending={self._ascending}, from_end={self._from_end})"
+
+
+class KPlanJoin(KPlanNode):
+    """
+    An inner or left join of the rows of the plan with an in-memory table (see kira.kdata.kjoin.join).
+    Every output row comes from one input row and the join index of the right table is built once, so
+    the input streams through the join chunk by chunk: only the right table has to fit in memory.
+    The output rows are numbered from 0, as the rows of an eager join.
+    """
+
+    def __init__(self, child: KPlanNode, right: KTable, on: list[str], how: str, suffixes: tuple[str, str]):
+        super().__init__(child)
+        self._right = right
+        self._on = list(on)
+        self._how = how
+        self._suffixes = suffixes
+        # Fixed by the schema of the input: a column pruned from the input keeps the suffixes of the others
+        self._overlapping = (set(child.columns) & set(right.columns)) - set(on)
+
+    @property
+    def num_rows(self) -> int | None:
+        return None
+
+    def output_columns(self, input_columns: list[str]) -> list[str]:
+        left = [c + self._suffixes[0] if c in self._overlapping else c for c in input_columns]
+        right = [c + self._suffixes[1] if c in self._overlapping else c for c in self._right.columns if c not in self._on]
+        return left + right
+
+    def needed_columns(self, needed: set[str], input_columns: list[str]) -> set[str]:
+        kept = {c for c in input_columns if (c + self._suffixes[0] if c in self._overlapping else c) in needed}
+        return kept | set(self._on) | self._overlapping
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        from kira.kdata.ktable import KTable
+
+        joined = join(KTable(df), self._right, self._on, self._how, self._suffixes)
+        if joined is not None:
+            return joined
+        # e.g. a key column widened to strings by a later chunk
+        try:
+            return pd.merge(df, self._right.value, on=self._on, how=self._how, suffixes=self._suffixes)
+        except (TypeError, ValueError) as e:
+            raise KDataValueError(f"Cannot join the tables: {e}")
+
+    def stream(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        offset = 0
+        for chunk in chunks:
+            joined = self.apply(chunk)
+            joined.index = pd.RangeIndex(offset, offset + len(joined))
+            offset += len(joined)
+            yield joined
+
+    def __repr__(self):
+        return f"KPlanJoin({self._on!r}, how={self._how!r})"
+
+
+def _split_rows(df: pd.DataFrame, rows: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows]
+
+
+def _load_pieces(paths: list[str]) -> Iterator[pd.DataFrame]:
+    for path in paths:
+        yield pd.read_pickle(path)
+
+
+def merge_sorted_runs(runs: list[Iterator[pd.DataFrame]], by: list[str], ascending: bool = True) -> Iterator[pd.DataFrame]:
+    """
+    Merges runs of rows stably sorted by `by`, each given as an iterator of its pieces in order, into the
+    rows of a stable sort of their concatenation (ties keep the run order), in chunks. One piece per run is
+    held at a time: every step sorts the current pieces together and yields the rows up to the last row of
+    the piece that ends first in that order, which no row of a later piece can precede.
+    """
+    def next_piece(run: Iterator[pd.DataFrame]) -> pd.DataFrame | None:
+        return next((piece for piece in run if len(piece) > 0), None)
+
+    runs = list(runs)
+    pieces = [next_piece(run) for run in runs]
+    while True:
+        active = [i for i, piece in enumerate(pieces) if piece is not None]
+        if not active:
+            return
+        if len(active) == 1:
+            i = active[0]
+            yield pieces[i]
+            yield from runs[i]
+            return
+
+        current = [pieces[i] for i in active]
+        lengths = np.array([len(piece) for piece in current])
+        run_of_row = np.repeat(np.arange(len(active)), lengths)
+        keys = concat_chunks([piece[by] for piece in current]).reset_index(drop=True)
+        order = keys.sort_values(by=by, ascending=ascending, kind="stable").index.to_numpy()
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+        # The piece whose last row comes first bounds the rows that are already in their final place
+        bound = int(position[np.cumsum(lengths) - 1].min())
+        taken = order[:bound + 1]
+        yield concat_chunks(current).iloc[taken]
+
+        # The rows taken from a run are a prefix of its piece
+        counts = np.bincount(run_of_row[taken], minlength=len(active))
+        for k, i in enumerate(active):
+            pieces[i] = pieces[i].iloc[counts[k]:]
+            if len(pieces[i]) == 0:
+                pieces[i] = next_piece(runs[i])
+
+
+def top_k_rows(keys: pd.Series, n: int, ascending: bool = True, from_end: bool = False) -> np.ndarray | None:
+    """
+    Positions of the first `n` values (the last ones with `from_end`) of a stable sort of `keys` with
+    missing values last, in sorted order, selected with `argpartition` instead of a full sort.
+    None for the keys it cannot select on (multi-valued, plain strings).
+    """
+    dtype = keys.dtype
+    valid = keys.notna().to_numpy(dtype=bool)
+    if is_dictionary_strings(dtype) and dtype.categories.is_monotonic_increasing:
+        values = keys.cat.codes.to_numpy().astype(np.int64)
+    elif ptypes.is_bool_dtype(dtype) or ptypes.is_integer_dtype(dtype):
+        values = keys.to_numpy(dtype=np.int64, na_value=0)
+    elif ptypes.is_float_dtype(dtype):
+        values = keys.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = valid & ~np.isnan(values)
+    else:
+        return None
+    if not ascending:
+        # Order-reversing and exact (~x = -x - 1 cannot overflow), ties keep their order
+        values = -values if values.dtype == np.float64 else ~values
+
+    valid_rows, missing_rows = np.flatnonzero(valid), np.flatnonzero(~valid)
+    values, m = values[valid_rows], len(valid_rows)
+    if not from_end:
+        k = min(n, m)
+        if k == 0:
+            return missing_rows[:n]
+        kth = np.partition(values, k - 1)[k - 1]
+        candidates = np.flatnonzero(values <= kth)
+        best = candidates[np.argsort(values[candidates], kind="stable")][:k]
+        return np.concatenate([valid_rows[best], missing_rows[:n - k]])
+
+    # The last rows of the sort: the largest values, then the missing ones
+    if n <= len(missing_rows):
+        return missing_rows[len(missing_rows) - n:]
+    k = min(n - len(missing_rows), m)
+    kth = np.partition(values, m - k)[m - k]
+    candidates = np.flatnonzero(values >= kth)
+    best = candidates[np.argsort(values[candidates], kind="stable")][len(candidates) - k:]
+    return np.concatenate([valid_rows[best], missing_rows])
+
+
+def top_k(df: pd.DataFrame, by: list[str], n: int, ascending: bool = True, from_end: bool = False) -> pd.DataFrame:
+    """
+    First `n` rows (last ones with `from_end`) of `df.sort_values(by, ascending)` without sorting the whole
+    table, see top_k_rows. Ties are broken by row order. Falls back to a full sort for multiple or string keys.
+    """
+    if n <= 0:
+        return df.iloc[:0]
+    rows = top_k_rows(df[by[0]], n, ascending, from_end) if len(by) == 1 and n < len(df) else None
+    if rows is not None:
+        return df.iloc[rows]
+    ordered = df.sort_values(by=by, ascending=ascending, kind="stable")
+    return ordered.tail(n) if from_end else ordered.head(n)
+
+
+def optimize_plan(plan: KPlanNode) -> list[KPlanNode]:
+    """Linearizes a plan into [source, op, op, ...] and applies the rewrite rules."""
+    chain = []
+    node = plan
+    while node is not None:
+        chain.append(node)
+        node = node.child
+    chain.reverse()
+
+    source, ops = chain[0], chain[1:]
+
+    # Predicate pushdown: a row-local predicate selects the same rows before or after a sort
+    changed = True
+    while changed:
+        changed = False
+        for i in range(1, len(ops)):
+            if isinstance(ops[i], KPlanFilter) and ops[i].is_predicate and isinstance(ops[i - 1], KPlanSort):
+                ops[i - 1], ops[i] = ops[i], ops[i - 1]
+                changed = True
+
+    # Top-k: sort followed by head or tail
+    fused = []
+    for op in ops:
+        if isinstance(op, KPlanSlice) and fused and isinstance(fused[-1], KPlanSort):
+            fused[-1] = KPlanTopK(fused[-1], op._n, op._from_end)
+        else:
+            fused.append(op)
+
+    # The first operation on an in-memory table receives all its rows: sorts can use its column indexes
+    if isinstance(source, KPlanFrame) and fused and isinstance(fused[0], (KPlanSort, KPlanTopK)):
+        fused[0] = fused[0].on_frame(source)
+
+    return [source] + fused
+
+
+def execute_plan(plan: KPlanNode, columns: list[str] | None = None) -> pd.DataFrame:
+    """Executes a plan, returning only `columns` (all output columns by default)."""
+    chain = optimize_plan(plan)
+    source, ops = chain[0], chain[1:]
+    out_columns = list(columns) if columns is not None else plan.columns
+
+    # Schema at the input of every operation
+    schemas = [source.columns]
+    for op in ops:
+        schemas.append(op.output_columns(schemas[-1]))
+
+    # Projection pushdown: walk the plan backwards collecting the columns each step needs
+    needed = set(out_columns)
+    for op, input_columns in zip(reversed(ops), reversed(schemas[:-1])):
+        needed = op.needed_columns(needed, input_columns)
+    read_columns = [c for c in source.columns if c in needed]
+
+    # Row limit pushdown: head(n) preceded only by column operations
+    nrows = None
+    for op in ops:
+        if isinstance(op, KPlanSlice) and not op._from_end:
+            nrows = op._n
+            break
+        if not isinstance(op, (KPlanSelect, KPlanDrop, KPlanRename)):
+            break
+
+    # Filter pushdown: the predicates of the filters reached before any row operation
+    predicates = []
+    for op, input_columns in zip(ops, schemas):
+        if isinstance(op, KPlanFilter) and op.is_predicate:
+            # A source column dropped before the filter is no longer what the formula refers to
+            if op.condition.symbols & set(source.columns) <= set(input_columns):
+                predicates.append(op.condition)
+        elif not isinstance(op, (KPlanSelect, KPlanDrop)):
+            break
+
+    widened = set()
+    chunks = source.read_chunks(read_columns, nrows, predicates, widened)
+    for op in ops:
+        chunks = op.stream(chunks)
+    df = concat_chunks(list(chunks))
+    if widened and any(isinstance(op, KPlanJoin) for op in ops):
+        # The joined rows are numbered anew, the text read again cannot be matched to them:
+        # the plan runs again on the source read in one piece
+        df = source.read(read_columns, nrows)
+        for op in ops:
+            df = op.apply(df)
+        return df[out_columns]
+    if widened:
+        # The chunks read before a column was widened to strings hold its parsed values (e.g. 2.0 for "2"):
+        # its text is read again and taken by the index labels of the rows that reached the output
+        text = source.read_text(sorted(widened), nrows)
+        names = {name: name for name in widened}
+        for op, input_columns in zip(ops, schemas):
+            if isinstance(op, KPlanRename):
+                names = {src: op._mapping.get(name, name) for src, name in names.items()}
+            output = set(op.output_columns(input_columns))
+            names = {src: name for src, name in names.items() if name in output}
+        df = df.assign(**{name: text[src].loc[df.index] for src, name in names.items() if name in df.columns})
+    if not isinstance(source, KPlanFrame):
+        # Streamed chunks were read as plain strings
+        df = encode_strings(df)
+    return df[out_columns]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from kira.kdata.karray import KArray, is_dictionary_strings, is_string_dtype
+from kira.kdata.kliteral import KLiteral, KLiteralType
+
+# A string kernel maps a `string` Series to a Series of the same length (strings, integers or booleans)
+StringKernel = Callable[[pd.Series], pd.Series]
+
+
+def map_strings(values: pd.Series, kernel: StringKernel) -> pd.Series:
+    """
+    `kernel` applied to a string array through the pandas `.str` accessor (pyarrow compute for
+    Arrow-backed strings). Dictionary-encoded arrays run the kernel on their distinct values only:
+    string results stay encoded (with sorted categories), the others are taken back by code.
+    """
+    if not is_dictionary_strings(values.dtype):
+        return kernel(values.astype("string"))
+
+    mapped = kernel(pd.Series(values.cat.categories.astype("string")))
+    codes = values.cat.codes.to_numpy()
+    if is_string_dtype(mapped.dtype):
+        # Distinct values may map to the same string (e.g. upper of "a" and "A"): encoded again
+        new_codes, uniques = pd.factorize(mapped, sort=True)
+        codes = np.where(codes >= 0, new_codes[codes], -1)
+        dtype = pd.CategoricalDtype(pd.Index(uniques, dtype="string"))
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=values.index, name=values.name)
+    return pd.Series(mapped.array.take(codes, allow_fill=True), index=values.index, name=values.name)
+
+
+def string_function(x: KLiteral | KArray, kernel: StringKernel) -> KLiteral | KArray | None:
+    """
+    `kernel` applied to a string literal or array: a literal is computed as an array of one value.
+    None when the kernel gives a missing value for a literal, which a literal cannot hold.
+    """
+    if isinstance(x, KArray):
+        return KArray(map_strings(x.value, kernel))
+    result = kernel(pd.Series([str(x.value)], dtype="string")).iloc[0]
+    if pd.isna(result):
+        return None
+    return KLiteral(result.item() if hasattr(result, "item") else result)
+
+
+def to_strings(x: KLiteral | KArray) -> KLiteral | KArray:
+    """Any literal or array as strings; missing values stay missing."""
+    if isinstance(x, KArray):
+        if x.lit_type == KLiteralType.STRING:
+            return x
+        return KArray(x.value.astype("string"), KLiteralType.STRING)
+    return KLiteral(str(x.value), KLiteralType.STRING)
+
+
+def concat_strings(left: pd.Series | str, right: pd.Series | str) -> pd.Series:
+    """Element-wise concatenation of two string arrays, or of an array and a string, missing if either is."""
+    if isinstance(left, str) and is_dictionary_strings(right.dtype):
+        return map_strings(right, lambda values: left + values)
+    if isinstance(right, str) and is_dictionary_strings(left.dtype):
+        return map_strings(left, lambda values: values + right)
+    if isinstance(left, pd.Series) and isinstance(right, pd.Series):
+        # Positional, as the other element-wise operations
+        return pd.Series(left.astype("string").array + right.astype("string").array)
+    return (left.astype("string") if isinstance(left, pd.Series) else left) + \
+        (right.astype("string") if isinstance(right, pd.Series) else right)
+
+
+# Kernels of the string functions of the Table library
+
+def text_before(values: pd.Series, delimiter: str) -> pd.Series:
+    """The part before the first `delimiter`, missing where there is none. Named as `values`."""
+    parts = values.str.partition(delimiter)
+    return parts[0].where((parts[1] != "").fillna(False), pd.NA).astype("string").rename(values.name)
+
+
+def text_after(values: pd.Series, delimiter: str) -> pd.Series:
+    """The part after the first `delimiter`, missing where there is none. Named as `values`."""
+    parts = values.str.partition(delimiter)
+    return parts[2].where((parts[1] != "").fillna(False), pd.NA).astype("string").rename(values.name)
+
+
+def text_between(values: pd.Series, left: str, right: str) -> pd.Series:
+    """The part between the first `left` delimiter and the first `right` one after it, missing without them."""
+    return text_before(text_after(values, left), right)
+
+
+def split_strings(values: pd.Series, delimiter: str) -> pd.DataFrame:
+    """One column per part of the strings split on `delimiter` (part_0, part_1, ...), missing past the last part."""
+    parts = values.astype("string").str.split(delimiter, regex=False, expand=True)
+    parts.columns = [f"part_{i}" for i in range(parts.shape[1])]
+    return parts.astype("string").reset_index(drop=True)
+
+
+def join_strings(columns: list[pd.Series], delimiter: str) -> pd.Series:
+    """Row-wise concatenation of the string columns with `delimiter` between them, missing if a cell is."""
+    result = columns[0].astype("string").reset_index(drop=True)
+    for column in columns[1:]:
+        result = result + delimiter + column.astype("string").reset_index(drop=True)
+    return result
@@ -1,8 +1,60 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
 from kira.kdata.kdata import KData, KDataValue
 from kira.core.kobject import KTypeInfo, KObject
 
 import pandas as pd
 
+if TYPE_CHECKING:
+    from kira.kdata.kindex import KColumnIndex
+    from kira.kdata.kjoin import KJoinIndex
+    from kira.kdata.kplan import KPlanNode
+
+# Tables derived by the library share the column buffers of their parents: with copy-on-write a
+# column is only copied when one of the tables writes to it. Always on since pandas 3.
+_PANDAS_MAJOR = int(pd.__version__.split(".")[0])
+
+
+def derived_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    A new DataFrame with the columns of `df`, for a table derived from it: shallow under copy-on-write,
+    a deep copy when it is off (pandas 2 with its default options, which are left as they are).
+    Writing to either frame never changes the other.
+    """
+    copy_on_write = _PANDAS_MAJOR >= 3 or pd.get_option("mode.copy_on_write") is True
+    return df.copy(deep=not copy_on_write)
+
+
+# How loaders keep the tables they read: "pandas" (DataFrames) or "arrow" (pyarrow.Table, needs pyarrow)
+TABLE_BACKENDS = ("pandas", "arrow")
+_table_backend: ContextVar[str] = ContextVar("kira_table_backend", default="pandas")
+
+
+@contextmanager
+def table_backend_scope(backend: str):
+    """Selects the table backend of the evaluations run in the block (a project setting, see KEvaluator)."""
+    if backend not in TABLE_BACKENDS:
+        raise ValueError(f"Unknown table backend '{backend}', expected one of: {', '.join(TABLE_BACKENDS)}")
+    token = _table_backend.set(backend)
+    try:
+        yield
+    finally:
+        _table_backend.reset(token)
+
+
+def current_table_backend() -> str:
+    return _table_backend.get()
+
+
+def _is_arrow_table(data) -> bool:
+    # Checked by module so that pyarrow is not imported for pandas tables
+    return type(data).__module__.startswith("pyarrow") and hasattr(data, "column_names")
+
 
 class KTableTypeInfo(KTypeInfo):
 
@@ -18,14 +70,147 @@ class KTableTypeInfo(KTypeInfo):
 K_TABLE_TYPE = KTableTypeInfo()
 
 class KTable(KDataValue):
-    def __init__(self, data: pd.DataFrame):
-        assert isinstance(data, pd.DataFrame), "Data in the KTable must be a pandas DataFrame"
-        self._data = data
+    """
+    A table backed by a DataFrame, by a pyarrow.Table or by a lazy query plan (see kira.kdata.kplan).
+    A lazy table is materialized the first time its `value` is read; table functions
+    that understand plans extend the plan instead of forcing it.
+
+    Arrow tables (the "arrow" table backend) keep Arrow's columnar buffers: the table functions
+    that have an Arrow implementation (select, filter, sort_by, join, vstack) stay in Arrow, the
+    others read `value`, which converts the table to pandas once.
+
+    Tables are immutable: library functions derive new tables (sharing the unchanged columns,
+    see copy-on-write above) and never write to the DataFrame of their input.
+    """
+    def __init__(self, data: pd.DataFrame | KPlanNode):
+        from kira.kdata.kplan import KPlanNode
+
+        assert isinstance(data, (pd.DataFrame, KPlanNode)) or _is_arrow_table(data), \
+            "Data in the KTable must be a pandas DataFrame, a pyarrow Table or a query plan"
+        self._plan = data if isinstance(data, KPlanNode) else None
+        self._arrow = data if _is_arrow_table(data) else None
+        self._data = data if isinstance(data, pd.DataFrame) else None
+        self._columns_cache: dict[str, pd.Series] = {}
+        self._join_indexes: dict[tuple[str, ...], KJoinIndex] = {}
+        self._column_indexes: dict[str, KColumnIndex] = {}
+        self._lock = threading.Lock()
 
     @property
     def value(self):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    if self._arrow is not None:
+                        from kira.kdata.karrow import to_pandas
+
+                        self._data = to_pandas(self._arrow)
+                    else:
+                        self._data = self._plan.execute()
         return self._data
 
+    @property
+    def is_lazy(self) -> bool:
+        """True while the table is a plan that has not been materialized yet."""
+        return self._data is None and self._plan is not None
+
+    @property
+    def plan(self) -> KPlanNode | None:
+        return self._plan
+
+    @property
+    def is_arrow(self) -> bool:
+        return self._arrow is not None
+
+    @property
+    def arrow(self):
+        """The pyarrow.Table of an Arrow table, None otherwise."""
+        return self._arrow
+
+    @property
+    def columns(self) -> list[str]:
+        if self._arrow is not None:
+            return list(self._arrow.column_names)
+        if self._data is not None:
+            return list(self._data.columns)
+        return self._plan.columns
+
+    def has_column(self, name: str) -> bool:
+        if self._data is not None:
+            return name in self._data.columns
+        if self._arrow is not None:
+            return self._arrow.schema.get_field_index(name) >= 0
+        return name in self._plan.columns
+
+    def column(self, name: str) -> pd.Series:
+        """A single column, executing only the part of the plan (or converting only the Arrow column) it depends on."""
+        if self._data is not None:
+            return self._data[name]
+        if self._arrow is None and not self._plan.source.prunes_columns:
+            # Computing one column costs as much as the whole table (e.g. a sort of an in-memory table)
+            return self.value[name]
+        with self._lock:
+            if name not in self._columns_cache:
+                if self._arrow is not None:
+                    from kira.kdata.karrow import to_pandas
+
+                    self._columns_cache[name] = to_pandas(self._arrow.select([name]))[name]
+                else:
+                    self._columns_cache[name] = self._plan.execute([name])[name]
+            return self._columns_cache[name]
+
+    def join_index(self, on: list[str]) -> KJoinIndex:
+        """The join index of the table on the `on` columns, built on first use and shared by every join."""
+        from kira.kdata.kjoin import KJoinIndex
+
+        key = tuple(on)
+        if key not in self._join_indexes:
+            index = KJoinIndex(self.value, on)
+            with self._lock:
+                self._join_indexes.setdefault(key, index)
+        return self._join_indexes[key]
+
+    def has_join_index(self, on: list[str]) -> bool:
+        return tuple(on) in self._join_indexes
+
+    def column_index(self, name: str) -> KColumnIndex:
+        """The secondary index of a column (see kira.kdata.kindex), its parts are built as lookups need them."""
+        from kira.kdata.kindex import KColumnIndex
+
+        if name not in self._column_indexes:
+            index = KColumnIndex(self.column(name))
+            with self._lock:
+                self._column_indexes.setdefault(name, index)
+        return self._column_indexes[name]
+
+    def share_indexes(self, source: KTable, columns: dict[str, str] | None = None) -> KTable:
+        """
+        Gives the table the column and join indexes of `source`, for a table derived from it with the same
+        rows in the same order (e.g. by select or rename_column). Only the indexes of the columns the table
+        kept unchanged are shared: `columns` maps their names in `source` to their names here (default: the
+        columns with the same name). Returns the table.
+        """
+        if columns is None:
+            columns = {name: name for name in source._column_indexes if self.has_column(name)}
+        for name, index in source._column_indexes.items():
+            if name in columns:
+                self._column_indexes.setdefault(columns[name], index)
+        for on, index in source._join_indexes.items():
+            if all(name in columns for name in on):
+                self._join_indexes.setdefault(tuple(columns[name] for name in on), index)
+        return self
+
+    def index_state(self) -> dict[str, bytes]:
+        """The column indexes built so far, serialized to be stored alongside the table (see restore_indexes)."""
+        return {name: index.to_bytes() for name, index in self._column_indexes.items()}
+
+    def restore_indexes(self, state: dict[str, bytes]):
+        """Restores the column indexes returned by index_state, for the same table data."""
+        from kira.kdata.kindex import KColumnIndex
+
+        for name, data in state.items():
+            if self.has_column(name):
+                self._column_indexes[name] = KColumnIndex.from_bytes(self.column(name), data)
+
     @property
     def type(self) -> KTypeInfo:
         return KTableTypeInfo()
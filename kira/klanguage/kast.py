@@ -208,6 +208,20 @@ def _parse_workflow(stream: KTokenStream) -> AstWorkflow:
     raise SyntaxError("Missing return in workflow")
 
 
+def parse_expression(tokens: list[KToken], pipes: bool = True) -> AstExpression:
+    """
+    Parses `tokens` as a single expression, without the pipes `|>` outside brackets if `pipes` is False
+    (e.g. one stage of a pipeline). Raises SyntaxError if tokens are left after the expression.
+    """
+    stream = KTokenStream(tokens)
+    if stream.current is None:
+        raise SyntaxError("Expected an expression")
+    expr = _parse_expression(stream) if pipes else _parse_logic_or(stream)
+    if stream.current is not None:
+        raise SyntaxError(f"Unexpected token {stream.current} after the expression")
+    return expr
+
+
 def _parse_expression(stream: KTokenStream) -> AstExpression:
     return _parse_pipe(stream)
 
@@ -13,9 +13,8 @@ from kira.klanguage.kast import (
     AstProgram, AstAssignment, AstExpressionStmt, AstWorkflow,
     AstExpression, AstLiteral, AstSymbol, AstCall, AstFormula, AstArray, AstNode
 )
-from kira.klanguage.ktokenizer import ktokenize, KTokenType
-from kira.klanguage.kast import kparse
-from kira.klanguage.utils import token_hash_name
+from kira.klanguage.kcache import kparse_cached
+from kira.klanguage.utils import ast_digest, digest_name
 from kira.knodes.knode_instance import KNodeInstance
 from kira.knodes.kworkflow import KWorkflow
 from kira.ktypeinfo.any_type import KAnyTypeInfo
@@ -34,46 +33,58 @@ def kbuild_program(ast: AstProgram) -> KProgram:
 
 
 def kbuild_expression(expr: AstExpression, target_name: Optional[str]) -> KObject:
+    return _kbuild_expression(expr, target_name)[0]
+
+
+def _kbuild_expression(expr: AstExpression, target_name: Optional[str]) -> tuple[KObject, bytes]:
+    """Builds the expression and returns it with the digest of its subtree, used to name anonymous nodes."""
     if isinstance(expr, AstLiteral):
-        data_name = target_name if target_name is not None else token_hash_name(expr.token, "lit")
+        digest = ast_digest("lit", expr.token, [])
+        data_name = target_name if target_name is not None else digest_name(digest, "lit")
         data = KData(data_name, KLiteral(expr.value))
-        return data
+        return data, digest
 
     if isinstance(expr, AstSymbol):
+        digest = ast_digest("sym", expr.token, [], expr.name)
         sym = KSymbol(expr.name)
         if target_name:
             # Wrap in "identity node" if a target name is provided
-            return KNodeInstance(target_name, "identity", [sym])
-        return sym
+            return KNodeInstance(target_name, "identity", [sym]), digest
+        return sym, digest
 
     if isinstance(expr, AstCall):
         # Recurse build args
-        built_args = [kbuild_expression(arg, None) for arg in expr.args]
+        built = [_kbuild_expression(arg, None) for arg in expr.args]
+        built_args = [obj for obj, _ in built]
+        digest = ast_digest("call", expr.token, [d for _, d in built], expr.func_name)
 
-        inst_name = target_name if target_name is not None else token_hash_name(expr.token, "call")
-        return KNodeInstance(inst_name, expr.func_name, built_args)
+        inst_name = target_name if target_name is not None else digest_name(digest, "call")
+        return KNodeInstance(inst_name, expr.func_name, built_args), digest
 
     if isinstance(expr, AstFormula):
-        inner_obj = kbuild_expression(expr.expression, None)
-        inst_name = target_name if target_name is not None else token_hash_name(expr.token, "formula")
-        return KFormula(inst_name, inner_obj)
+        inner_obj, inner_digest = _kbuild_expression(expr.expression, None)
+        digest = ast_digest("formula", expr.token, [inner_digest])
+        inst_name = target_name if target_name is not None else digest_name(digest, "formula")
+        return KFormula(inst_name, inner_obj), digest
 
     if isinstance(expr, AstArray):
-        built_elements = [kbuild_expression(el, None) for el in expr.elements]
+        built = [_kbuild_expression(el, None) for el in expr.elements]
+        built_elements = [obj for obj, _ in built]
+        digest = ast_digest("array", expr.token, [d for _, d in built])
         
         # Check if all elements are constant (KData)
         is_constant = all(isinstance(el, KData) for el in built_elements)
         
-        inst_name = target_name if target_name is not None else token_hash_name(expr.token, "array")
+        inst_name = target_name if target_name is not None else digest_name(digest, "array")
         
         if is_constant:
             # All elements are literals, we can collapse into a single KData
             values = [el.value.value for el in built_elements]
-            return KData(inst_name, KArray(np.array(values)))
+            return KData(inst_name, KArray(np.array(values))), digest
         else:
             # Reactive array: create a specialized node for this arity
             node = _create_array_node(len(built_elements))
-            return KNodeInstance(inst_name, node, built_elements)
+            return KNodeInstance(inst_name, node, built_elements), digest
 
     raise ValueError(f"Unknown AST expression type: {type(expr)}")
 
@@ -132,10 +143,9 @@ def kbuild_workflow(ast_wf: AstWorkflow) -> KWorkflow:
 def keval_script(src: str) -> KObject:
     """
     Parses and builds a Kira script string into a KObject.
-    Handles tokenization (filtering whitespace), parsing, and recursive building.
+    Handles tokenization, parsing, and recursive building.
     """
-    tokens = [t for t in ktokenize(src.strip()) if t.token_type != KTokenType.WHITESPACE]
-    ast = kparse(tokens)
+    ast = kparse_cached(src)
 
     if isinstance(ast, AstWorkflow):
         return kbuild_workflow(ast)
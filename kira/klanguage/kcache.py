@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+from kira.klanguage.kast import AstNode, kparse
+from kira.klanguage.ktokenizer import ktokenize
+
+
+class KParseCache:
+    """
+    Bounded, thread-safe LRU cache from source text to its AST.
+
+    The key is the stripped source, so the same code typed with different surrounding
+    whitespace is parsed once. Cached ASTs are shared between callers and must not be
+    modified. Built KObjects are not cached: node instances and symbols keep evaluation
+    state (resolved nodes, frame slots), so every caller builds its own from the AST.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, AstNode] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, src: str) -> AstNode:
+        key = src.strip()
+        with self._lock:
+            ast = self._entries.get(key)
+            if ast is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return ast
+            self.misses += 1
+
+        # Parse outside the lock, syntax errors are raised and not cached
+        ast = kparse(ktokenize(key))
+        self.put(key, ast)
+        return ast
+
+    def put(self, src: str, ast: AstNode):
+        """Stores an AST built by another parser (e.g. the incremental pipeline parser)."""
+        key = src.strip()
+        with self._lock:
+            self._entries[key] = ast
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_default_cache = KParseCache()
+
+
+def kparse_cached(src: str) -> AstNode:
+    """Tokenizes and parses `src`, reusing the AST of previously seen code."""
+    return _default_cache.parse(src)
+
+
+def get_parse_cache() -> KParseCache:
+    return _default_cache
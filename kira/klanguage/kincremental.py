@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from kira.klanguage.kast import (AstNode, AstExpression, AstAssignment, AstExpressionStmt, AstCall, AstSymbol,
+                                 parse_expression)
+from kira.klanguage.kcache import get_parse_cache, kparse_cached
+from kira.klanguage.ktokenizer import KToken, KTokenType, ktokenize
+
+_STAGE_CACHE_SIZE = 4096
+# Stage ASTs by the text of their tokens, with the tokens they were parsed from
+_stage_cache: OrderedDict[tuple, tuple[list[KToken], AstExpression]] = OrderedDict()
+_stage_lock = threading.Lock()
+
+
+@dataclass
+class KPipelineParse:
+    code: str
+    target: Optional[str]
+    # Key of every stage: the types and text of its tokens, a stage that only moved keeps its key
+    stage_keys: list[tuple]
+    # AST of each stage on its own (the source for stage 0, the piped call for the others)
+    stage_asts: list[AstExpression]
+    # composed[i] is the expression of the pipeline up to and including stage i
+    composed: list[AstExpression]
+    ast: AstNode
+
+
+@dataclass
+class KPipelineDiff:
+    # Index of the first stage that differs from the previous parse, None if nothing changed.
+    # When stages were only removed it is the old length and `changed` is empty.
+    first_changed: Optional[int]
+    unchanged: list[int] = field(default_factory=list)
+    changed: list[int] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.first_changed is None
+
+
+def _split_stages(tokens: list[KToken]) -> list[list[KToken]]:
+    """Splits the tokens by the |> that are outside brackets and formulas."""
+    stages = [[]]
+    depth = 0
+    in_formula = False
+    for token in tokens:
+        t = token.token_type
+        if t in (KTokenType.OPEN_BRACKET, KTokenType.OPEN_SQUARE_BRACKET):
+            depth += 1
+        elif t in (KTokenType.CLOSE_BRACKET, KTokenType.CLOSE_SQUARE_BRACKET):
+            depth -= 1
+        elif t == KTokenType.DOLLAR:
+            in_formula = not in_formula
+        elif t == KTokenType.PIPE and depth == 0 and not in_formula:
+            stages.append([])
+            continue
+        stages[-1].append(token)
+    return stages
+
+
+def _relocate(node, tokens: dict[int, KToken]):
+    """A copy of an AST whose tokens are replaced by the tokens at the same place of another parse."""
+    if isinstance(node, KToken):
+        return tokens.get(id(node), node)
+    if isinstance(node, list):
+        return [_relocate(item, tokens) for item in node]
+    if isinstance(node, AstNode):
+        return dataclasses.replace(node, **{f.name: _relocate(getattr(node, f.name), tokens)
+                                            for f in dataclasses.fields(node)})
+    return node
+
+
+def _parse_stage(tokens: list[KToken], key: tuple, is_source: bool) -> AstExpression | None:
+    """
+    Parses one stage, None if its tokens are more than one expression. A stage parsed before at another
+    position (e.g. after an edit of an earlier stage) is taken from the cache with its positions updated.
+    """
+    key = (is_source, key)
+    with _stage_lock:
+        cached = _stage_cache.get(key)
+        if cached is not None:
+            _stage_cache.move_to_end(key)
+    if cached is not None:
+        cached_tokens, ast = cached
+        if cached_tokens == tokens:
+            return ast
+        ast = _relocate(ast, {id(old): new for old, new in zip(cached_tokens, tokens)})
+    else:
+        if not tokens:
+            raise SyntaxError("Expected an expression around pipe |>")
+        try:
+            ast = parse_expression(tokens, pipes=False)
+        except SyntaxError:
+            # Parsed as a whole by the caller, which reports the error of the statement
+            return None
+        if not is_source and not isinstance(ast, (AstCall, AstSymbol)):
+            raise SyntaxError(f"Right side of pipe |> must be a function call or symbol, got {type(ast).__name__}")
+
+    # A moved stage is cached at its new position, the next parse of the same code reuses it as is
+    with _stage_lock:
+        _stage_cache[key] = (tokens, ast)
+        while len(_stage_cache) > _STAGE_CACHE_SIZE:
+            _stage_cache.popitem(last=False)
+    return ast
+
+
+def _compose(left: AstExpression, right: AstExpression) -> AstCall:
+    # Same desugaring as kast._parse_pipe
+    if isinstance(right, AstCall):
+        return AstCall(right.func_name, [left] + right.args, right.token)
+    return AstCall(right.name, [left], right.token)
+
+
+def kparse_pipeline(code: str, previous: KPipelineParse | None = None) -> tuple[KPipelineParse, KPipelineDiff]:
+    """
+    Parses a single assignment or expression (`x = source |> step |> step ...`) stage by stage.
+
+    Every pipe stage is parsed on its own and cached by the type and text of its tokens, so editing
+    a step only parses the stages whose text changed (the others only get their new positions).
+    The pipeline AST is composed the same way `kparse` desugars `|>`, reusing the composed nodes of
+    the stages before the first one that differs from `previous`. Returns the parse and the stages
+    that changed. Code that is not a single statement (e.g. workflows) is parsed as a whole and
+    reported as one changed stage.
+    """
+    code = code.strip()
+    tokens = ktokenize(code)
+
+    target = None
+    assign_token = None
+    if len(tokens) >= 2 and tokens[0].token_type == KTokenType.SYMBOL and tokens[1].token_type == KTokenType.ASSIGN:
+        target = tokens[0].sym_str
+        assign_token = tokens[1]
+        tokens = tokens[2:]
+
+    stage_asts = None
+    if tokens and not any(t.token_type in (KTokenType.WORKFLOW, KTokenType.END_LINE) for t in tokens):
+        stage_tokens = _split_stages(tokens)
+        stage_keys = [tuple((t.sym_str, t.token_type) for t in stage) for stage in stage_tokens]
+        stage_asts = [_parse_stage(stage, key, i == 0) for i, (stage, key) in enumerate(zip(stage_tokens, stage_keys))]
+
+    if stage_asts is None or any(ast is None for ast in stage_asts):
+        ast = kparse_cached(code)
+        parse = KPipelineParse(code, target, [(code,)], [], [], ast)
+        return parse, KPipelineDiff(0, [], [0])
+
+    # First stage that differs from the previous parse
+    first_changed = None
+    reusable = previous is not None and previous.target == target and bool(previous.composed)
+    for i, key in enumerate(stage_keys):
+        if not reusable or i >= len(previous.stage_keys) or previous.stage_keys[i] != key:
+            first_changed = i
+            break
+    if first_changed is None and reusable and len(previous.stage_keys) != len(stage_keys):
+        first_changed = len(stage_keys)
+
+    # Composed nodes are reused while the stages are the same parse (a stage that moved is a new one)
+    keep = 0
+    if reusable:
+        last = first_changed if first_changed is not None else len(stage_keys)
+        while keep < last and previous.stage_asts[keep] is stage_asts[keep]:
+            keep += 1
+    composed = list(previous.composed[:keep]) if reusable else []
+    for i in range(len(composed), len(stage_asts)):
+        composed.append(stage_asts[0] if i == 0 else _compose(composed[-1], stage_asts[i]))
+
+    expr = composed[-1]
+    ast = AstAssignment(target, expr, assign_token) if target is not None else AstExpressionStmt(expr)
+    if reusable and first_changed is None and keep == len(stage_keys) \
+            and getattr(previous.ast, "token", None) == assign_token:
+        # Same structure: keep the previous AST object as well
+        ast = previous.ast
+    get_parse_cache().put(code, ast)
+
+    parse = KPipelineParse(code, target, stage_keys, stage_asts, composed, ast)
+
+    if first_changed is None:
+        return parse, KPipelineDiff(None, list(range(len(stage_keys))), [])
+    changed = list(range(first_changed, len(stage_keys)))
+    return parse, KPipelineDiff(first_changed, list(range(min(first_changed, len(stage_keys)))), changed)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import marshal
+import sys
+from typing import Optional
+
+import numpy as np
+
+import kira
+from kira.core.kformula import KFormula
+from kira.core.kobject import KObject
+from kira.core.ksymbol import KSymbol
+from kira.kdata.karray import KArray
+from kira.kdata.kdata import KData, KDataValue
+from kira.kdata.kliteral import KLiteral
+from kira.klanguage.kbuilder import _create_array_node
+from kira.knodes.knode_instance import KNodeInstance
+from kira.knodes.kworkflow import KWorkflow
+
+# Bump when the encoding below changes, older blobs are then rebuilt from source
+KPROGRAM_FORMAT = 1
+_MAGIC = b"KPRG"
+
+# Opcodes of the encoded objects
+_OP_LITERAL = 0
+_OP_ARRAY = 1
+_OP_SYMBOL = 2
+_OP_CALL = 3
+_OP_FORMULA = 4
+_OP_WORKFLOW = 5
+
+
+def _encode_value(value: KDataValue) -> tuple:
+    if isinstance(value, KLiteral):
+        literal = value.value
+        return _OP_LITERAL, literal.item() if isinstance(literal, np.generic) else literal
+    if isinstance(value, KArray):
+        return _OP_ARRAY, tuple(value.value.tolist())
+    raise TypeError(f"Cannot serialize value of type {type(value).__name__}")
+
+
+def _decode_value(code: tuple) -> KDataValue:
+    op, value = code
+    if op == _OP_LITERAL:
+        return KLiteral(value)
+    if op == _OP_ARRAY:
+        return KArray(np.array(list(value)))
+    raise ValueError(f"Unknown value opcode {op}")
+
+
+def _encode(obj: KObject) -> tuple:
+    if isinstance(obj, KData):
+        return (obj.name,) + _encode_value(obj.value)
+    if isinstance(obj, KSymbol):
+        return obj.name, _OP_SYMBOL
+    if isinstance(obj, KNodeInstance):
+        # Array nodes are built inline by the builder, they are stored by their arity
+        target = obj.target_name
+        if target == f"array_{len(obj.node_inputs)}":
+            target = len(obj.node_inputs)
+        return obj.name, _OP_CALL, target, tuple(_encode(node_input) for node_input in obj.node_inputs)
+    if isinstance(obj, KFormula):
+        return obj.name, _OP_FORMULA, _encode(obj.expression)
+    if isinstance(obj, KWorkflow):
+        defaults = tuple((name, _encode_value(value)) for name, value in obj.default_inputs.items())
+        return (obj.name, _OP_WORKFLOW, tuple(obj.input_names), tuple(obj.output_names),
+                tuple(obj.output_symbols), tuple(_encode(node) for node in obj.nodes), defaults)
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+
+def _decode(code: tuple) -> KObject:
+    name, op = code[0], code[1]
+    if op in (_OP_LITERAL, _OP_ARRAY):
+        return KData(name, _decode_value(code[1:]))
+    if op == _OP_SYMBOL:
+        return KSymbol(name)
+    if op == _OP_CALL:
+        target = code[2]
+        node = _create_array_node(target) if isinstance(target, int) else target
+        return KNodeInstance(name, node, [_decode(node_input) for node_input in code[3]])
+    if op == _OP_FORMULA:
+        return KFormula(name, _decode(code[2]))
+    if op == _OP_WORKFLOW:
+        _, _, inputs, outputs, output_symbols, nodes, defaults = code
+        return KWorkflow(name, list(inputs), list(outputs), list(output_symbols),
+                         nodes=[_decode(node) for node in nodes],
+                         default_inputs={key: _decode_value(value) for key, value in defaults})
+    raise ValueError(f"Unknown opcode {op}")
+
+
+def _header(signature: str) -> tuple:
+    return KPROGRAM_FORMAT, kira.__version__, tuple(sys.version_info[:2]), signature
+
+
+def kdump_program(obj: KObject, symbols: set[str], signature: str) -> bytes:
+    """
+    Serializes a built assignment or workflow together with the symbols its source refers to.
+    The header records the format, the Kira version, the Python version (marshal's format is
+    only stable within one) and the signature of the libraries the program was built against,
+    a blob is only loaded back by a matching environment.
+    """
+    return _MAGIC + marshal.dumps((_header(signature), tuple(sorted(symbols)), _encode(obj)))
+
+
+def kload_program(blob: bytes, signature: str) -> Optional[tuple[KObject, set[str]]]:
+    """Rebuilds the object serialized by kdump_program, None if the blob is stale or unreadable."""
+    if not blob.startswith(_MAGIC):
+        return None
+    try:
+        header, symbols, code = marshal.loads(blob[len(_MAGIC):])
+        if header != _header(signature):
+            return None
+        return _decode(code), set(symbols)
+    except (EOFError, ValueError, TypeError, IndexError):
+        return None
@@ -1,4 +1,5 @@
 import enum
+import re
 from typing import NamedTuple
 
 
@@ -51,164 +52,97 @@ class KTokenType(enum.Enum):
 class KToken(NamedTuple):
     sym_str: str
     token_type: KTokenType
-
-
-def ktokenize(expression: str):
-    stop_idx = 0
-
+    # 1-based position of the first character of the token in the source, 0 if unknown
+    line: int = 0
+    column: int = 0
+
+
+_OPERATORS = {
+    "->": KTokenType.ARROW,
+    "|>": KTokenType.PIPE,
+    ">=": KTokenType.EQUALS_GREATER_THAN,
+    "<=": KTokenType.EQUALS_LESS_THAN,
+    "!=": KTokenType.NOT_EQUALS,
+    "==": KTokenType.EQUALS,
+    "(": KTokenType.OPEN_BRACKET,
+    ")": KTokenType.CLOSE_BRACKET,
+    ",": KTokenType.COMMA,
+    ".": KTokenType.DOT,
+    ":": KTokenType.COLON,
+    ";": KTokenType.SEMICOLON,
+    "[": KTokenType.OPEN_SQUARE_BRACKET,
+    "]": KTokenType.CLOSE_SQUARE_BRACKET,
+    "$": KTokenType.DOLLAR,
+    "+": KTokenType.PLUS,
+    "-": KTokenType.MINUS,
+    "*": KTokenType.MULTIPLY,
+    "/": KTokenType.DIVIDE,
+    "^": KTokenType.EXPONENT,
+    ">": KTokenType.GREATER_THAN,
+    "<": KTokenType.LESS_THAN,
+    "!": KTokenType.NOT,
+    "=": KTokenType.ASSIGN,
+}
+
+_KEYWORDS = {
+    "and": KTokenType.AND,
+    "or": KTokenType.OR,
+    "workflow": KTokenType.WORKFLOW,
+    "return": KTokenType.RETURN,
+    "true": KTokenType.BOOLEAN,
+    "false": KTokenType.BOOLEAN,
+}
+
+# One alternative per lexical class, tried in order at every position. Two-character
+# operators come before their one-character prefixes, numbers before the dot operator.
+_TOKEN_RE = re.compile("|".join([
+    r"(?P<skip>[ \t]+|\#[^\n]*)",
+    r"(?P<newline>\n)",
+    r"(?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)",
+    r"(?P<string>\"[^\"]*\"|'[^']*')",
+    r"(?P<word>[^\W\d]\w*)",
+    "(?P<op>" + "|".join(re.escape(op) for op in _OPERATORS) + ")",
+    r"(?P<error>.)",
+]), re.DOTALL)
+
+
+def ktokenize(expression: str) -> list[KToken]:
+    """
+    Splits the source into tokens in a single pass. Whitespace and comments are skipped,
+    every token records the line and column it starts at.
+    """
     tokens = []
-
-    while stop_idx < len(expression):
-        char = expression[stop_idx]
-
-        if char in KTokenType.OPEN_BRACKET.value:
-            tokens.append(KToken(char, KTokenType.OPEN_BRACKET))
-        elif char in KTokenType.CLOSE_BRACKET.value:
-            tokens.append(KToken(char, KTokenType.CLOSE_BRACKET))
-        elif char in KTokenType.COMMA.value:
-            tokens.append(KToken(char, KTokenType.COMMA))
-        elif char in KTokenType.DOT.value:
-            # Check if it's a number starting with dot (e.g. .89)
-            if stop_idx + 1 < len(expression) and expression[stop_idx + 1].isdigit():
-                start_idx = stop_idx
-                stop_idx += 1
-                while stop_idx < len(expression) and expression[stop_idx].isdigit():
-                    stop_idx += 1
-                # Support scientific notation
-                if stop_idx < len(expression) and expression[stop_idx] in "eE":
-                    e_pos = stop_idx
-                    stop_idx += 1
-                    if stop_idx < len(expression) and expression[stop_idx] in "+-":
-                        stop_idx += 1
-                    if stop_idx < len(expression) and expression[stop_idx].isdigit():
-                        while stop_idx < len(expression) and expression[stop_idx].isdigit():
-                            stop_idx += 1
-                    else:
-                        stop_idx = e_pos # Backtrack
-                tokens.append(KToken(expression[start_idx:stop_idx], KTokenType.NUMBER))
-                stop_idx -= 1
-            else:
-                tokens.append(KToken(char, KTokenType.DOT))
-        elif char in KTokenType.COLON.value:
-            tokens.append(KToken(char, KTokenType.COLON))
-        elif char in KTokenType.SEMICOLON.value:
-            tokens.append(KToken(char, KTokenType.SEMICOLON))
-        elif char in KTokenType.END_LINE.value:
-            tokens.append(KToken(char, KTokenType.END_LINE))
-        elif char in KTokenType.WHITESPACE.value:
-            start_idx = stop_idx
-            while stop_idx < len(expression) and expression[stop_idx] in KTokenType.WHITESPACE.value:
-                stop_idx += 1
-            tokens.append(KToken(expression[start_idx:stop_idx], KTokenType.WHITESPACE))
-            stop_idx -= 1
-        elif char in KTokenType.GREATER_THAN.value: # = ">" || ">="
-            if stop_idx + 1 < len(expression) and expression[stop_idx + 1] == "=":
-                tokens.append(KToken(char + expression[stop_idx + 1], KTokenType.EQUALS_GREATER_THAN))
-                stop_idx += 1
-            else:
-                tokens.append(KToken(char, KTokenType.GREATER_THAN))
-        elif char in KTokenType.LESS_THAN.value: # = "<" || "<="
-            if stop_idx + 1 < len(expression) and expression[stop_idx + 1] == "=":
-                tokens.append(KToken(char + expression[stop_idx + 1], KTokenType.EQUALS_LESS_THAN))
-                stop_idx += 1
-            else:
-                tokens.append(KToken(char, KTokenType.LESS_THAN))
-        elif char in KTokenType.NOT.value: # = "!" || "!="
-            if stop_idx + 1 < len(expression) and expression[stop_idx + 1] == "=":
-                tokens.append(KToken(char + expression[stop_idx + 1], KTokenType.NOT_EQUALS))
-                stop_idx += 1
-            else:
-                tokens.append(KToken(char, KTokenType.NOT))
-        elif char in KTokenType.ASSIGN.value: # = "=" || "=="
-            if stop_idx + 1 < len(expression) and expression[stop_idx + 1] == "=":
-                tokens.append(KToken(char + expression[stop_idx + 1], KTokenType.EQUALS))
-                stop_idx += 1
-            else:
-                tokens.append(KToken(char, KTokenType.ASSIGN))
-        elif char in KTokenType.OPEN_SQUARE_BRACKET.value:
-            tokens.append(KToken(char, KTokenType.OPEN_SQUARE_BRACKET))
-        elif char in KTokenType.CLOSE_SQUARE_BRACKET.value:
-            tokens.append(KToken(char, KTokenType.CLOSE_SQUARE_BRACKET))
-        elif char in KTokenType.DOLLAR.value:
-            tokens.append(KToken(char, KTokenType.DOLLAR))
-        elif char in KTokenType.PLUS.value:
-            tokens.append(KToken(char, KTokenType.PLUS))
-        elif char in KTokenType.MINUS.value:
-            if stop_idx + 1 < len(expression) and expression[stop_idx + 1] == ">":
-                tokens.append(KToken(char + expression[stop_idx + 1], KTokenType.ARROW))
-                stop_idx += 1
-            else:
-                tokens.append(KToken(char, KTokenType.MINUS))
-        elif char in KTokenType.MULTIPLY.value:
-            tokens.append(KToken(char, KTokenType.MULTIPLY))
-        elif char in KTokenType.DIVIDE.value:
-            tokens.append(KToken(char, KTokenType.DIVIDE))
-        elif char in KTokenType.EXPONENT.value:
-            tokens.append(KToken(char, KTokenType.EXPONENT))
-        elif char == "|":
-            if stop_idx + 1 < len(expression) and expression[stop_idx + 1] == ">":
-                tokens.append(KToken(char + expression[stop_idx + 1], KTokenType.PIPE))
-                stop_idx += 1
-            else:
-                raise SyntaxError(f"Unexpected character '|' at {stop_idx}")
-        elif char in KTokenType.STRING.value:
-            quote_char = char
-            stop_idx += 1
-            start_idx = stop_idx
-            while stop_idx < len(expression) and expression[stop_idx] != quote_char:
-                stop_idx += 1
-            if stop_idx >= len(expression):
-                raise SyntaxError(f"Unterminated string literal at {start_idx-1}")
-            tokens.append(KToken(expression[start_idx:stop_idx], KTokenType.STRING))
-        elif char.isdigit():
-            start_idx = stop_idx
-            while stop_idx < len(expression) and expression[stop_idx].isdigit():
-                stop_idx += 1
-            if stop_idx < len(expression) and expression[stop_idx] == ".":
-                stop_idx += 1
-                while stop_idx < len(expression) and expression[stop_idx].isdigit():
-                    stop_idx += 1
-            if stop_idx < len(expression) and expression[stop_idx] in "eE":
-                e_pos = stop_idx
-                stop_idx += 1
-                if stop_idx < len(expression) and expression[stop_idx] in "+-":
-                    stop_idx += 1
-                if stop_idx < len(expression) and expression[stop_idx].isdigit():
-                    while stop_idx < len(expression) and expression[stop_idx].isdigit():
-                        stop_idx += 1
-                else:
-                    stop_idx = e_pos # Backtrack
-            tokens.append(KToken(expression[start_idx:stop_idx], KTokenType.NUMBER))
-            stop_idx -= 1
-        elif char == "#":
-            # Consume the rest of the line as a comment
-            while stop_idx < len(expression) and expression[stop_idx] != "\n":
-                stop_idx += 1
-            stop_idx -= 1
+    line = 1
+    line_start = 0
+
+    for match in _TOKEN_RE.finditer(expression):
+        kind = match.lastgroup
+        start = match.start()
+        text = match.group()
+
+        if kind == "skip":
+            continue
+
+        column = start - line_start + 1
+        if kind == "newline":
+            tokens.append(KToken(text, KTokenType.END_LINE, line, column))
+            line += 1
+            line_start = match.end()
+        elif kind == "number":
+            tokens.append(KToken(text, KTokenType.NUMBER, line, column))
+        elif kind == "word":
+            tokens.append(KToken(text, _KEYWORDS.get(text, KTokenType.SYMBOL), line, column))
+        elif kind == "op":
+            tokens.append(KToken(text, _OPERATORS[text], line, column))
+        elif kind == "string":
+            tokens.append(KToken(text[1:-1], KTokenType.STRING, line, column))
+            newlines = text.count("\n")
+            if newlines:
+                line += newlines
+                line_start = start + text.rindex("\n") + 1
+        elif text in KTokenType.STRING.value:
+            raise SyntaxError(f"Unterminated string literal at {start} (line {line}, column {column})")
         else:
-            start_idx = stop_idx
-            while stop_idx < len(expression) and (expression[stop_idx].isalnum() or expression[stop_idx] == "_"):
-                stop_idx += 1
-
-            word = expression[start_idx:stop_idx]
-            if not word:
-                raise SyntaxError(f"Unexpected character '{char}' at index {stop_idx}")
-
-            if word == "and":
-                tokens.append(KToken(word, KTokenType.AND))
-            elif word == "or":
-                tokens.append(KToken(word, KTokenType.OR))
-            elif word == "workflow":
-                tokens.append(KToken(word, KTokenType.WORKFLOW))
-            elif word == "return":
-                tokens.append(KToken(word, KTokenType.RETURN))
-            elif word in ("true", "false"):
-                tokens.append(KToken(word, KTokenType.BOOLEAN))
-            else:
-                tokens.append(KToken(word, KTokenType.SYMBOL))
-
-            stop_idx -= 1
-
-        stop_idx += 1
+            raise SyntaxError(f"Unexpected character '{text}' at index {start} (line {line}, column {column})")
 
     return tokens
@@ -1,11 +1,27 @@
 from __future__ import annotations
 
+import hashlib
+
 from kira.klanguage.ktokenizer import KToken
 
 
-def token_hash_name(token: KToken, name: str, hash_limit=100_000_000) -> str:
-    token_hash = abs(hash(token)) % hash_limit
-    return f"{name}_{token_hash:08d}"
+def ast_digest(kind: str, token: KToken, children: list[bytes], label: str = "") -> bytes:
+    """
+    Merkle hash of an AST node: its kind, label, token (content and type) and the digests of its
+    children. Unlike hash(), it is the same in every process, so it can be used to identify nodes
+    across sessions. Positions are left out: the same code gives the same digest wherever it is
+    written, and anonymous nodes computing the same value share a name.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{kind}\x00{label}\x00{token.sym_str}\x00{token.token_type.name}".encode())
+    for child in children:
+        h.update(b"\x01")
+        h.update(child)
+    return h.digest()
+
+
+def digest_name(digest: bytes, name: str) -> str:
+    return f"{name}_{digest.hex()}"
 
 
 def print_depth_ast(depth):
@@ -1,7 +1,7 @@
 from collections.abc import Callable
 
 from kira.core.kcontext import KContext
-from kira.kdata.kdata import KData, KDataValue
+from kira.kdata.kdata import KData, KDataValue, KDataValueError
 from kira.core.kobject import KTypeInfo
 from kira.knodes.knode import KNode, KNodeType
 
@@ -15,10 +15,12 @@ class KFunction(KNode):
                  func: Callable[[list[KData], KContext], list[KDataValue]],
                  inputs: list[tuple[str, KTypeInfo] | str],
                  outputs: list[tuple[str, KTypeInfo] | str],
-                 default_inputs: dict[str, KDataValue] | None = None
+                 default_inputs: dict[str, KDataValue] | None = None,
+                 vectorizable: bool = False
                  ):
         super().__init__(name, inputs, outputs, default_inputs=default_inputs)
         self._func = func
+        self._vectorizable = vectorizable
 
     def call(self, inputs: list[KData], context: KContext) -> list[KDataValue]:
         return self._func(inputs, context)
@@ -34,7 +36,8 @@ def kfunction(
         name: str = None,
         use_context: bool = False,
         use_values: bool = True,
-        default_inputs: dict[str, KDataValue] | None = None
+        default_inputs: dict[str, KDataValue] | None = None,
+        vectorizable: bool = False
 ):
     def decorator(func: Callable):
         sig = inspect.signature(func)
@@ -66,14 +69,21 @@ def kfunction(
                         return [KErrorValue(val.error)]
                 values = [i.value for i in values]
 
-            return func(*values, context=context) if use_context else func(*values)
+            try:
+                return func(*values, context=context) if use_context else func(*values)
+            except KDataValueError as e:
+                # A lazy input failed to materialize (e.g. a filter condition of the wrong length)
+                from kira.kdata.kerrorvalue import KErrorValue
+                from kira.kexpections.kgenericexception import KGenericException
+                return [KErrorValue(KGenericException(str(e))) for _ in outputs]
 
         return KFunction(
             name=name or func.__name__,
             func=wrapper,
             inputs=inputs,
             outputs=outputs,
-            default_inputs=default_inputs
+            default_inputs=default_inputs,
+            vectorizable=vectorizable
         )
 
     return decorator
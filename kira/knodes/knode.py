@@ -55,6 +55,7 @@ class KNode(KObject):
                                                 outputs]
         self._default_inputs = default_inputs or {}
         self._has_variadic = bool(self._input_types) and isinstance(self._input_types[-1], KVariadicTypeInfo)
+        self._vectorizable = False
 
     def eval(self, context: KContext) -> KNode:
         context.register_object(self)
@@ -113,6 +114,13 @@ class KNode(KObject):
 
         return kdata_list
 
+    def is_vectorizable(self, context: KContext) -> bool:
+        """
+        True if calling the node on whole arrays gives the same result as calling it element by
+        element (e.g. element-wise numpy functions), so it can be applied to a column in one call.
+        """
+        return self._vectorizable
+
     @property
     def input_names(self) -> list[str]:
         return self._input_names
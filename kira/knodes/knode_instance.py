@@ -3,7 +3,7 @@ from __future__ import annotations
 from kira.kdata.kdata import KData
 from kira.core.kcontext import KContext
 from kira.core.kobject import KObject, KTypeInfo
-from kira.core.kformula import KFormula
+from kira.core.kformula import KFormula, KFormulaContext, KFormulaValue, accepts_formula
 from kira.kdata.kcollection import KCollection, KCollectionTypeInfo
 from kira.kdata.ktable import KTable
 from kira.kdata.karray import KArray
@@ -45,9 +45,23 @@ class KNodeInstance(KObject):
     def type(self) -> KTypeInfo:
         return KNodeInstanceTypeInfo()
 
+    @property
+    def target_name(self) -> str:
+        return self._target_name
+
+    @property
+    def node_inputs(self) -> list[KObject]:
+        return self._node_inputs
+
+    @property
+    def referenced_symbols(self) -> set[str]:
+        symbols = set()
+        for node_input in self._node_inputs:
+            symbols |= node_input.referenced_symbols
+        return symbols
+
     def eval(self, context: KContext) -> KData:
         local_context = KContext(context)
-        formulas_context = KContext(context)
 
         # Resolve node if not already resolved
         if self._node is None:
@@ -70,10 +84,20 @@ class KNodeInstance(KObject):
             context.register_object(result)
             return result
 
+        # Formulas bound to inputs that accept them are handed to the node unevaluated
+        # (e.g. a filter predicate pushed into a lazy table plan)
+        deferred = [isinstance(node_input, KFormula) and i < num_fixed and accepts_formula(self._node.input_types[i])
+                    for i, node_input in enumerate(self._node_inputs)]
+        has_formulas = any(isinstance(node_input, KFormula) and not deferred[i]
+                           for i, node_input in enumerate(self._node_inputs))
+        formulas_context = KFormulaContext(context) if has_formulas else None
+
         # 1. Evaluate all inputs
         evaluated = []
         for i, node_input in enumerate(self._node_inputs):
-            if isinstance(node_input, KFormula):
+            if deferred[i]:
+                res = KData(node_input.name, KFormulaValue(node_input, context))
+            elif isinstance(node_input, KFormula):
                 res = node_input.eval(formulas_context)
             else:
                 res = node_input.eval(local_context)
@@ -82,11 +106,10 @@ class KNodeInstance(KObject):
                 input_name = self._node.input_names[i] if i < num_fixed else self._node.input_names[-1]
                 res = KData(input_name, None, res)
             
-            # Auto-unpack strategy: inject DataFrame columns into formulas_context
-            if res and isinstance(res.value, KTable):
-                df = res.value.value
-                for col in df.columns:
-                    formulas_context.register_object(KData(col, KArray(df[col].to_numpy())))
+            # Auto-unpack strategy: table columns become visible to the following formulas,
+            # each one is only materialized if a formula looks it up
+            if formulas_context is not None and res and isinstance(res.value, KTable):
+                formulas_context.bind_table(res.value)
 
             evaluated.append(res)
 
@@ -1,9 +1,13 @@
 from typing import NamedTuple
 
-from kira.core.kcontext import KContext
+from kira.core.kcontext import KContext, KFrame, KFrameLayout
+from kira.core.kexecutor import run_parallel
+from kira.core.kformula import KFormula
+from kira.core.ksymbol import KSymbol
 from kira.kdata.kdata import KData, KDataValue
 from kira.core.kobject import KTypeInfo, KObject
 from kira.kdata.kerrorvalue import KErrorValue
+from kira.kdata.kliteral import KLiteral
 from kira.knodes.knode import KNode
 from kira.knodes.knode_instance import KNodeInstance
 
@@ -28,19 +32,115 @@ class KWorkflow(KNode):
         self._output_symbols = output_symbols
         self._nodes: list[KObject] = nodes if nodes is not None else []
 
+        # Inputs and assignment targets live in the slots of the call frame, the symbols
+        # of the body referring to them are resolved once here instead of at every call
+        self._layout = KFrameLayout(self._input_names + [node.name for node in self._nodes])
+        for node in self._nodes:
+            self._bind_symbols(node, 0)
+
+        self._waves = self._build_waves()
+
+    @property
+    def output_symbols(self) -> list[str]:
+        return self._output_symbols
+
+    @property
+    def nodes(self) -> list[KObject]:
+        return self._nodes
+
+    def _bind_symbols(self, obj: KObject, depth: int):
+        if isinstance(obj, KSymbol):
+            slot = self._layout.slot(obj.name)
+            if slot is not None:
+                obj.bind(self._layout, depth, slot)
+        elif isinstance(obj, KNodeInstance):
+            # Node inputs are evaluated in a child context of the one the node is evaluated in.
+            # Formulas are left unbound, their symbols may be table columns.
+            for node_input in obj.node_inputs:
+                self._bind_symbols(node_input, depth + 1)
+
+    @classmethod
+    def _reads(cls, obj: KObject) -> set[str]:
+        """The names `obj` reads when evaluated: its symbols and the nodes it calls, at any depth."""
+        if isinstance(obj, KNodeInstance):
+            reads = {obj.target_name}
+            for node_input in obj.node_inputs:
+                reads |= cls._reads(node_input)
+            return reads
+        if isinstance(obj, KFormula):
+            return cls._reads(obj.expression)
+        return obj.referenced_symbols
+
+    def _build_waves(self) -> list[list[KObject]]:
+        """
+        Groups the body into waves of mutually independent nodes, in program order.
+        A node depends on every earlier node that writes a name it reads (or a node it calls, e.g.
+        `g` in `z = f(g(x))`), writes the same name, or reads the name it writes.
+        """
+        reads = [self._reads(node) for node in self._nodes]
+        levels = []
+        for i, node in enumerate(self._nodes):
+            level = 0
+            for j in range(i):
+                other = self._nodes[j]
+                if other.name in reads[i] or other.name == node.name or node.name in reads[j]:
+                    level = max(level, levels[j] + 1)
+            levels.append(level)
+
+        waves = [[] for _ in range(max(levels) + 1)] if levels else []
+        for node, level in zip(self._nodes, levels):
+            waves[level].append(node)
+        return waves
+
+    def is_vectorizable(self, context: KContext, _visiting: set[int] | None = None) -> bool:
+        """A workflow is vectorizable if its body only combines vectorizable nodes, locals and scalars."""
+        visiting = _visiting if _visiting is not None else set()
+        if id(self) in visiting:
+            # Recursive workflows are evaluated element by element
+            return False
+        visiting.add(id(self))
+        try:
+            return all(self._is_vectorizable_obj(node, context, visiting) for node in self._nodes)
+        finally:
+            visiting.discard(id(self))
+
+    def _is_vectorizable_obj(self, obj: KObject, context: KContext, visiting: set[int]) -> bool:
+        if isinstance(obj, KData):
+            return isinstance(obj.value, KLiteral)
+        if isinstance(obj, KSymbol):
+            if obj.name in self._layout:
+                return True
+            # Globals are only safe to broadcast when they are scalars
+            outer = context.get_object(obj.name)
+            return isinstance(outer, KData) and isinstance(outer.value, KLiteral)
+        if isinstance(obj, KNodeInstance):
+            node = context.get_object(obj.target_name)
+            if not isinstance(node, KNode):
+                return False
+            if isinstance(node, KWorkflow):
+                if not node.is_vectorizable(context, visiting):
+                    return False
+            elif not node.is_vectorizable(context):
+                return False
+            return all(self._is_vectorizable_obj(node_input, context, visiting) for node_input in obj.node_inputs)
+        return False
+
     def call(self, inputs: list[KData], context: KContext) -> list[KDataValue]:
-        ctx = KContext(context)
+        ctx = KFrame(self._layout, context)
 
         # 1. Register workflow inputs into context using their local names
         # todo fix: i think we have to register the data using the node input names instead of the actual names of the variables
         for data in inputs:
             ctx.register_object(data)
 
-        # 2. Execute nodes in the topological order
-        for node in self._nodes:
-            # Execute the node and register its KResult in context
-            result = node.eval(ctx)
-            ctx.register_object(result)
+        # 2. Execute nodes in the topological order, independent branches run concurrently.
+        # Branches are threads of the shared pool: they only overlap while their nodes release the GIL
+        # (NumPy, pandas and Arrow kernels, file reads), nodes running Python code take turns.
+        for wave in self._waves:
+            results = run_parallel([lambda node=node: node.eval(ctx) for node in wave])
+            # Register the KResults in program order
+            for result in results:
+                ctx.register_object(result)
 
         # 3. Collect final workflow outputs
         workflow_results = []
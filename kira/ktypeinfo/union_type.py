@@ -5,6 +5,10 @@ class KUnionTypeInfo(KTypeInfo):
     def __init__(self, types: list[KTypeInfo]):
         self._types = types
 
+    @property
+    def types(self) -> list[KTypeInfo]:
+        return self._types
+
     def match(self, value) -> bool:
         for t in self._types:
             if t.match(value):
@@ -1,3 +1,4 @@
+import os
 from functools import wraps
 from typing import Callable
 
@@ -6,36 +7,89 @@ import pandas as pd
 import pandas.api.types as ptypes
 
 from kira.core.kcontext import KContext
+from kira.core.kexecutor import run_parallel
 from kira.core.kobject import KTypeInfo
-from kira.kdata.karray import KArray
-from kira.kdata.kdata import KData
+from kira.kdata.karray import KArray, is_dictionary_strings, is_string_dtype
+from kira.kdata.kdata import KData, KDataValue
 from kira.kdata.kliteral import KLiteral
 from kira.kdata.kerrorvalue import KErrorValue
 from kira.kexpections.kgenericexception import KGenericException
 from kira.knodes.kfunction import kfunction
+from kira.knodes.knode import KNode
+
+
+def call_on_buffers(np_func: Callable, args: list[KDataValue]) -> KArray | None:
+    """
+    Fast path of element-wise functions: calls `np_func` on the NumPy buffers of numeric and boolean
+    arrays without nulls (and numeric scalars), returning a buffer-backed KArray. None when the
+    arguments do not qualify (strings, nulls, lengths or labels that differ, no array at all), the
+    caller then takes its pandas path, which also keeps pandas' null semantics (e.g. NA & False).
+    """
+    unboxed, index, length = [], None, None
+    for arg in args:
+        if isinstance(arg, KArray):
+            buffer = arg.buffer
+            if buffer is None or buffer[1] is not None:
+                return None
+            values, _, arg_index = buffer
+            if length is None:
+                length, index = len(values), arg_index
+            elif len(values) != length or not _same_labels(index, arg_index):
+                return None
+            unboxed.append(values)
+        elif isinstance(arg, KLiteral) and isinstance(arg.value, (bool, int, float, np.bool_, np.number)):
+            unboxed.append(arg.value)
+        else:
+            return None
+    if length is None:
+        return None
+
+    # Masked pandas arrays silence floating point warnings (e.g. 1 / 0 = inf) as well
+    with np.errstate(all="ignore"):
+        result = np_func(*unboxed)
+    if not isinstance(result, np.ndarray) or result.ndim != 1 or len(result) != length:
+        return None
+    return KArray.from_numpy(result, index=index)
+
+
+def _same_labels(left: pd.Index | None, right: pd.Index | None) -> bool:
+    if left is None or right is None:
+        return (left is None or isinstance(left, pd.RangeIndex) and left.start == 0 and left.step == 1) and \
+            (right is None or isinstance(right, pd.RangeIndex) and right.start == 0 and right.step == 1)
+    return left is right or left.equals(right)
 
 
 def numpy_to_kfunction(
         np_func: Callable,
         inputs: list[tuple[str, KTypeInfo] | str],
         outputs: list[tuple[str, KTypeInfo] | str],
-        name: str = None
+        name: str = None,
+        vectorizable: bool | None = None
 ):
     """
     Wraps a NumPy function and ensures the output is boxed
     into KArray or KLiteral based on the return type.
     It also handles unboxing of KLiteral and KArray inputs.
+    NumPy ufuncs are element-wise, so they are vectorizable unless stated otherwise.
+    Vectorizable functions run on the NumPy buffers of their arrays when they can (see call_on_buffers).
     """
+    is_vectorizable = isinstance(np_func, np.ufunc) if vectorizable is None else vectorizable
 
     @kfunction(
         inputs=inputs,
         outputs=outputs,
         name=name or np_func.__name__,
         use_values=True,
-        use_context=False
+        use_context=False,
+        vectorizable=is_vectorizable
     )
     def wrapper(*args):
         # args are KDataValue objects because use_values=True
+        if is_vectorizable:
+            result = call_on_buffers(np_func, list(args))
+            if result is not None:
+                return [result]
+
         unboxed_args = [arg.value for arg in args]
 
         # Check if there are multiple pd.Series in the arguments, and if so, verify they have the same length
@@ -58,14 +112,44 @@ def numpy_to_kfunction(
     return wrapper
 
 
+def _compare_codes(np_num_func: Callable, x1, x2) -> np.ndarray | None:
+    """
+    Equality of dictionary-encoded strings as integer comparisons of their codes: against a string,
+    or against another array with the same dictionary. None when that does not apply.
+    """
+    if np_num_func not in (np.equal, np.not_equal):
+        return None
+    if isinstance(x2, pd.Series) and is_dictionary_strings(x2.dtype) and not isinstance(x1, pd.Series):
+        x1, x2 = x2, x1
+    if not (isinstance(x1, pd.Series) and is_dictionary_strings(x1.dtype)):
+        return None
+
+    codes = x1.cat.codes.to_numpy()
+    if isinstance(x2, (str, np.str_)):
+        categories = x1.cat.categories
+        # -2 matches no code, not even the -1 of missing values
+        code = categories.get_loc(x2) if x2 in categories else -2
+        return np_num_func(codes, code)
+    if isinstance(x2, pd.Series) and is_dictionary_strings(x2.dtype) and len(x2) == len(x1) \
+            and x2.cat.categories.equals(x1.cat.categories):
+        other = x2.cat.codes.to_numpy()
+        # Missing strings compare as "<NA>", equal to each other
+        return np_num_func(codes, other)
+    return None
+
+
 def k_compare_wrapper(np_num_func: Callable, np_str_func: Callable):
     """
     Wraps a numeric and a string comparison function to handle both types.
     """
 
     def wrapper(x1, x2):
-        is_x1_str = isinstance(x1, (str, bytes, np.str_)) or (isinstance(x1, pd.Series) and ptypes.is_string_dtype(x1.dtype))
-        is_x2_str = isinstance(x2, (str, bytes, np.str_)) or (isinstance(x2, pd.Series) and ptypes.is_string_dtype(x2.dtype))
+        result = _compare_codes(np_num_func, x1, x2)
+        if result is not None:
+            return result
+
+        is_x1_str = isinstance(x1, (str, bytes, np.str_)) or (isinstance(x1, pd.Series) and is_string_dtype(x1.dtype))
+        is_x2_str = isinstance(x2, (str, bytes, np.str_)) or (isinstance(x2, pd.Series) and is_string_dtype(x2.dtype))
         if is_x1_str or is_x2_str:
             a1 = np.asarray(x1, dtype=str) if (isinstance(x1, pd.Series) and is_x1_str) else x1
             a2 = np.asarray(x2, dtype=str) if (isinstance(x2, pd.Series) and is_x2_str) else x2
@@ -73,3 +157,34 @@ def k_compare_wrapper(np_num_func: Callable, np_str_func: Callable):
         return np_num_func(x1, x2)
 
     return wrapper
+
+
+def call_node(node: KNode, value: KDataValue, context: KContext) -> KData:
+    """Calls `node` with `value` as its first input, the other inputs take their defaults."""
+    name = node.input_names[0]
+    return node({name: KData(name, value)}, context)[0]
+
+
+def _call_node_safely(node: KNode, value: KDataValue, context: KContext) -> KData:
+    """call_node, with an exception raised by the node returned as the error of its result."""
+    try:
+        return call_node(node, value, context)
+    except Exception as e:
+        return KData(node.output_names[0], None, KGenericException(f"'{node.name}' failed: {e}"))
+
+
+def map_node(node: KNode, values: list[KDataValue], context: KContext) -> list[KData]:
+    """
+    Calls `node` once per value. Values are split in one batch per worker of the shared pool,
+    so that many small calls do not pay for one task each. A call that raises gives a result
+    with the error, on a worker as on the calling thread.
+    """
+    n_batches = min(len(values), os.cpu_count() or 1)
+    if n_batches <= 1:
+        return [_call_node_safely(node, value, context) for value in values]
+
+    size = -(-len(values) // n_batches)
+    batches = [values[i:i + size] for i in range(0, len(values), size)]
+    results = run_parallel([lambda batch=batch: [_call_node_safely(node, value, context) for value in batch]
+                            for batch in batches])
+    return [res for batch in results for res in batch]
@@ -1,6 +1,9 @@
 import logging
-from typing import TYPE_CHECKING
+import threading
+from typing import TYPE_CHECKING, Callable
 from kira.core.kobject import KObject, KTypeInfo
+from kira.kdata.kdata import KData, KDataValue
+from kira.knodes.knode import KNode
 from kira.ktypeinfo.no_type import KNoTypeInfo
 
 if TYPE_CHECKING:
@@ -8,6 +11,45 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger("kira.library")
 
+
+class KLazyNode(KNode):
+    """
+    Stub of a library node: the signature is declared up front, so the node can be registered,
+    type checked and listed, while the node itself (and the imports it needs) is only built
+    by `factory` the first time it is used.
+    """
+
+    def __init__(self,
+                 name: str,
+                 inputs: list[tuple[str, KTypeInfo] | str],
+                 outputs: list[tuple[str, KTypeInfo] | str],
+                 factory: Callable[[], KNode],
+                 default_inputs: dict[str, KDataValue] | None = None):
+        super().__init__(name, inputs, outputs, default_inputs=default_inputs)
+        self._factory = factory
+        self._node: KNode | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def node(self) -> KNode:
+        if self._node is None:
+            with self._lock:
+                if self._node is None:
+                    logger.debug(f"Materializing '{self.name}'")
+                    self._node = self._factory()
+        return self._node
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._node is not None
+
+    def is_vectorizable(self, context: 'KContext') -> bool:
+        return self.node.is_vectorizable(context)
+
+    def call(self, inputs: list[KData], context: 'KContext') -> list[KDataValue]:
+        return self.node.call(inputs, context)
+
+
 class KLibrary(KObject):
     def __init__(self, name: str, objs: list[KObject] = None):
         super().__init__(name)
@@ -16,11 +58,23 @@ class KLibrary(KObject):
     def register(self, node: KObject):
         self._library[node.name] = node
 
+    def register_lazy(self,
+                      name: str,
+                      inputs: list[tuple[str, KTypeInfo] | str],
+                      outputs: list[tuple[str, KTypeInfo] | str],
+                      factory: Callable[[], KNode],
+                      default_inputs: dict[str, KDataValue] | None = None):
+        """Registers a node that is built by `factory` on first use, see KLazyNode."""
+        self.register(KLazyNode(name, inputs, outputs, factory, default_inputs=default_inputs))
+
     def get(self, name:str) -> KObject | None:
         if name not in self._library:
             return None
         return self._library[name]
 
+    def objects(self) -> list[KObject]:
+        return list(self._library.values())
+
     @property
     def type(self) -> KTypeInfo:
         return KNoTypeInfo()
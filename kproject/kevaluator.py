@@ -14,6 +14,8 @@ from kproject.kmanager import KManager
 from kproject.kevent import KEvent
 from kproject.kstatus_bus import KStatusBus, KStatusEvent, KVariableStatus
 from kira.kdata.kdata import KData
+from kira.core.kprogress import progress_scope
+from kira.kdata.ktable import table_backend_scope
 from kira.kexpections.kgenericexception import KGenericException
 
 
@@ -22,10 +24,12 @@ class KEvaluator(KManager):
     Background worker responsible for executing variable evaluations based on events.
     Maintains a work queue of variables that need re-evaluation.
     """
-    def __init__(self, context: KContext, state_manager: KStateManager, status_bus: KStatusBus):
+    def __init__(self, context: KContext, state_manager: KStateManager, status_bus: KStatusBus,
+                 table_backend: str = "pandas"):
         self.context = context
         self.state_manager = state_manager
         self.status_bus = status_bus
+        self.table_backend = table_backend
         
         self._evaluation_queue: list[str] = []
         self._queue_lock = threading.RLock()
@@ -128,14 +132,17 @@ class KEvaluator(KManager):
         result = None
 
         try:
-            if is_var:
-                state = self.state_manager.variables[name]
-                result = state.kobject.eval(self.context)
-                if not result:
-                    status = KVariableStatus.ERROR
-            elif is_wf:
-                state = self.state_manager.workflows[name]
-                result = state.kobject.eval(self.context)
+            # Long running nodes (e.g. load_csv) report their progress through the status bus
+            with progress_scope(lambda fraction: self.status_bus.report_progress(name, fraction)), \
+                    table_backend_scope(self.table_backend):
+                if is_var:
+                    state = self.state_manager.variables[name]
+                    result = state.kobject.eval(self.context)
+                    if not result:
+                        status = KVariableStatus.ERROR
+                elif is_wf:
+                    state = self.state_manager.workflows[name]
+                    result = state.kobject.eval(self.context)
             
         except Exception as e:
             self._logger.error(f"Error evaluating variable '{name}': {e}", exc_info=True)
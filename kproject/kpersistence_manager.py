@@ -4,6 +4,7 @@ import os
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Set
 import hashlib
+from contextlib import contextmanager
 
 from kproject.kevent import KEvent, KEventTypes
 from kproject.kmanager import KManager
@@ -31,6 +32,11 @@ class KPersistenceManager(KManager):
         self.__unsaved_events: List[KEvent] = []
         self.__unsaved_data: Set[str] = set()
         self.__kdata_cache: Dict[str, KData] = {}
+        # Serialized built programs, keyed by the hash of their source code
+        self.__program_cache: Dict[str, bytes] = {}
+        self.__unsaved_programs: Set[str] = set()
+        # Nesting depth of transaction(), commits are held back while it is open
+        self.__transaction_depth = 0
 
         if self.__filepath:
             self.__conn = sqlite3.connect(self.__filepath)
@@ -52,6 +58,24 @@ class KPersistenceManager(KManager):
             # evt.event_id is automatically computed in @property
             self.__events.append(evt)
 
+    @contextmanager
+    def transaction(self):
+        """
+        Groups the writes made inside into one commit, e.g. an event and the program built from it
+        are written to disk together.
+        """
+        self.__transaction_depth += 1
+        try:
+            yield
+        finally:
+            self.__transaction_depth -= 1
+            if self.__transaction_depth == 0:
+                self._commit()
+
+    def _commit(self):
+        if self.__conn and self.__transaction_depth == 0:
+            self.__conn.commit()
+
     def get_all_events(self) -> List[KEvent]:
         """Returns all events currently loaded in memory."""
         return self.__events.copy()
@@ -89,7 +113,7 @@ class KPersistenceManager(KManager):
             if truncate_idx < len(all_db_ids):
                 sql_id = all_db_ids[truncate_idx]
                 cursor.execute("DELETE FROM events WHERE id >= ?", (sql_id,))
-                self.__conn.commit()
+                self._commit()
 
         # 3. Truncate memory list
         self.__events = self.__events[:truncate_idx]
@@ -117,6 +141,34 @@ class KPersistenceManager(KManager):
         assert isinstance(data, KData), f"get_data: Expected KData, got {type(data)} for name {name}"
         return data
 
+    @staticmethod
+    def _code_key(code: str) -> str:
+        return hashlib.blake2b(code.strip().encode(), digest_size=16).hexdigest()
+
+    def cache_program(self, code: str, blob: bytes):
+        """Stores the serialized program built from `code`, so reopening the project can skip the front-end."""
+        key = self._code_key(code)
+        self.__program_cache[key] = blob
+        self.__unsaved_programs.add(key)
+        if self.__conn:
+            self.save_programs()
+
+    def get_program(self, code: str) -> Optional[bytes]:
+        """Returns the serialized program built from `code`, None if it was never stored."""
+        key = self._code_key(code)
+        if key in self.__program_cache:
+            return self.__program_cache[key]
+        if not self.__conn:
+            return None
+
+        cursor = self.__conn.cursor()
+        cursor.execute('SELECT content FROM kprogram_storage WHERE code_hash=?', (key,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        self.__program_cache[key] = row[0]
+        return row[0]
+
     def _init_db(self):
         """Initializes the SQLite schema."""
         cursor = self.__conn.cursor()
@@ -155,6 +207,15 @@ class KPersistenceManager(KManager):
             content BLOB
         )
         ''')
+
+
+        # Serialized built programs (see kira.klanguage.kserializer)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kprogram_storage (
+            code_hash TEXT PRIMARY KEY,
+            content BLOB
+        )
+        ''')
         
         self.__conn.commit()
 
@@ -174,6 +235,7 @@ class KPersistenceManager(KManager):
             
         self.save_events()
         self.save_data()
+        self.save_programs()
 
     def save_events(self):
         """Flushes all unsaved events to the SQLite database."""
@@ -193,7 +255,7 @@ class KPersistenceManager(KManager):
                 event.target,
                 event.body
             ))
-        self.__conn.commit()
+        self._commit()
         self.__unsaved_events.clear()
 
     def save_data(self):
@@ -230,9 +292,23 @@ class KPersistenceManager(KManager):
                 # TODO: implement serialization for all data types that are not KLiteral
                 raise NotImplementedError(f"Serialization for non-KLiteral data types is not implemented yet. Found: {type(kdata.value)}")
             
-        self.__conn.commit()
+        self._commit()
         self.__unsaved_data.clear()
 
+    def save_programs(self):
+        """Flushes all unsaved serialized programs to the SQLite database."""
+        if not self.__conn or not self.__unsaved_programs:
+            return
+
+        cursor = self.__conn.cursor()
+        for key in self.__unsaved_programs:
+            cursor.execute('''
+            INSERT OR REPLACE INTO kprogram_storage (code_hash, content)
+            VALUES (?, ?)
+            ''', (key, self.__program_cache[key]))
+        self._commit()
+        self.__unsaved_programs.clear()
+
     def _load_data_from_disk(self, name: str) -> KData:
         """Loads data from the SQLite database."""
         # TODO Refactor: if data is not available return KData(None, KErrorMissingData))
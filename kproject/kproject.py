@@ -14,7 +14,8 @@ from kproject.kevaluator import KEvaluator
 from kproject.kstatus_bus import KStatusBus
 from kproject.kevent import KEventTypes
 from kira.core.kobject import KObject
-from library import load_libraries
+from kira.kdata.ktable import TABLE_BACKENDS
+from library import get_library_namespace, library_signature
 
 logger = logging.getLogger("kira.kproject")
 
@@ -23,15 +24,22 @@ class KProject:
     Central orchestrator for the Kira project.
     Manages the lifecycle of managers and coordinates event-driven state updates.
     """
-    def __init__(self, persistence_manager: KPersistenceManager):
+    def __init__(self, persistence_manager: KPersistenceManager, table_backend: str = "pandas"):
+        """`table_backend` is how the project keeps the tables it loads, "pandas" or "arrow" (needs pyarrow)."""
+        if table_backend not in TABLE_BACKENDS:
+            raise ValueError(f"Unknown table backend '{table_backend}', expected one of: {', '.join(TABLE_BACKENDS)}")
+        if table_backend == "arrow":
+            from kira.kdata.karrow import require_pyarrow
+            require_pyarrow("the arrow table backend")
+
         self.persistence_manager = persistence_manager
+        self.table_backend = table_backend
         
         # Initialize Core Managers
-        self.context = KContext()
-        load_libraries(self.context)
-        self.state_manager = KStateManager()
+        self.context = KContext(get_library_namespace())
+        self.state_manager = KStateManager(self.persistence_manager, library_signature())
         self.status_bus = KStatusBus()
-        self.evaluator = KEvaluator(self.context, self.state_manager, self.status_bus)
+        self.evaluator = KEvaluator(self.context, self.state_manager, self.status_bus, self.table_backend)
         
         # State Versioning and History
         self._state_version: str = ""
@@ -52,10 +60,9 @@ class KProject:
         # Reset State
         self.evaluator.stop()
         self.status_bus.clear_statuses()
-        self.context = KContext()
-        load_libraries(self.context)
-        self.state_manager = KStateManager()
-        self.evaluator = KEvaluator(self.context, self.state_manager, self.status_bus)
+        self.context = KContext(get_library_namespace())
+        self.state_manager = KStateManager(self.persistence_manager, library_signature())
+        self.evaluator = KEvaluator(self.context, self.state_manager, self.status_bus, self.table_backend)
         
         self._state_version = ""
         self._current_index = 0
@@ -89,21 +96,23 @@ class KProject:
         """
         logger.info(f"Processing event: {event.type} for target: {event.target}")
         
-        # Handle Divergence: If we are not at the end of history, truncate the branch
-        if self._current_index < len(self._history):
-            # The first "future" event is at self._current_index
-            future_event = self._history[self._current_index]
-            self.persistence_manager.truncate_history(future_event.event_id)
-            self._history = self._history[:self._current_index]
-
-        # 1. Add to history
-        self._history.append(event)
-        
-        # 2. Persistence
-        self.persistence_manager.process_event(event)
-        
-        # 3. Application
-        self._apply_event_internal(event)
+        # The truncated branch, the event and the program built from it are committed together
+        with self.persistence_manager.transaction():
+            # Handle Divergence: If we are not at the end of history, truncate the branch
+            if self._current_index < len(self._history):
+                # The first "future" event is at self._current_index
+                future_event = self._history[self._current_index]
+                self.persistence_manager.truncate_history(future_event.event_id)
+                self._history = self._history[:self._current_index]
+
+            # 1. Add to history
+            self._history.append(event)
+
+            # 2. Persistence
+            self.persistence_manager.process_event(event)
+
+            # 3. Application
+            self._apply_event_internal(event)
 
     def _update_state_hash(self, event: KEvent):
         """Generates a new state version hash by chaining with the previous hash."""
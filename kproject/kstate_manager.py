@@ -1,26 +1,31 @@
+from __future__ import annotations
 import logging
-from typing import Optional, Set, Tuple, Dict
+from typing import Optional, Set, Tuple, Dict, TYPE_CHECKING
 from dataclasses import dataclass
-from kira import (ktokenize, 
-                  AstNode, kparse, AstAssignment, AstWorkflow, 
+from kira import (AstNode, kparse_cached, AstAssignment, AstWorkflow, 
                   kbuild_workflow, kbuild_expression, kbuild_assignment, 
-                  KObject, KData, KLiteral, KNode, KNodeInstance)
+                  KObject, KData, KLiteral, KNode, KNodeInstance,
+                  kdump_program, kload_program)
 from kira.klanguage.kast import AstExpression
 from kproject.kevent import KEvent, KEventTypes
 from kproject.kmanager import KManager
 from kproject.kdependency_manager import find_dependencies
 
+if TYPE_CHECKING:
+    from kproject.kpersistence_manager import KPersistenceManager
+
+# ast is None when the object was loaded from the serialized program cache
 @dataclass
 class VariableState:
     code: str
-    ast: AstNode
+    ast: Optional[AstNode]
     dependencies: Set[str]
     kobject: KNodeInstance
 
 @dataclass
 class WorkflowState:
     code: str
-    ast: AstNode
+    ast: Optional[AstNode]
     dependencies: Set[str]
     kobject: KNode
 
@@ -30,10 +35,35 @@ class KStateManager(KManager):
     """
     Manages the state of symbols using dataclass structures.
     """
-    def __init__(self):
+    def __init__(self, program_cache: Optional[KPersistenceManager] = None, library_signature: str = ""):
         self.variables: Dict[str, VariableState] = {}
         self.workflows: Dict[str, WorkflowState] = {}
         self.data_names: Set[str] = set()
+        self._program_cache = program_cache
+        self._library_signature = library_signature
+
+    def _build(self, code: str, ast_type: type, builder) -> Tuple[Optional[AstNode], Set[str], KObject]:
+        """
+        Returns the AST, the dependencies and the built object of `code`. Code built before
+        with the same libraries is loaded from the program cache without being parsed.
+        """
+        defined_symbols = set(self.variables.keys()) | self.data_names
+
+        if self._program_cache is not None:
+            blob = self._program_cache.get_program(code)
+            loaded = kload_program(blob, self._library_signature) if blob is not None else None
+            if loaded is not None:
+                kobj, symbols = loaded
+                return None, symbols & defined_symbols, kobj
+
+        ast = kparse_cached(code)
+        assert isinstance(ast, ast_type), f"Expected {ast_type.__name__}, got {type(ast)}"
+        kobj = builder(ast)
+
+        if self._program_cache is not None:
+            symbols = find_dependencies(ast)
+            self._program_cache.cache_program(code, kdump_program(kobj, symbols, self._library_signature))
+        return ast, find_dependencies(ast, defined_symbols), kobj
 
     def process_event(self, event: KEvent):
         match event.type:
@@ -59,13 +89,7 @@ class KStateManager(KManager):
     def _add_variable(self, event: KEvent):
         # assert event.target not in self.variables, f"AddVariable: '{event.target}' already present"
         code = event.body
-        tokens = [t for t in ktokenize(code) if t.token_type.name != "WHITESPACE"]
-        ast = kparse(tokens)
-        assert isinstance(ast, AstAssignment), f"AddVariable: Expected AstAssignment, got {type(ast)}"
-        
-        defined_symbols = set(self.variables.keys()) | self.data_names
-        deps = find_dependencies(ast, defined_symbols)
-        kobj = kbuild_assignment(ast)
+        ast, deps, kobj = self._build(code, AstAssignment, kbuild_assignment)
 
         # TODO: Fix this assertion, assignment might return a KData object or a KNodeInstance
         # assert isinstance(kobj, KNodeInstance), f"AddVariable: Expected KNodeInstance, got {type(kobj)}"
@@ -82,13 +106,7 @@ class KStateManager(KManager):
     def _add_workflow(self, event: KEvent):
         assert event.target not in self.workflows, f"AddWorkflow: '{event.target}' already present"
         code = event.body
-        tokens = [t for t in ktokenize(code) if t.token_type.name != "WHITESPACE"]
-        ast = kparse(tokens)
-        assert isinstance(ast, AstWorkflow), f"AddWorkflow: Expected AstWorkflow, got {type(ast)}"
-        
-        defined_symbols = set(self.variables.keys()) | self.data_names
-        deps = find_dependencies(ast, defined_symbols)
-        kobj = kbuild_workflow(ast)
+        ast, deps, kobj = self._build(code, AstWorkflow, kbuild_workflow)
 
         assert isinstance(kobj, KNode), f"AddWorkflow: Expected KNode, got {type(kobj)}"
         
@@ -104,13 +122,7 @@ class KStateManager(KManager):
         assert event.target in self.workflows, f"UpdateWorkflow: '{event.target}' not found"
         
         code = event.body
-        tokens = [t for t in ktokenize(code) if t.token_type.name != "WHITESPACE"]
-        ast = kparse(tokens)
-        assert isinstance(ast, AstWorkflow), f"UpdateWorkflow: Expected AstWorkflow, got {type(ast)}"
-        
-        defined_symbols = set(self.variables.keys()) | self.data_names
-        deps = find_dependencies(ast, defined_symbols)
-        kobj = kbuild_workflow(ast)
+        ast, deps, kobj = self._build(code, AstWorkflow, kbuild_workflow)
 
         assert isinstance(kobj, KNode), f"UpdateWorkflow: Expected KNode, got {type(kobj)}"
         
@@ -12,6 +12,7 @@ class KVariableStatus(Enum):
 
 class KStatusEvent(Enum):
     VARIABLE_STATUS_CHANGED = "variable_status_changed"
+    VARIABLE_PROGRESS = "variable_progress"
 
 class KStatusBus:
     """
@@ -48,6 +49,13 @@ class KStatusBus:
         
         self.dispatch(KStatusEvent.VARIABLE_STATUS_CHANGED, name, status)
 
+    def report_progress(self, name: str, fraction: float):
+        """
+        Dispatches the progress (0 to 1) of a variable being processed, e.g. the rows read by load_csv.
+        Progress is not stored, only subscribers see it.
+        """
+        self.dispatch(KStatusEvent.VARIABLE_PROGRESS, name, fraction)
+
     def get_status(self, name: str) -> KVariableStatus:
         """Returns the current status of a specific variable."""
         with self._lock:
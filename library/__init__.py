@@ -3,7 +3,11 @@ from .math_library import k_math_library
 from .array_library import k_array_library
 from .table_library import k_table_library
 from .statistics_library import k_statistics_library
-from kira import KContext
+import hashlib
+from functools import cache
+
+from kira import KContext, KNode
+from kira.core.kcontext import KNamespace
 
 default_libraries = [
     k_builtin_library,
@@ -16,3 +20,30 @@ default_libraries = [
 def load_libraries(ctx: KContext):
     for lib in default_libraries:
         lib.eval(ctx)
+
+
+@cache
+def get_library_namespace() -> KNamespace:
+    """
+    The default libraries, built once into a frozen namespace shared by every project.
+    Root contexts chain to it (`KContext(get_library_namespace())`) instead of
+    registering each library object, so resetting a context is O(user objects).
+    """
+    return KNamespace.from_libraries(default_libraries)
+
+
+@cache
+def library_signature() -> str:
+    """
+    Hash of the names and signatures (input and output names and types, default values) of the default
+    library nodes, changes when a library does.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for lib in default_libraries:
+        h.update(lib.name.encode())
+        for obj in sorted(lib.objects(), key=lambda o: o.name):
+            h.update(b"\x00" + obj.name.encode())
+            if isinstance(obj, KNode):
+                h.update(repr((obj.input_names, obj.input_types, obj.output_names, obj.output_types,
+                               sorted(obj.default_inputs.items()))).encode())
+    return h.hexdigest()
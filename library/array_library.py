@@ -4,7 +4,12 @@ from kira.kdata.karray import (K_ARRAY_INTEGER_TYPE, K_ARRAY_NUMBER_TYPE, K_ARRA
     KArray, KArrayTypeInfo, K_ARRAY_TYPE)
 from kira.kdata.kliteral import (K_BOOLEAN_TYPE, K_INTEGER_TYPE, K_NUMBER_TYPE, K_STRING_TYPE, K_LITERAL_TYPE, KLiteral,
                                  KLiteralType)
+from kira.core.kcontext import KContext
+from kira.kdata.kerrorvalue import KErrorValue
+from kira.kexpections.kgenericexception import KGenericException
 from kira.knodes.kfunction import KFunction, kfunction
+from kira.knodes.knode import KNode
+from kira.library.library_utils import call_node, map_node
 from kira.library.node_library import KLibrary
 
 import pandas as pd
@@ -23,7 +28,7 @@ k_array_library = KLibrary("Array")
 )
 def k_array_len(x_obj):
     x = x_obj.value
-    return [KLiteral(len(x), K_INTEGER_TYPE)]
+    return [KLiteral(len(x), KLiteralType.INTEGER)]
 
 k_array_library.register(k_array_len)
 
@@ -97,4 +102,43 @@ k_array_library.register(k_array_reverse)
 def k_array_unique(x_obj: KArray):
     return [KArray(pd.Series(x_obj.value.unique()), x_obj.lit_type)]
 
-k_array_library.register(k_array_unique)
\ No newline at end of file
+k_array_library.register(k_array_unique)
+
+# map(x: array, f: string) -> array # applies the node named f to every element
+@kfunction(
+    inputs=[("x", K_ARRAY_TYPE), ("f", K_STRING_TYPE)],
+    outputs=[("y", K_ARRAY_TYPE)],
+    name="map",
+    use_values=True,
+    use_context=True
+)
+def k_array_map(x_obj: KArray, f_obj: KLiteral, context: KContext):
+    node = context.get_object(str(f_obj.value))
+    if not isinstance(node, KNode):
+        return [KErrorValue(KGenericException(f"Object '{f_obj.value}' is not a KNode"))]
+
+    if node.is_vectorizable(context):
+        # Element-wise body: a single call over the whole array
+        res = call_node(node, KArray(x_obj.value.reset_index(drop=True), x_obj.lit_type), context)
+        if not res:
+            return [KErrorValue(res.error)]
+        if isinstance(res.value, KLiteral):
+            return [KArray(pd.Series([res.value.value] * len(x_obj.value)))]
+        if not isinstance(res.value, KArray) or len(res.value.value) != len(x_obj.value):
+            return [KErrorValue(KGenericException(f"map expects '{node.name}' to return a single value per element"))]
+        return [res.value]
+
+    values = x_obj.value.tolist()
+    present = [i for i, v in enumerate(values) if not pd.isna(v)]
+    results = map_node(node, [KLiteral(values[i]) for i in present], context)
+
+    out = [None] * len(values)
+    for i, res in zip(present, results):
+        if not res:
+            return [KErrorValue(res.error)]
+        if not isinstance(res.value, KLiteral):
+            return [KErrorValue(KGenericException(f"map expects '{node.name}' to return a single value per element"))]
+        out[i] = res.value.value
+    return [KArray(pd.Series(pd.array(out)))]
+
+k_array_library.register(k_array_map)
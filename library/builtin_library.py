@@ -8,11 +8,15 @@ import pandas.api.types as ptypes
 from kira.core.kcontext import KContext
 from kira.core.kobject import KTypeInfo
 from kira.kdata.karray import K_ARRAY_INTEGER_TYPE, K_ARRAY_NUMBER_TYPE, K_ARRAY_BOOLEAN_TYPE, K_ARRAY_STRING_TYPE, \
-    KArray, KArrayTypeInfo, K_ARRAY_TYPE
+    KArray, KArrayTypeInfo, K_ARRAY_TYPE, is_string_dtype
 from kira.kdata.kdata import KData, KDataValue
 from kira.kdata.kliteral import K_BOOLEAN_TYPE, K_INTEGER_TYPE, K_NUMBER_TYPE, K_STRING_TYPE, KLiteral, KLiteralType
 from kira.kdata.kerrorvalue import KErrorValue
-from kira.kdata.ktable import KTable, KTableTypeInfo, K_TABLE_TYPE
+from kira.kdata.ktable import KTable, KTableTypeInfo, K_TABLE_TYPE, current_table_backend
+from kira.kdata.kplan import KPlanCsvScan, KPlanArrowScan
+from kira.kdata.kstrings import concat_strings
+from kira.kdata.karrow import ARROW_FORMATS, read_csv_table
+from kira.kdata.kcsv import read_csv, parse_csv_types
 from kira.kexpections.kgenericexception import KGenericException
 from kira.knodes.kfunction import KFunction, kfunction
 from kira.ktypeinfo.any_type import KAnyTypeInfo
@@ -39,12 +43,12 @@ K_MULT_TYPE = KUnionTypeInfo([
 k_builtin_library = KLibrary("Builtin")
 
 
-from kira.library.library_utils import numpy_to_kfunction, k_compare_wrapper
+from kira.library.library_utils import numpy_to_kfunction, k_compare_wrapper, call_on_buffers
 
 # Identity Function
 k_builtin_library.register(kfunction(
     inputs=[("x", KAnyTypeInfo())], outputs=[("y", KAnyTypeInfo())],
-    name="identity", use_values=True, use_context=False
+    name="identity", use_values=True, use_context=False, vectorizable=True
 )(lambda x: [x]))
 
 # Arithmetic Functions
@@ -55,8 +59,8 @@ def _k_add_impl(val1_obj, val2_obj):
     val1 = val1_obj.value
     val2 = val2_obj.value
     # Logic
-    is_val1_str = isinstance(val1, (str, bytes, np.str_)) or (isinstance(val1, pd.Series) and ptypes.is_string_dtype(val1.dtype))
-    is_val2_str = isinstance(val2, (str, bytes, np.str_)) or (isinstance(val2, pd.Series) and ptypes.is_string_dtype(val2.dtype))
+    is_val1_str = isinstance(val1, (str, bytes, np.str_)) or (isinstance(val1, pd.Series) and is_string_dtype(val1.dtype))
+    is_val2_str = isinstance(val2, (str, bytes, np.str_)) or (isinstance(val2, pd.Series) and is_string_dtype(val2.dtype))
 
     if is_val1_str and is_val2_str:
         if not isinstance(val1, pd.Series) and not isinstance(val2, pd.Series):
@@ -65,14 +69,15 @@ def _k_add_impl(val1_obj, val2_obj):
         if isinstance(val1, pd.Series) and isinstance(val2, pd.Series):
             if len(val1) != len(val2):
                 return [KErrorValue(KGenericException(f"Cannot perform operation on arrays of different lengths: {len(val1)} and {len(val2)}"))]
-            result = pd.Series([str(s1) + str(s2) for s1, s2 in zip(val1, val2)], dtype="string")
-        elif isinstance(val1, pd.Series):
-            result = val1.astype(str) + str(val2)
-        else:
-            result = str(val1) + val2.astype(str)
-        return [KArray(result)]
+        # Vectorized, dictionary-encoded arrays concatenated with a string only touch their distinct values
+        result = concat_strings(val1 if isinstance(val1, pd.Series) else str(val1),
+                                val2 if isinstance(val2, pd.Series) else str(val2))
+        return [KArray(result, KLiteralType.STRING)]
     elif not is_val1_str and not is_val2_str:
         # Both numeric (or boolean)
+        result = call_on_buffers(np.add, [val1_obj, val2_obj])
+        if result is not None:
+            return [result]
         if isinstance(val1, pd.Series) and isinstance(val2, pd.Series):
             if len(val1) != len(val2):
                 return [KErrorValue(KGenericException(f"Cannot perform operation on arrays of different lengths: {len(val1)} and {len(val2)}"))]
@@ -91,11 +96,11 @@ def _k_add_impl(val1_obj, val2_obj):
 
 k_builtin_library.register(kfunction(
     inputs=[("x1", K_ADD_TYPE), ("x2", K_ADD_TYPE)], outputs=[("y", KAnyTypeInfo())],
-    name="+", use_values=True, use_context=False
+    name="+", use_values=True, use_context=False, vectorizable=True
 )(_k_add_impl))
 k_builtin_library.register(kfunction(
     inputs=[("x1", K_ADD_TYPE), ("x2", K_ADD_TYPE)], outputs=[("y", KAnyTypeInfo())],
-    name="add", use_values=True, use_context=False
+    name="add", use_values=True, use_context=False, vectorizable=True
 )(_k_add_impl))
 
 # Subtraction
@@ -118,8 +123,8 @@ k_builtin_library.register(numpy_to_kfunction(
 def _k_multiply_impl(val1_obj, val2_obj):
     val1 = val1_obj.value
     val2 = val2_obj.value
-    is_val1_str = isinstance(val1, (str, bytes, np.str_)) or (isinstance(val1, pd.Series) and ptypes.is_string_dtype(val1.dtype))
-    is_val2_str = isinstance(val2, (str, bytes, np.str_)) or (isinstance(val2, pd.Series) and ptypes.is_string_dtype(val2.dtype))
+    is_val1_str = isinstance(val1, (str, bytes, np.str_)) or (isinstance(val1, pd.Series) and is_string_dtype(val1.dtype))
+    is_val2_str = isinstance(val2, (str, bytes, np.str_)) or (isinstance(val2, pd.Series) and is_string_dtype(val2.dtype))
 
     if is_val1_str and is_val2_str:
         return [KErrorValue(KGenericException("Type mismatch: cannot multiply string by string"))]
@@ -150,6 +155,9 @@ def _k_multiply_impl(val1_obj, val2_obj):
         return [KArray(result)]
 
     # Both numeric
+    result = call_on_buffers(np.multiply, [val1_obj, val2_obj])
+    if result is not None:
+        return [result]
     if isinstance(val1, pd.Series) and isinstance(val2, pd.Series):
         if len(val1) != len(val2):
             return [KErrorValue(KGenericException(f"Cannot perform operation on arrays of different lengths: {len(val1)} and {len(val2)}"))]
@@ -165,13 +173,13 @@ def _k_multiply_impl(val1_obj, val2_obj):
 k_builtin_library.register(
     kfunction(
         inputs=[("x1", K_MULT_TYPE), ("x2", K_MULT_TYPE)], outputs=[("y", KAnyTypeInfo())],
-        name="*", use_values=True, use_context=False
+        name="*", use_values=True, use_context=False, vectorizable=True
     )(_k_multiply_impl)
 )
 k_builtin_library.register(
     kfunction(
         inputs=[("x1", K_MULT_TYPE), ("x2", K_MULT_TYPE)], outputs=[("y", KAnyTypeInfo())],
-        name="multiply", use_values=True, use_context=False
+        name="multiply", use_values=True, use_context=False, vectorizable=True
     )(_k_multiply_impl)
 )
 
@@ -224,13 +232,15 @@ k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.equal, np.char.equal),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="=="
+    name="==",
+    vectorizable=True
 ))
 k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.equal, np.char.equal),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="equals"
+    name="equals",
+    vectorizable=True
 ))
 
 # Not Equals
@@ -238,13 +248,15 @@ k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.not_equal, np.char.not_equal),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="!="
+    name="!=",
+    vectorizable=True
 ))
 k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.not_equal, np.char.not_equal),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="not_equals"
+    name="not_equals",
+    vectorizable=True
 ))
 
 # Greater Than
@@ -252,13 +264,15 @@ k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.greater, np.char.greater),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name=">"
+    name=">",
+    vectorizable=True
 ))
 k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.greater, np.char.greater),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="greater"
+    name="greater",
+    vectorizable=True
 ))
 
 # Less Than
@@ -266,13 +280,15 @@ k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.less, np.char.less),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="<"
+    name="<",
+    vectorizable=True
 ))
 k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.less, np.char.less),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="less"
+    name="less",
+    vectorizable=True
 ))
 
 # Greater Than or Equal
@@ -280,13 +296,15 @@ k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.greater_equal, np.char.greater_equal),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name=">="
+    name=">=",
+    vectorizable=True
 ))
 k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.greater_equal, np.char.greater_equal),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="greater_equal"
+    name="greater_equal",
+    vectorizable=True
 ))
 
 # Less Than or Equal
@@ -294,13 +312,15 @@ k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.less_equal, np.char.less_equal),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="<="
+    name="<=",
+    vectorizable=True
 ))
 k_builtin_library.register(numpy_to_kfunction(
     k_compare_wrapper(np.less_equal, np.char.less_equal),
     [("left", K_ADD_TYPE), ("right", K_ADD_TYPE)],
     [("y", KAnyTypeInfo())],
-    name="less_equal"
+    name="less_equal",
+    vectorizable=True
 ))
 
 # Logical Operators
@@ -397,20 +417,125 @@ def k_table(columns: KData):
 
 k_builtin_library.register(k_table)
 
-# load_csv(filepath: string, sep: string = ",") -> table
+# load_csv(filepath: string, sep: string = ",", lazy: bool = false, usecols: array[string] = [],
+#          nrows: integer = -1, dtypes: array[string] = []) -> table
+# dtypes fixes the type of some columns, e.g. ["price:number", "id:string"], the others are inferred
 @kfunction(
-    inputs=[("filepath", K_STRING_TYPE), ("sep", K_STRING_TYPE)],
+    inputs=[("filepath", K_STRING_TYPE), ("sep", K_STRING_TYPE), ("lazy", K_BOOLEAN_TYPE),
+            ("usecols", K_ARRAY_TYPE), ("nrows", K_INTEGER_TYPE), ("dtypes", K_ARRAY_TYPE)],
     outputs=[("y", K_TABLE_TYPE)],
     name="load_csv",
     use_values=True,
     use_context=False,
-    default_inputs={"sep": KLiteral(",", KLiteralType.STRING)}
+    default_inputs={"sep": KLiteral(",", KLiteralType.STRING), "lazy": KLiteral(False, KLiteralType.BOOLEAN),
+                    "usecols": KArray(pd.Series([], dtype="string")), "nrows": KLiteral(-1, KLiteralType.INTEGER),
+                    "dtypes": KArray(pd.Series([], dtype="string"))}
 )
-def k_table_load_csv(filepath_obj: KLiteral, sep_obj: KLiteral):
+def k_table_load_csv(filepath_obj: KLiteral, sep_obj: KLiteral, lazy_obj: KLiteral, usecols_obj: KArray,
+                     nrows_obj: KLiteral, dtypes_obj: KArray):
+    # An empty array literal is a number array, any other array must hold strings
+    for arg_name, arg in (("usecols", usecols_obj), ("dtypes", dtypes_obj)):
+        if len(arg.value) > 0 and arg.lit_type != KLiteralType.STRING:
+            return [KErrorValue(KGenericException(f"Error loading CSV: '{arg_name}' must be an array of strings"))]
+
     try:
-        df = pd.read_csv(filepath_obj.value, sep=sep_obj.value)
+        usecols = list(usecols_obj.value.dropna()) or None
+        nrows = int(nrows_obj.value) if nrows_obj.value >= 0 else None
+        types = parse_csv_types(list(dtypes_obj.value.dropna())) or None
+
+        if lazy_obj.value:
+            # Only the header is read here, the rows are read when the table is observed
+            plan = KPlanCsvScan(filepath_obj.value, sep=sep_obj.value, types=types)
+            if usecols is not None:
+                missing = [c for c in usecols if c not in plan.columns]
+                if missing:
+                    return [KErrorValue(KGenericException(f"Error loading CSV: columns not found: {', '.join(missing)}"))]
+                plan = plan.select(usecols)
+            if nrows is not None:
+                plan = plan.head(nrows)
+            return [KTable(plan)]
+
+        if current_table_backend() == "arrow":
+            return [KTable(read_csv_table(filepath_obj.value, sep=sep_obj.value, usecols=usecols, nrows=nrows, types=types))]
+        df = read_csv(filepath_obj.value, sep=sep_obj.value, usecols=usecols, nrows=nrows, types=types)
         return [KTable(df)]
     except Exception as e:
         return [KErrorValue(KGenericException(f"Error loading CSV: {str(e)}"))]
 
-k_builtin_library.register(k_table_load_csv)
\ No newline at end of file
+k_builtin_library.register(k_table_load_csv)
+
+
+def _load_arrow_file(fmt: str, filepath_obj: KLiteral, lazy_obj: KLiteral, usecols_obj: KArray, nrows_obj: KLiteral):
+    label = ARROW_FORMATS[fmt][1]
+    if len(usecols_obj.value) > 0 and usecols_obj.lit_type != KLiteralType.STRING:
+        return [KErrorValue(KGenericException(f"Error loading {label}: 'usecols' must be an array of strings"))]
+
+    try:
+        usecols = list(usecols_obj.value.dropna()) or None
+        nrows = int(nrows_obj.value) if nrows_obj.value >= 0 else None
+
+        # Only the schema is read here, the lazy plan reads the rows (and row groups) its filters need
+        scan = plan = KPlanArrowScan(filepath_obj.value, fmt)
+        if usecols is not None:
+            missing = [c for c in usecols if c not in plan.columns]
+            if missing:
+                return [KErrorValue(KGenericException(f"Error loading {label}: columns not found: {', '.join(missing)}"))]
+            plan = plan.select(usecols)
+        if nrows is not None:
+            plan = plan.head(nrows)
+
+        if lazy_obj.value:
+            return [KTable(plan)]
+        if current_table_backend() == "arrow":
+            return [KTable(scan.dataset.read_table(usecols or scan.columns, nrows))]
+        return [KTable(plan.execute())]
+    except Exception as e:
+        return [KErrorValue(KGenericException(f"Error loading {label}: {str(e)}"))]
+
+
+# load_parquet(filepath: string, lazy: bool = false, usecols: array[string] = [], nrows: integer = -1) -> table
+# load_feather and load_arrow (Arrow IPC files) take the same inputs. They need the optional pyarrow package.
+_ARROW_LOADER_INPUTS = [("filepath", K_STRING_TYPE), ("lazy", K_BOOLEAN_TYPE),
+                        ("usecols", K_ARRAY_TYPE), ("nrows", K_INTEGER_TYPE)]
+_ARROW_LOADER_DEFAULTS = {"lazy": KLiteral(False, KLiteralType.BOOLEAN),
+                          "usecols": KArray(pd.Series([], dtype="string")),
+                          "nrows": KLiteral(-1, KLiteralType.INTEGER)}
+
+@kfunction(
+    inputs=_ARROW_LOADER_INPUTS,
+    outputs=[("y", K_TABLE_TYPE)],
+    name="load_parquet",
+    use_values=True,
+    use_context=False,
+    default_inputs=_ARROW_LOADER_DEFAULTS
+)
+def k_table_load_parquet(filepath_obj: KLiteral, lazy_obj: KLiteral, usecols_obj: KArray, nrows_obj: KLiteral):
+    return _load_arrow_file("parquet", filepath_obj, lazy_obj, usecols_obj, nrows_obj)
+
+k_builtin_library.register(k_table_load_parquet)
+
+@kfunction(
+    inputs=_ARROW_LOADER_INPUTS,
+    outputs=[("y", K_TABLE_TYPE)],
+    name="load_feather",
+    use_values=True,
+    use_context=False,
+    default_inputs=_ARROW_LOADER_DEFAULTS
+)
+def k_table_load_feather(filepath_obj: KLiteral, lazy_obj: KLiteral, usecols_obj: KArray, nrows_obj: KLiteral):
+    return _load_arrow_file("feather", filepath_obj, lazy_obj, usecols_obj, nrows_obj)
+
+k_builtin_library.register(k_table_load_feather)
+
+@kfunction(
+    inputs=_ARROW_LOADER_INPUTS,
+    outputs=[("y", K_TABLE_TYPE)],
+    name="load_arrow",
+    use_values=True,
+    use_context=False,
+    default_inputs=_ARROW_LOADER_DEFAULTS
+)
+def k_table_load_arrow(filepath_obj: KLiteral, lazy_obj: KLiteral, usecols_obj: KArray, nrows_obj: KLiteral):
+    return _load_arrow_file("arrow", filepath_obj, lazy_obj, usecols_obj, nrows_obj)
+
+k_builtin_library.register(k_table_load_arrow)
\ No newline at end of file
@@ -12,7 +12,6 @@ from kira.knodes.kfunction import KFunction, kfunction
 from kira.ktypeinfo.union_type import KUnionTypeInfo
 from kira.library.node_library import KLibrary
 from kira import keval_script
-import scipy.special as sp
 
 # Create a library of basic math functions wrapping Numpy functions
 
@@ -268,13 +267,18 @@ k_math_library.register(numpy_to_kfunction(
 
 # Special Functions
 
-# Gamma function.
-k_math_library.register(numpy_to_kfunction(
-    sp.gamma,
-    [("x", K_NP_MATH_TYPE)],
-    [("y", K_NP_MATH_TYPE)],
-    name="gamma"
-))
+# Gamma function, scipy is only imported the first time it is called.
+def _build_gamma() -> KFunction:
+    import scipy.special as sp
+    return numpy_to_kfunction(
+        sp.gamma,
+        [("x", K_NP_MATH_TYPE)],
+        [("y", K_NP_MATH_TYPE)],
+        name="gamma"
+    )
+
+
+k_math_library.register_lazy("gamma", [("x", K_NP_MATH_TYPE)], [("y", K_NP_MATH_TYPE)], _build_gamma)
 
 # Sigmoid function implemented as a workflow.
 sigmoid_src = """
@@ -282,7 +286,7 @@ workflow sigmoid(x) -> y:
     y = 1 / (1 + exp(-x))
     return y
 """
-k_math_library.register(keval_script(sigmoid_src))
+k_math_library.register_lazy("sigmoid", ["x"], ["y"], lambda: keval_script(sigmoid_src))
 
 k_math_library.register(KData("PI", KLiteral(np.pi, KLiteralType.NUMBER)))
 k_math_library.register(KData("E", KLiteral(np.e, KLiteralType.NUMBER)))
\ No newline at end of file
@@ -1,9 +1,28 @@
+import datetime
+
+import numpy as np
 import pandas as pd
 
-from kira.kdata.ktable import KTable, K_TABLE_TYPE
-from kira.kdata.karray import KArray, K_ARRAY_STRING_TYPE, K_ARRAY_TYPE, K_ARRAY_BOOLEAN_TYPE, K_ARRAY_INTEGER_TYPE
-from kira.kdata.kliteral import KLiteral, KLiteralType, K_INTEGER_TYPE, K_STRING_TYPE, K_BOOLEAN_TYPE
+from kira.kdata.ktable import KTable, K_TABLE_TYPE, derived_frame
+from kira.kdata.karrow import filter_table, sort_table, concat_tables, join_tables
+from kira.kdata.kjoin import JOIN_TYPES, can_join, join
+from kira.kdata.kindex import index_lookup
+from kira.kdata.kplan import KPlanFrame, top_k, top_k_rows
+from kira.kdata.kdates import DATE_PARTS, DATE_UNITS, WORKDAY, add, as_series, date_function, date_part, \
+    difference, parse_datetime, parse_datetimes, to_literal, truncate
+from kira.kdata.kstrings import join_strings, split_strings, string_function, text_after, text_before, \
+    text_between, to_strings
+from kira.kdata.kaggregate import AGGREGATIONS, ROLLING_AGGREGATIONS, aggregate, group_rows, is_rolling_column, \
+    result_name, rolling
+from kira.core.kcontext import KContext
+from kira.core.kformula import KFormulaValue, K_FORMULA_TYPE
+from kira.kdata.karray import KArray, K_ARRAY_STRING_TYPE, K_ARRAY_TYPE, K_ARRAY_BOOLEAN_TYPE, K_ARRAY_INTEGER_TYPE, \
+    K_ARRAY_DATE_TYPE, K_ARRAY_DATETIME_TYPE
+from kira.kdata.kliteral import KLiteral, KLiteralType, K_INTEGER_TYPE, K_STRING_TYPE, K_BOOLEAN_TYPE, K_LITERAL_TYPE, \
+    K_DATE_TYPE, K_DATETIME_TYPE
 from kira.knodes.kfunction import kfunction
+from kira.knodes.knode import KNode
+from kira.library.library_utils import call_node, map_node
 from kira.ktypeinfo.union_type import KUnionTypeInfo
 from kira.kdata.kerrorvalue import KErrorValue
 from kira.kexpections.kgenericexception import KGenericException
@@ -13,6 +32,22 @@ k_table_library = KLibrary("Table")
 
 # TODO - Add checks for hstack, vstack, select
 
+# Lazy tables (e.g. load_csv(..., lazy=true)) carry a query plan instead of a DataFrame:
+# select, head, tail, sort_by, filter, remove_columns and rename_column extend the plan, so do
+# inner and left joins of a lazy table with another table (the other table is materialized),
+# every other function materializes the table through `.value`. sort_by defers the sort of
+# in-memory tables the same way, so that head(sort_by(df, "x"), 10) selects the top 10 rows.
+# Arrow tables (the "arrow" table backend) stay in Arrow through nrows, select, head, tail,
+# filter, sort_by, join and vstack, the other functions convert them to pandas through `.value`.
+# In-memory tables keep their column indexes (see KTable.column_index): filter and sort_by use them,
+# select, add_column, remove_column(s) and rename_column pass them on to the table they derive.
+
+def _missing_columns_error(df_obj: KTable, cols: list[str]) -> KErrorValue | None:
+    missing = [c for c in cols if c not in df_obj.columns]
+    if missing:
+        return KErrorValue(KGenericException(f"Columns not found in the table: {', '.join(map(str, missing))}"))
+    return None
+
 # Table Functions
 
 # nrows(df) -> int # number of rows
@@ -24,6 +59,8 @@ k_table_library = KLibrary("Table")
     use_context=False
 )
 def k_table_nrows(df_obj: KTable):
+    if df_obj.is_arrow:
+        return [KLiteral(df_obj.arrow.num_rows, KLiteralType.INTEGER)]
     return [KLiteral(len(df_obj.value), KLiteralType.INTEGER)]
 
 k_table_library.register(k_table_nrows)
@@ -37,7 +74,7 @@ k_table_library.register(k_table_nrows)
     use_context=False
 )
 def k_table_ncols(df_obj: KTable):
-    return [KLiteral(len(df_obj.value.columns), KLiteralType.INTEGER)]
+    return [KLiteral(len(df_obj.columns), KLiteralType.INTEGER)]
 
 k_table_library.register(k_table_ncols)
 
@@ -50,7 +87,7 @@ k_table_library.register(k_table_ncols)
     use_context=False
 )
 def k_table_columns(df_obj: KTable):
-    return [KArray(pd.Series(list(df_obj.value.columns)), KLiteralType.STRING)]
+    return [KArray(pd.Series(list(df_obj.columns)), KLiteralType.STRING)]
 
 k_table_library.register(k_table_columns)
 
@@ -68,7 +105,13 @@ k_table_library.register(k_table_columns)
 )
 def k_table_select(df_obj: KTable, columns_obj: KArray):
     cols = columns_obj.value.tolist()
-    return [KTable(df_obj.value[cols])]
+    if df_obj.is_lazy:
+        error = _missing_columns_error(df_obj, cols)
+        return [error if error else KTable(df_obj.plan.select(cols))]
+    if df_obj.is_arrow:
+        error = _missing_columns_error(df_obj, cols)
+        return [error if error else KTable(df_obj.arrow.select(cols))]
+    return [KTable(df_obj.value[cols]).share_indexes(df_obj)]
 
 k_table_library.register(k_table_select)
 
@@ -82,6 +125,10 @@ k_table_library.register(k_table_select)
     default_inputs={"n": KLiteral(5, KLiteralType.INTEGER)}
 )
 def k_table_head(df_obj: KTable, n_obj: KLiteral):
+    if df_obj.is_lazy:
+        return [KTable(df_obj.plan.head(n_obj.value))]
+    if df_obj.is_arrow:
+        return [KTable(df_obj.arrow.slice(0, max(int(n_obj.value), 0)))]
     return [KTable(df_obj.value.head(n_obj.value))]
 
 k_table_library.register(k_table_head)
@@ -96,6 +143,11 @@ k_table_library.register(k_table_head)
     default_inputs={"n": KLiteral(5, KLiteralType.INTEGER)}
 )
 def k_table_tail(df_obj: KTable, n_obj: KLiteral):
+    if df_obj.is_lazy:
+        return [KTable(df_obj.plan.tail(n_obj.value))]
+    if df_obj.is_arrow:
+        n = min(max(int(n_obj.value), 0), df_obj.arrow.num_rows)
+        return [KTable(df_obj.arrow.slice(df_obj.arrow.num_rows - n))]
     return [KTable(df_obj.value.tail(n_obj.value))]
 
 k_table_library.register(k_table_tail)
@@ -109,9 +161,11 @@ k_table_library.register(k_table_tail)
     use_context=False
 )
 def k_table_add_column(df_obj: KTable, name_obj: KLiteral, values_obj: KArray):
-    new_df = df_obj.value.copy()
+    # Shares the existing columns with its input under copy-on-write
+    new_df = derived_frame(df_obj.value)
     new_df[name_obj.value] = values_obj.value
-    return [KTable(new_df)]
+    kept = {name: name for name in df_obj.columns if name != name_obj.value}
+    return [KTable(new_df).share_indexes(df_obj, kept)]
 
 k_table_library.register(k_table_add_column)
 
@@ -127,7 +181,7 @@ def k_table_remove_column(df_obj: KTable, name_obj: KLiteral):
     new_df = df_obj.value
     if name_obj.value in new_df.columns:
         new_df = new_df.drop(columns=[name_obj.value])
-    return [KTable(new_df)]
+    return [KTable(new_df).share_indexes(df_obj)]
 
 # remove_columns(df, names: array[string]) -> table
 @kfunction(
@@ -138,12 +192,14 @@ def k_table_remove_column(df_obj: KTable, name_obj: KLiteral):
     use_context=False
 )
 def k_table_remove_columns(df_obj: KTable, names_obj: KArray):
+    if df_obj.is_lazy:
+        return [KTable(df_obj.plan.drop(names_obj.value.to_list()))]
     new_df = df_obj.value
     # TODO: Add error handling for when column names do not exist
     cols = [name for name in names_obj.value.to_list() if name in new_df.columns]
     if cols:
         new_df = new_df.drop(columns=cols)
-    return [KTable(new_df)]
+    return [KTable(new_df).share_indexes(df_obj)]
 
 k_table_library.register(k_table_remove_columns)
 
@@ -157,8 +213,12 @@ k_table_library.register(k_table_remove_columns)
 )
 def k_table_rename_column(df_obj: KTable, old_name_obj: KLiteral, new_name_obj: KLiteral):
     # TODO: Add error handling for when old column name does not exist, when new column name already exists, and when new column name doesn't have a valid syntax 
-    new_df = df_obj.value.rename(columns={old_name_obj.value: new_name_obj.value})
-    return [KTable(new_df)]
+    if df_obj.is_lazy:
+        return [KTable(df_obj.plan.rename({old_name_obj.value: new_name_obj.value}))]
+    old_name, new_name = old_name_obj.value, new_name_obj.value
+    new_df = df_obj.value.rename(columns={old_name: new_name})
+    kept = {name: new_name if name == old_name else name for name in df_obj.columns if name != new_name}
+    return [KTable(new_df).share_indexes(df_obj, kept)]
 
 k_table_library.register(k_table_rename_column)
 
@@ -216,7 +276,85 @@ def k_table_melt(df_obj: KTable, id_vars_obj):
 
 k_table_library.register(k_table_melt)
 
-# aggregate(df: table, by: str | array[str], columns: str | array[str], functions: str | array[str]) -> table # DO NOT IMPLEMENT
+def _aggregations(columns_obj, functions_obj) -> list[tuple[str, str]] | KErrorValue:
+    """
+    Pairs the columns with the functions: one function applies to every column, one column gets every
+    function, otherwise the i-th function applies to the i-th column.
+    """
+    columns = columns_obj.value.tolist() if isinstance(columns_obj, KArray) else [columns_obj.value]
+    functions = functions_obj.value.tolist() if isinstance(functions_obj, KArray) else [functions_obj.value]
+    if len(functions) == 1:
+        functions = functions * len(columns)
+    elif len(columns) == 1:
+        columns = columns * len(functions)
+    if len(columns) != len(functions):
+        return KErrorValue(KGenericException(
+            f"Expected one function per column, got {len(columns)} columns and {len(functions)} functions"))
+    return list(dict.fromkeys((str(c), str(f)) for c, f in zip(columns, functions)))
+
+
+# aggregate(df: table, by: str | array[str], columns: str | array[str], functions: str | array[str]) -> table
+# one row per group: the `by` columns, then `column_function` for every aggregation (e.g. price_mean)
+@kfunction(
+    inputs=[
+        ("df", K_TABLE_TYPE),
+        ("by", KUnionTypeInfo([K_STRING_TYPE, K_ARRAY_STRING_TYPE])),
+        ("columns", KUnionTypeInfo([K_STRING_TYPE, K_ARRAY_STRING_TYPE])),
+        ("functions", KUnionTypeInfo([K_STRING_TYPE, K_ARRAY_STRING_TYPE]))
+    ],
+    outputs=[("y", K_TABLE_TYPE)],
+    name="aggregate",
+    use_values=True,
+    use_context=True
+)
+def k_table_aggregate(df_obj: KTable, by_obj, columns_obj, functions_obj, context: KContext):
+    by_cols = by_obj.value.tolist() if isinstance(by_obj, KArray) else [by_obj.value]
+    aggregations = _aggregations(columns_obj, functions_obj)
+    if isinstance(aggregations, KErrorValue):
+        return [aggregations]
+    error = _missing_columns_error(df_obj, by_cols + [c for c, _ in aggregations])
+    if error:
+        return [error]
+
+    # Functions that are not native aggregations are nodes reducing the array of a group to a value
+    nodes = {}
+    for _, f in aggregations:
+        if f not in AGGREGATIONS:
+            node = context.get_object(f)
+            if not isinstance(node, KNode):
+                return [KErrorValue(KGenericException(f"Unknown aggregation '{f}'"))]
+            nodes[f] = node
+
+    df = df_obj.value
+    native = [(c, f) for c, f in aggregations if f not in nodes]
+    try:
+        result = aggregate(df, by_cols, native) if native else None
+    except (TypeError, ValueError) as e:
+        return [KErrorValue(KGenericException(f"Cannot aggregate the table: {e}"))]
+    if not nodes:
+        return [KTable(result)]
+
+    order, bounds = group_rows(df, by_cols)
+    if result is None:
+        # The keys of the groups, in the same order
+        result = df[by_cols].iloc[order[bounds[:-1]]].reset_index(drop=True)
+    for column, f in aggregations:
+        if f not in nodes:
+            continue
+        values = df[column].iloc[order].reset_index(drop=True)
+        groups = [KArray(values.iloc[start:stop].reset_index(drop=True)) for start, stop in zip(bounds[:-1], bounds[1:])]
+        out = []
+        for res in map_node(nodes[f], groups, context):
+            if not res:
+                return [KErrorValue(res.error)]
+            if not isinstance(res.value, KLiteral):
+                return [KErrorValue(KGenericException(f"aggregate expects '{f}' to return a single value per group"))]
+            out.append(res.value.value)
+        result[result_name(column, f)] = pd.array(out)
+    # Back to the order of the aggregations
+    return [KTable(result[by_cols + [result_name(c, f) for c, f in aggregations]])]
+
+k_table_library.register(k_table_aggregate)
 
 # join(df1: table, df2: table, on: str | array[str], how: str = "inner") -> table
 @kfunction(
@@ -240,8 +378,32 @@ def k_table_join(df1_data, df2_data, on_data, how_data):
     
     on_cols = on_obj.value.tolist() if isinstance(on_obj, KArray) else on_obj.value
     suffixes = (f"_{df1_data.name}", f"_{df2_data.name}")
+    if how_obj.value not in JOIN_TYPES:
+        return [KErrorValue(KGenericException(
+            f"Unknown join type '{how_obj.value}', expected one of: {', '.join(JOIN_TYPES)}"))]
+    keys = on_cols if isinstance(on_cols, list) else [on_cols]
+    error = _missing_columns_error(df1_obj, keys) or _missing_columns_error(df2_obj, keys)
+    if error:
+        return [error]
     
-    joined = pd.merge(df1_obj.value, df2_obj.value, on=on_cols, how=how_obj.value, suffixes=suffixes)
+    if df1_obj.is_lazy and can_join(df1_obj.plan.sample(), df2_obj.value, keys, how_obj.value):
+        # The rows of the lazy table stream through the join index of the other one (see KPlanJoin)
+        return [KTable(df1_obj.plan.join(df2_obj, keys, how_obj.value, suffixes))]
+
+    if df1_obj.is_arrow and df2_obj.is_arrow:
+        joined = join_tables(df1_obj.arrow, df2_obj.arrow, keys, how_obj.value, suffixes)
+        if joined is not None:
+            return [KTable(joined)]
+
+    joined = join(df1_obj, df2_obj, keys, how_obj.value, suffixes)
+    if joined is not None:
+        return [KTable(joined)]
+
+    try:
+        joined = pd.merge(df1_obj.value, df2_obj.value, on=on_cols, how=how_obj.value, suffixes=suffixes)
+    except (TypeError, ValueError) as e:
+        # e.g. keys of different kinds
+        return [KErrorValue(KGenericException(f"Cannot join the tables: {e}"))]
     return [KTable(joined)]
 
 k_table_library.register(k_table_join)
@@ -268,6 +430,10 @@ k_table_library.register(k_table_hstack)
     use_context=False
 )
 def k_table_vstack(df1_obj: KTable, df2_obj: KTable):
+    if df1_obj.is_arrow and df2_obj.is_arrow:
+        stacked = concat_tables([df1_obj.arrow, df2_obj.arrow])
+        if stacked is not None:
+            return [KTable(stacked)]
     return [KTable(pd.concat([df1_obj.value, df2_obj.value], axis=0, ignore_index=True))]
 
 k_table_library.register(k_table_vstack)
@@ -287,7 +453,41 @@ def k_table_concat(dfs_obj: KArray):
 
 k_table_library.register(k_table_concat)
 
-# rolling(df, window, columns: str | array[str], functions: str | array[str]) -> table # DO NOT IMPLEMENT
+# rolling(df, window: int, columns: str | array[str], functions: str | array[str]) -> table
+# adds `column_function` for every aggregation over the last `window` rows (missing until the window is full)
+@kfunction(
+    inputs=[
+        ("df", K_TABLE_TYPE),
+        ("window", K_INTEGER_TYPE),
+        ("columns", KUnionTypeInfo([K_STRING_TYPE, K_ARRAY_STRING_TYPE])),
+        ("functions", KUnionTypeInfo([K_STRING_TYPE, K_ARRAY_STRING_TYPE]))
+    ],
+    outputs=[("y", K_TABLE_TYPE)],
+    name="rolling",
+    use_values=True,
+    use_context=False
+)
+def k_table_rolling(df_obj: KTable, window_obj: KLiteral, columns_obj, functions_obj):
+    window = int(window_obj.value)
+    if window < 1:
+        return [KErrorValue(KGenericException(f"The window must be at least 1 row, got {window}"))]
+    aggregations = _aggregations(columns_obj, functions_obj)
+    if isinstance(aggregations, KErrorValue):
+        return [aggregations]
+    error = _missing_columns_error(df_obj, [c for c, _ in aggregations])
+    if error:
+        return [error]
+
+    unknown = [f for _, f in aggregations if f not in ROLLING_AGGREGATIONS]
+    if unknown:
+        return [KErrorValue(KGenericException(f"Unknown rolling aggregation '{unknown[0]}'"))]
+    df = df_obj.value
+    not_numeric = [c for c, _ in aggregations if not is_rolling_column(df[c])]
+    if not_numeric:
+        return [KErrorValue(KGenericException(f"Column '{not_numeric[0]}' is not numeric"))]
+    return [KTable(rolling(df, window, aggregations))]
+
+k_table_library.register(k_table_rolling)
 
 # sort_by(df, by: str | array[str], ascending: bool = True)
 @kfunction(
@@ -301,32 +501,154 @@ k_table_library.register(k_table_concat)
 def k_table_sort_by(df_obj: KTable, by_obj, ascending_obj: KLiteral):
     by_cols = by_obj.value.tolist() if isinstance(by_obj, KArray) else by_obj.value
     ascending = bool(ascending_obj.value)
-    return [KTable(df_obj.value.sort_values(by=by_cols, ascending=ascending))]
+    if df_obj.is_lazy:
+        by_list = by_cols if isinstance(by_cols, list) else [by_cols]
+        error = _missing_columns_error(df_obj, by_list)
+        return [error if error else KTable(df_obj.plan.sort(by_list, ascending))]
+    if df_obj.is_arrow:
+        return [KTable(sort_table(df_obj.arrow, by_cols if isinstance(by_cols, list) else [by_cols], ascending))]
+    by_list = by_cols if isinstance(by_cols, list) else [by_cols]
+    error = _missing_columns_error(df_obj, by_list)
+    if error:
+        return [error]
+    # Deferred, so that a head or tail taken next selects its rows instead of sorting the table.
+    # A full sort on one column keeps its sorted permutation in the column index of the table.
+    return [KTable(KPlanFrame(df_obj).sort(by_list, ascending))]
 
 k_table_library.register(k_table_sort_by)
 
+# group_apply(df, by: str | array[str], column: str, f: str) -> table # replaces column with f applied to each group
+@kfunction(
+    inputs=[("df", K_TABLE_TYPE), ("by", KUnionTypeInfo([K_STRING_TYPE, K_ARRAY_STRING_TYPE])),
+            ("column", K_STRING_TYPE), ("f", K_STRING_TYPE)],
+    outputs=[("y", K_TABLE_TYPE)],
+    name="group_apply",
+    use_values=True,
+    use_context=True
+)
+def k_table_group_apply(df_obj: KTable, by_obj, column_obj: KLiteral, f_obj: KLiteral, context: KContext):
+    by_cols = by_obj.value.tolist() if isinstance(by_obj, KArray) else [by_obj.value]
+    column = str(column_obj.value)
+    error = _missing_columns_error(df_obj, by_cols + [column])
+    if error:
+        return [error]
+
+    node = context.get_object(str(f_obj.value))
+    if not isinstance(node, KNode):
+        return [KErrorValue(KGenericException(f"Object '{f_obj.value}' is not a KNode"))]
+
+    df = df_obj.value
+    values = df[column].reset_index(drop=True)
+    not_per_group = KErrorValue(KGenericException(
+        f"group_apply expects '{node.name}' to return a value or an array of the group length"))
+
+    if node.is_vectorizable(context):
+        # An element-wise body gives the same result on the whole column as on every group
+        res = call_node(node, KArray(values), context)
+        if not res:
+            return [KErrorValue(res.error)]
+        if isinstance(res.value, KLiteral):
+            return [KTable(df.assign(**{column: res.value.value}))]
+        if not isinstance(res.value, KArray) or len(res.value.value) != len(df):
+            return [not_per_group]
+        # The array itself, on the row labels of the table: a NumPy copy would lose its missing values
+        return [KTable(df.assign(**{column: pd.Series(res.value.value.array, index=df.index)}))]
+
+    # Sort the rows by group once, every group is then a contiguous slice of the column
+    codes = df.groupby(by_cols, sort=False, dropna=False).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(codes[order])) + 1, [len(order)]])
+    column_values = KArray(values.iloc[order].reset_index(drop=True))
+    groups = [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+    results = map_node(node, [KArray(column_values.value.iloc[start:stop].reset_index(drop=True), column_values.lit_type)
+                              for start, stop in groups], context)
+
+    out = np.empty(len(df), dtype=object)
+    for (start, stop), res in zip(groups, results):
+        if not res:
+            return [KErrorValue(res.error)]
+        idx = order[start:stop]
+        if isinstance(res.value, KLiteral):
+            out[idx] = res.value.value
+        elif isinstance(res.value, KArray) and len(res.value.value) == len(idx):
+            out[idx] = res.value.value.to_numpy(dtype=object)
+        else:
+            return [not_per_group]
+    return [KTable(df.assign(**{column: pd.array(out.tolist())}))]
+
+k_table_library.register(k_table_group_apply)
+
 # Table and Array Functions
 
 # getitem(x,  ) # get value for specific index
 
-# filter(x: table | array, condition: array[bool]) -> table | array
+# filter(x: table | array, condition: array[bool] | formula) -> table | array
 @kfunction(
-    inputs=[("x", KUnionTypeInfo([K_TABLE_TYPE, K_ARRAY_TYPE])), ("condition", K_ARRAY_BOOLEAN_TYPE)],
+    inputs=[("x", KUnionTypeInfo([K_TABLE_TYPE, K_ARRAY_TYPE])), ("condition", KUnionTypeInfo([K_ARRAY_BOOLEAN_TYPE, K_FORMULA_TYPE]))],
     outputs=[("y", KUnionTypeInfo([K_TABLE_TYPE, K_ARRAY_TYPE]))],
     name="filter",
     use_values=True,
     use_context=False
 )
 def k_table_filter(x_obj, condition_obj):
+    if isinstance(x_obj, KTable) and x_obj.is_lazy:
+        if isinstance(condition_obj, KFormulaValue):
+            # Checked on a sample of the plan, so that a wrong formula fails here and not when the table is read
+            res = condition_obj.evaluate(x_obj.plan.sample())
+            if not res:
+                return [KErrorValue(res.error)]
+            if not K_ARRAY_BOOLEAN_TYPE.match(res):
+                return [KErrorValue(KGenericException(f"The filter condition must be an array of booleans, got {res.value} instead!"))]
+            # Predicate pushdown: the formula is evaluated on the rows reaching the filter
+            return [KTable(x_obj.plan.filter(condition_obj))]
+        num_rows = x_obj.plan.num_rows
+        if num_rows is not None:
+            if num_rows != len(condition_obj.value):
+                return [KErrorValue(KGenericException(f"The table and the condition must have the same length, got {num_rows} and {len(condition_obj.value)} instead!"))]
+            return [KTable(x_obj.plan.filter(condition_obj.value.to_numpy(dtype=bool, na_value=False)))]
+        # A mask is positional: the rows of the plan are needed to check it, the table is materialized below
+
+    if isinstance(condition_obj, KFormulaValue) and isinstance(x_obj, KTable) and not x_obj.is_arrow:
+        # Comparisons of indexed columns with literals narrow the rows down before the formula is evaluated
+        found = index_lookup(x_obj, condition_obj)
+        if found is not None:
+            rows, exact = found
+            subset = x_obj.value.iloc[rows]
+            if exact:
+                return [KTable(subset)]
+            res = condition_obj.evaluate(subset)
+            if not res:
+                return [KErrorValue(res.error)]
+            if not K_ARRAY_BOOLEAN_TYPE.match(res):
+                return [KErrorValue(KGenericException(f"The filter condition must be an array of booleans, got {res.value} instead!"))]
+            return [KTable(subset[res.value.value.to_numpy(dtype=bool, na_value=False)])]
+
+    if isinstance(condition_obj, KFormulaValue):
+        # Arrow tables only convert the columns the formula references
+        table = (x_obj if x_obj.is_arrow else x_obj.value) if isinstance(x_obj, KTable) else None
+        res = condition_obj.evaluate(table)
+        if not res:
+            return [KErrorValue(res.error)]
+        if not K_ARRAY_BOOLEAN_TYPE.match(res):
+            return [KErrorValue(KGenericException(f"The filter condition must be an array of booleans, got {res.value} instead!"))]
+        condition_obj = res.value
+
+    if isinstance(x_obj, KTable) and x_obj.is_arrow:
+        if x_obj.arrow.num_rows != len(condition_obj.value):
+            return [KErrorValue(KGenericException(f"The table and the condition must have the same length, got {x_obj.arrow.num_rows} and {len(condition_obj.value)} instead!"))]
+        return [KTable(filter_table(x_obj.arrow, condition_obj.value.to_numpy(dtype=bool, na_value=False)))]
+
     if len(x_obj.value) != len(condition_obj.value):
         obj_type_name = ("table"
                          if isinstance(x_obj, KTable) else
                          "array")
         return [KErrorValue(KGenericException(f"The {obj_type_name} and the condition must have the same length, got {len(x_obj.value)} and {len(condition_obj.value)} instead!"))]
 
+    # Positional, the rows of a sorted or filtered table keep their labels
+    mask = condition_obj.value.to_numpy(dtype=bool, na_value=False)
     if isinstance(x_obj, KTable):
-        return [KTable(x_obj.value[condition_obj.value])]
-    return [KArray(x_obj.value[condition_obj.value])]
+        return [KTable(x_obj.value[mask])]
+    return [KArray(x_obj.value[mask])]
 
 k_table_library.register(k_table_filter)
 
@@ -397,38 +719,483 @@ def k_slice_columns(x_obj, index_obj):
 
 k_table_library.register(k_slice_columns)
 
+def _top_k(x_obj, n_obj: KLiteral, by_obj: KLiteral, ascending: bool):
+    n = int(n_obj.value)
+    if n < 0:
+        return [KErrorValue(KGenericException(f"The number of values must be at least 0, got {n} instead!"))]
+
+    if isinstance(x_obj, KArray):
+        values = x_obj.value
+        rows = top_k_rows(values, n, ascending) if n < len(values) else None
+        top = values.iloc[rows] if rows is not None else values.sort_values(ascending=ascending, kind="stable").head(n)
+        return [KArray(top, x_obj.lit_type)]
+
+    by = str(by_obj.value)
+    error = _missing_columns_error(x_obj, [by])
+    if error:
+        return [error]
+    if x_obj.is_lazy:
+        # Sort then head: fused into a top-k by the plan optimizer
+        return [KTable(x_obj.plan.sort([by], ascending).head(n))]
+    if x_obj.is_arrow:
+        return [KTable(sort_table(x_obj.arrow, [by], ascending).slice(0, n))]
+    return [KTable(top_k(x_obj.value, [by], n, ascending))]
+
+# nlargest(x: table | array, n: int, by: str = "") -> table | array # as head(sort_by(x, by, false), n), by is a column of the table
+@kfunction(
+    inputs=[("x", KUnionTypeInfo([K_TABLE_TYPE, K_ARRAY_TYPE])), ("n", K_INTEGER_TYPE), ("by", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_TABLE_TYPE, K_ARRAY_TYPE]))],
+    name="nlargest",
+    use_values=True,
+    use_context=False,
+    default_inputs={"by": KLiteral("", KLiteralType.STRING)}
+)
+def k_nlargest(x_obj, n_obj: KLiteral, by_obj: KLiteral):
+    return _top_k(x_obj, n_obj, by_obj, ascending=False)
+
+k_table_library.register(k_nlargest)
+
+# nsmallest(x: table | array, n: int, by: str = "") -> table | array # as head(sort_by(x, by), n), by is a column of the table
+@kfunction(
+    inputs=[("x", KUnionTypeInfo([K_TABLE_TYPE, K_ARRAY_TYPE])), ("n", K_INTEGER_TYPE), ("by", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_TABLE_TYPE, K_ARRAY_TYPE]))],
+    name="nsmallest",
+    use_values=True,
+    use_context=False,
+    default_inputs={"by": KLiteral("", KLiteralType.STRING)}
+)
+def k_nsmallest(x_obj, n_obj: KLiteral, by_obj: KLiteral):
+    return _top_k(x_obj, n_obj, by_obj, ascending=True)
+
+k_table_library.register(k_nsmallest)
+
 # String Functions - both string literals and arrays
+# They run on the whole array at once through the kernels of kira.kdata.kstrings, dictionary-encoded
+# arrays on their distinct values only; missing values stay missing.
+
+K_TEXT_TYPE = KUnionTypeInfo([K_STRING_TYPE, K_ARRAY_STRING_TYPE])
+
+def _text_result(result, error: str = "The string function has no result for this string"):
+    return [KErrorValue(KGenericException(error)) if result is None else result]
+
+def _delimiter_error(*delimiters: KLiteral) -> KErrorValue | None:
+    if any(str(d.value) == "" for d in delimiters):
+        return KErrorValue(KGenericException("The delimiter cannot be an empty string"))
+    return None
 
 # string(x: any) -> string # convert to string
+@kfunction(
+    inputs=[("x", KUnionTypeInfo([K_LITERAL_TYPE, K_ARRAY_TYPE]))],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="string",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_string(x_obj):
+    return [to_strings(x_obj)]
+
+k_table_library.register(k_string)
 
 # trim(x: string | array[string]) -> string | array[string] # remove whitespaces
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="trim",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_trim(x_obj):
+    return _text_result(string_function(x_obj, lambda v: v.str.strip()))
+
+k_table_library.register(k_trim)
+
 # upper(x: string | array[string]) -> string | array[string]
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="upper",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_upper(x_obj):
+    return _text_result(string_function(x_obj, lambda v: v.str.upper()))
+
+k_table_library.register(k_upper)
+
 # lower(x: string | array[string]) -> string | array[string]
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="lower",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_lower(x_obj):
+    return _text_result(string_function(x_obj, lambda v: v.str.lower()))
+
+k_table_library.register(k_lower)
+
 # proper(x: string | array[string]) -> string | array[string] # capitalize first letter
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="proper",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_proper(x_obj):
+    # First letter of every word, as PROPER in spreadsheets
+    return _text_result(string_function(x_obj, lambda v: v.str.title()))
 
-# text_len(x: string | array[string]) -> string | array[string]
+k_table_library.register(k_proper)
+
+# text_len(x: string | array[string]) -> int | array[int]
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_INTEGER_TYPE, K_ARRAY_INTEGER_TYPE]))],
+    name="text_len",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_text_len(x_obj):
+    return _text_result(string_function(x_obj, lambda v: v.str.len()))
+
+k_table_library.register(k_text_len)
 
 # text_replace(x: string | array[string], old: string, new: string) -> string | array[string]
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE), ("old", K_STRING_TYPE), ("new", K_STRING_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="text_replace",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_text_replace(x_obj, old_obj: KLiteral, new_obj: KLiteral):
+    old, new = str(old_obj.value), str(new_obj.value)
+    return _text_result(string_function(x_obj, lambda v: v.str.replace(old, new, regex=False)))
+
+k_table_library.register(k_text_replace)
+
+# text_split(x: string | array[string], delimiter: string) -> array[string] | table # array: one column per part
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE), ("delimiter", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_ARRAY_STRING_TYPE, K_TABLE_TYPE]))],
+    name="text_split",
+    use_values=True,
+    use_context=False
+)
+def k_text_split(x_obj, delimiter_obj: KLiteral):
+    error = _delimiter_error(delimiter_obj)
+    if error:
+        return [error]
+    delimiter = str(delimiter_obj.value)
+    if isinstance(x_obj, KArray):
+        return [KTable(split_strings(x_obj.value, delimiter))]
+    return [KArray(pd.Series(str(x_obj.value).split(delimiter), dtype="string"), KLiteralType.STRING)]
+
+k_table_library.register(k_text_split)
+
+# text_join(x: array[string] | table, delimiter: string = "") -> string | array[string] # table: row by row
+@kfunction(
+    inputs=[("x", KUnionTypeInfo([K_ARRAY_STRING_TYPE, K_TABLE_TYPE])), ("delimiter", K_STRING_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="text_join",
+    use_values=True,
+    use_context=False,
+    default_inputs={"delimiter": KLiteral("", KLiteralType.STRING)}
+)
+def k_text_join(x_obj, delimiter_obj: KLiteral):
+    delimiter = str(delimiter_obj.value)
+    if isinstance(x_obj, KArray):
+        return [KLiteral(x_obj.value.astype("string").str.cat(sep=delimiter), KLiteralType.STRING)]
+    df = x_obj.value
+    if df.shape[1] == 0:
+        return [KErrorValue(KGenericException("Cannot join the columns of a table without columns"))]
+    return [KArray(join_strings([df[c] for c in df.columns], delimiter), KLiteralType.STRING)]
+
+k_table_library.register(k_text_join)
+
+# text_find(x: string | array[string], needle: string) -> int | array[int] # position of needle, -1 if absent
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE), ("needle", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_INTEGER_TYPE, K_ARRAY_INTEGER_TYPE]))],
+    name="text_find",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_text_find(x_obj, needle_obj: KLiteral):
+    needle = str(needle_obj.value)
+    return _text_result(string_function(x_obj, lambda v: v.str.find(needle)))
 
-# text_split(x: string | array[string], delimiter: string) -> string | array[string]
-# text_join(x: array[string] | array[array[string]]) -> string | array[string]
+k_table_library.register(k_text_find)
 
-# text_find(x: string | array[string], needle: string) -> int | array[int]
 # text_contains(x: string | array[string], needle: string) -> boolean | array[boolean]
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE), ("needle", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_BOOLEAN_TYPE, K_ARRAY_BOOLEAN_TYPE]))],
+    name="text_contains",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_text_contains(x_obj, needle_obj: KLiteral):
+    needle = str(needle_obj.value)
+    return _text_result(string_function(x_obj, lambda v: v.str.contains(needle, regex=False)))
+
+k_table_library.register(k_text_contains)
 
 # text_slice(x: string | array[string], start: int, stop: int) -> string | array[string] # slice string
-# text_before(x: string | array[string], delimiter: string) -> string | array[string]
-# text_after(x: string | array[string], delimiter: string) -> string | array[string]
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE), ("start", K_INTEGER_TYPE), ("stop", K_INTEGER_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="text_slice",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_text_slice(x_obj, start_obj: KLiteral, stop_obj: KLiteral):
+    start, stop = int(start_obj.value), int(stop_obj.value)
+    return _text_result(string_function(x_obj, lambda v: v.str.slice(start, stop)))
+
+k_table_library.register(k_text_slice)
+
+# text_before(x: string | array[string], delimiter: string) -> string | array[string] # missing without delimiter
+# a string literal cannot be missing: without the delimiter it is an error instead
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE), ("delimiter", K_STRING_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="text_before",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_text_before(x_obj, delimiter_obj: KLiteral):
+    error = _delimiter_error(delimiter_obj)
+    if error:
+        return [error]
+    delimiter = str(delimiter_obj.value)
+    return _text_result(string_function(x_obj, lambda v: text_before(v, delimiter)),
+                        f"Delimiter '{delimiter}' not found in the string")
+
+k_table_library.register(k_text_before)
+
+# text_after(x: string | array[string], delimiter: string) -> string | array[string] # missing without delimiter
+# a string literal cannot be missing: without the delimiter it is an error instead
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE), ("delimiter", K_STRING_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="text_after",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_text_after(x_obj, delimiter_obj: KLiteral):
+    error = _delimiter_error(delimiter_obj)
+    if error:
+        return [error]
+    delimiter = str(delimiter_obj.value)
+    return _text_result(string_function(x_obj, lambda v: text_after(v, delimiter)),
+                        f"Delimiter '{delimiter}' not found in the string")
+
+k_table_library.register(k_text_after)
+
 # text_between(x: string | array[string], left_delimiter: string, right_delimiter: string) -> string | array[string]
+# missing without both delimiters, an error for a string literal
+@kfunction(
+    inputs=[("x", K_TEXT_TYPE), ("left_delimiter", K_STRING_TYPE), ("right_delimiter", K_STRING_TYPE)],
+    outputs=[("y", K_TEXT_TYPE)],
+    name="text_between",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_text_between(x_obj, left_obj: KLiteral, right_obj: KLiteral):
+    error = _delimiter_error(left_obj, right_obj)
+    if error:
+        return [error]
+    left, right = str(left_obj.value), str(right_obj.value)
+    return _text_result(string_function(x_obj, lambda v: text_between(v, left, right)),
+                        f"Delimiters '{left}' and '{right}' not found in the string")
+
+k_table_library.register(k_text_between)
+
+# DateTime Functions - both date / datetime literals and arrays
+# Arrays are computed on their datetime64 buffers through the kernels of kira.kdata.kdates. Dates and
+# datetimes are told apart by the unit of the array (see DATE_UNIT), not by looking at the values.
+
+K_DATE_OR_TIME_TYPE = KUnionTypeInfo([K_DATE_TYPE, K_DATETIME_TYPE, K_ARRAY_DATE_TYPE, K_ARRAY_DATETIME_TYPE])
+K_DATE_INPUT_TYPE = KUnionTypeInfo([K_STRING_TYPE, K_ARRAY_STRING_TYPE, K_DATE_TYPE, K_DATETIME_TYPE,
+                                    K_ARRAY_DATE_TYPE, K_ARRAY_DATETIME_TYPE])
+
+def _unit_error(unit: str, units, kind: str = "unit") -> KErrorValue | None:
+    if unit not in units:
+        return KErrorValue(KGenericException(f"Unknown {kind} '{unit}', expected one of: {', '.join(units)}"))
+    return None
+
+def _date_result(result):
+    return [KErrorValue(KGenericException("The date function has no result for this date")) if result is None else result]
+
+def _to_dates(x_obj, fmt_obj: KLiteral, lit_type: KLiteralType):
+    fmt = str(fmt_obj.value)
+    try:
+        if isinstance(x_obj, KArray):
+            values = parse_datetimes(x_obj.value, fmt) if x_obj.lit_type == KLiteralType.STRING else x_obj.value
+            return [KArray(values, lit_type)]
+        if x_obj.lit_type == KLiteralType.STRING:
+            return [to_literal(parse_datetime(str(x_obj.value), fmt), lit_type)]
+        return [to_literal(x_obj.value, lit_type)]
+    except (ValueError, OverflowError) as e:
+        return [KErrorValue(KGenericException(f"Cannot read as {lit_type.name.lower()}: {e}"))]
+
+# date(x: string | array[string] | datetime, format: string = "") -> date | array[date] # format guessed if empty
+@kfunction(
+    inputs=[("x", K_DATE_INPUT_TYPE), ("format", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_DATE_TYPE, K_ARRAY_DATE_TYPE]))],
+    name="date",
+    use_values=True,
+    use_context=False,
+    default_inputs={"format": KLiteral("", KLiteralType.STRING)},
+    vectorizable=True
+)
+def k_date(x_obj, format_obj: KLiteral):
+    return _to_dates(x_obj, format_obj, KLiteralType.DATE)
+
+k_table_library.register(k_date)
+
+# datetime(x: string | array[string] | date, format: string = "") -> datetime | array[datetime] # format guessed if empty
+@kfunction(
+    inputs=[("x", K_DATE_INPUT_TYPE), ("format", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_DATETIME_TYPE, K_ARRAY_DATETIME_TYPE]))],
+    name="datetime",
+    use_values=True,
+    use_context=False,
+    default_inputs={"format": KLiteral("", KLiteralType.STRING)},
+    vectorizable=True
+)
+def k_datetime(x_obj, format_obj: KLiteral):
+    return _to_dates(x_obj, format_obj, KLiteralType.DATETIME)
 
-# DateTime Functions
+k_table_library.register(k_datetime)
 
-# date(x: string | array[string]) -> date | array[date]
-# datetime(x: string | array[string]) -> datetime | array[datetime]
+# today() -> date
+@kfunction(
+    inputs=[],
+    outputs=[("y", K_DATE_TYPE)],
+    name="today",
+    use_values=True,
+    use_context=False
+)
+def k_today():
+    return [to_literal(datetime.date.today(), KLiteralType.DATE)]
+
+k_table_library.register(k_today)
+
+# now() -> datetime
+@kfunction(
+    inputs=[],
+    outputs=[("y", K_DATETIME_TYPE)],
+    name="now",
+    use_values=True,
+    use_context=False
+)
+def k_now():
+    return [to_literal(datetime.datetime.now(), KLiteralType.DATETIME)]
 
-# today()
-# now()
+k_table_library.register(k_now)
 
-# DateDiff as DataType
-# convertion function from DateDiff to periods, e.g. days, months, years, working days, quarters, hour, minutes, seconds, etc
+# date_trunc(x: date | datetime, unit: string) -> date | datetime # start of the unit, date for day and longer units
+@kfunction(
+    inputs=[("x", K_DATE_OR_TIME_TYPE), ("unit", K_STRING_TYPE)],
+    outputs=[("y", K_DATE_OR_TIME_TYPE)],
+    name="date_trunc",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_date_trunc(x_obj, unit_obj: KLiteral):
+    # The keys to resample a table by, e.g. aggregate(add_column(df, "month", date_trunc(df.day, "month")), ...)
+    unit = str(unit_obj.value)
+    error = _unit_error(unit, DATE_UNITS)
+    if error:
+        return [error]
+    lit_type = KLiteralType.DATE if DATE_UNITS.index(unit) >= DATE_UNITS.index("day") else x_obj.lit_type
+    return _date_result(date_function(x_obj, lambda v: truncate(v, unit), lit_type))
+
+k_table_library.register(k_date_trunc)
+
+# date_part(x: date | datetime, part: string) -> int | array[int] # year, quarter, month, day, weekday (0 = Monday), ...
+@kfunction(
+    inputs=[("x", K_DATE_OR_TIME_TYPE), ("part", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_INTEGER_TYPE, K_ARRAY_INTEGER_TYPE]))],
+    name="date_part",
+    use_values=True,
+    use_context=False,
+    vectorizable=True
+)
+def k_date_part(x_obj, part_obj: KLiteral):
+    part = str(part_obj.value)
+    error = _unit_error(part, list(DATE_PARTS), "part")
+    if error:
+        return [error]
+    return _date_result(date_function(x_obj, lambda v: date_part(v, part)))
+
+k_table_library.register(k_date_part)
+
+# date_add(x: date | datetime, n: int, unit: string = "day") -> date | datetime # unit can be "workday"
+@kfunction(
+    inputs=[("x", K_DATE_OR_TIME_TYPE), ("n", K_INTEGER_TYPE), ("unit", K_STRING_TYPE)],
+    outputs=[("y", K_DATE_OR_TIME_TYPE)],
+    name="date_add",
+    use_values=True,
+    use_context=False,
+    default_inputs={"unit": KLiteral("day", KLiteralType.STRING)},
+    vectorizable=True
+)
+def k_date_add(x_obj, n_obj: KLiteral, unit_obj: KLiteral):
+    unit, n = str(unit_obj.value), int(n_obj.value)
+    error = _unit_error(unit, DATE_UNITS + (WORKDAY,))
+    if error:
+        return [error]
+    # Dates moved by less than a day become datetimes
+    lit_type = KLiteralType.DATETIME if unit in ("second", "minute", "hour") else x_obj.lit_type
+    try:
+        return _date_result(date_function(x_obj, lambda v: add(v, n, unit), lit_type))
+    except (OverflowError, ValueError) as e:
+        return [KErrorValue(KGenericException(f"Cannot add {n} {unit}(s): {e}"))]
+
+k_table_library.register(k_date_add)
+
+# date_diff(start: date | datetime, end: date | datetime, unit: string = "day") -> int | array[int]
+# Whole units from start to end (unit can be "workday"): differences are numbers of a unit, not a DateDiff type
+@kfunction(
+    inputs=[("start", K_DATE_OR_TIME_TYPE), ("end", K_DATE_OR_TIME_TYPE), ("unit", K_STRING_TYPE)],
+    outputs=[("y", KUnionTypeInfo([K_INTEGER_TYPE, K_ARRAY_INTEGER_TYPE]))],
+    name="date_diff",
+    use_values=True,
+    use_context=False,
+    default_inputs={"unit": KLiteral("day", KLiteralType.STRING)},
+    vectorizable=True
+)
+def k_date_diff(start_obj, end_obj, unit_obj: KLiteral):
+    unit = str(unit_obj.value)
+    error = _unit_error(unit, DATE_UNITS + (WORKDAY,))
+    if error:
+        return [error]
+    start, end = as_series(start_obj), as_series(end_obj)
+    if len(start) != len(end) and 1 not in (len(start), len(end)):
+        return [KErrorValue(KGenericException(
+            f"Cannot perform operation on arrays of different lengths: {len(start)} and {len(end)}"))]
+    result = difference(start, end, unit)
+    if isinstance(start_obj, KArray) or isinstance(end_obj, KArray):
+        return [KArray(result, KLiteralType.INTEGER)]
+    return [KLiteral(result.iloc[0].item(), KLiteralType.INTEGER)]
 
+k_table_library.register(k_date_diff)
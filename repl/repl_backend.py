@@ -15,8 +15,8 @@ from kira.kdata.karray import KArray
 from kira.kdata.ktable import KTable
 from kira.kdata.kcollection import KCollection
 
-from kira.klanguage.ktokenizer import ktokenize
-from kira.klanguage.kast import kparse, AstAssignment, AstExpressionStmt, AstSymbol, AstWorkflow
+from kira.klanguage.kincremental import kparse_pipeline
+from kira.klanguage.kast import AstAssignment, AstExpressionStmt, AstSymbol, AstWorkflow
 
 
 def format_value(name: str, obj: Any) -> str:
@@ -76,6 +76,8 @@ class KiraREPL:
             self.project = project
 
         self.author = "repl_user"
+        # Parse of the previous line, re-entering an edited pipeline only reparses the edited stages
+        self._last_parse = None
 
     def _parse_line(self, line: str) -> dict:
         """
@@ -91,8 +93,9 @@ class KiraREPL:
             return {"type": "command", "target": None, "rewritten": line_stripped}
 
         try:
-            tokens = [t for t in ktokenize(line_stripped) if t.token_type.name != "WHITESPACE"]
-            ast = kparse(tokens)
+            parse, _ = kparse_pipeline(line_stripped, self._last_parse)
+            self._last_parse = parse
+            ast = parse.ast
         except Exception as e:
             return {"type": "error", "target": None, "rewritten": line_stripped, "error": str(e)}
 
@@ -41,7 +41,7 @@ def main():
         "--suite", 
         type=str, 
         default="all", 
-        help="Specific test suite to run: unit, snapshots, fuzzer, or all (default: all)"
+        help="Specific test suite to run: unit, snapshots, fuzzer, startup, or all (default: all)"
     )
     parser.add_argument(
         "--update-snapshots", 
@@ -92,6 +92,11 @@ def main():
         cmd = [sys.executable, os.path.join(root_dir, "tests", "pseudo_random", "test_fuzzer.py")]
         # Note: We could customize iterations if needed by passing flags, but the fuzzer runs internally.
         suites_to_run.append(("Fuzzer Suite", cmd, env))
+
+    # Setup Startup Budget
+    if selected in ("all", "startup"):
+        cmd = [sys.executable, os.path.join(root_dir, "tests", "startup", "test_import_time.py")]
+        suites_to_run.append(("Startup Budget", cmd, env))
         
     if not suites_to_run:
         print(f"No suites found matching choice: {args.suite}")
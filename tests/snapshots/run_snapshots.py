@@ -4,7 +4,8 @@ import argparse
 import difflib
 
 # Ensure the root is in sys.path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
 
 from repl.repl_backend import KiraREPL
 
@@ -45,8 +46,11 @@ def main():
     parser.add_argument("--update", action="store_true", help="Update snapshot references")
     args, unknown = parser.parse_known_args()
     
-    test_files_dir = os.path.join(os.path.dirname(__file__), "..", "test_files")
-    references_dir = os.path.join(os.path.dirname(__file__), "references")
+    test_files_dir = os.path.join(ROOT_DIR, "tests", "test_files")
+    references_dir = os.path.join(ROOT_DIR, "tests", "snapshots", "references")
+
+    # Scripts refer to the files of tests/test_files/shared_data from the repository root
+    os.chdir(ROOT_DIR)
     
     os.makedirs(references_dir, exist_ok=True)
     
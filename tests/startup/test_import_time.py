@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import subprocess
+import importlib.util
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Cold start budgets in seconds (fresh interpreter, imports and project creation)
+REPL_BUDGET = 1.5
+GUI_BUDGET = 3.0
+
+# Modules that must not be imported until a node that needs them is used
+DEFERRED_MODULES = ["scipy", "scipy.special"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {entry}
+from kproject.kproject import KProject
+from kproject.kpersistence_manager import KPersistenceManager
+project = KProject(KPersistenceManager())
+elapsed = time.perf_counter() - start
+project.evaluator.stop()
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(entry: str) -> dict:
+    """Runs the startup of `entry` in a fresh interpreter and returns its time and loaded modules."""
+    env = os.environ.copy()
+    env["PYTHONPATH"] = ROOT_DIR
+    result = subprocess.run([sys.executable, "-c", PROBE.format(entry=entry)], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check_entry(name: str, entry: str, budget: float) -> bool:
+    # Best of three runs, the first one also pays for filling the OS file cache
+    runs = [measure(entry) for _ in range(3)]
+    best = min(run["elapsed"] for run in runs)
+    loaded = [m for m in DEFERRED_MODULES if m in runs[0]["modules"]]
+
+    ok = best <= budget and not loaded
+    status = "[OK]" if ok else "[FAIL]"
+    print(f"{status} {name}: cold start {best:.3f}s (budget {budget:.1f}s)")
+    if loaded:
+        print(f"       deferred modules imported at startup: {', '.join(loaded)}")
+    return ok
+
+
+def main():
+    ok = check_entry("REPL", "run_repl", REPL_BUDGET)
+
+    if importlib.util.find_spec("PySide6") is None:
+        print("[SKIP] GUI: PySide6 is not installed")
+    else:
+        ok = check_entry("GUI", "run_gui", GUI_BUDGET) and ok
+
+    if not ok:
+        sys.exit(1)
+    print("\nStartup is within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+import pandas as pd
+
+import kira
+import library
+from kira import KContext, KData, KLiteral, KLiteralType
+from kira.kdata.karray import DICTIONARY_MIN_LENGTH, KArray, dictionary_encode, is_dictionary_strings
+from kira.kdata.kcsv import concat_chunks
+from kira.kdata.ktable import KTable
+from kira.library.library_utils import call_on_buffers
+
+
+def evaluate(script: str, **values):
+    """The value of `_r = script` with `values` in the context."""
+    ctx = KContext(library.get_library_namespace())
+    for name, value in values.items():
+        ctx.register_object(KData(name, value))
+    kira.keval_script(f"_r = {script}").eval(ctx)
+    return ctx.get_object("_r").value
+
+
+def series_path(values: np.ndarray, mask: np.ndarray | None = None) -> KArray:
+    """The array built from a Series, as every array was before buffers."""
+    arr = KArray(pd.Series(values))
+    return arr if mask is None else KArray(arr.value.mask(mask))
+
+
+class TestBufferArrays(unittest.TestCase):
+
+    VALUES = [
+        np.array([True, False, True]),
+        np.array([1, -2, 3], dtype=np.int32),
+        np.array([1, 2, 3], dtype=np.uint8),
+        np.array([4, 5, 6], dtype=np.int64),
+        np.array([0.5, np.nan, 2.0], dtype=np.float32),
+        np.array([0.5, 1.5, -np.inf]),
+    ]
+
+    def test_from_numpy_matches_the_series_path(self):
+        for values in self.VALUES:
+            for mask in (None, np.array([False, True, False])):
+                with self.subTest(dtype=values.dtype, mask=mask is not None):
+                    fast, slow = KArray.from_numpy(values, mask), series_path(values, mask)
+                    self.assertEqual(fast.lit_type, slow.lit_type)
+                    self.assertEqual(str(fast.type), str(slow.type))
+                    pd.testing.assert_series_equal(fast.value, slow.value)
+
+    def test_buffer_of_a_series_is_not_a_copy(self):
+        arr = KArray(pd.Series([1, 2, 3], dtype="Int64"))
+        values, mask, index = arr.buffer
+        self.assertTrue(np.shares_memory(values, arr.value.array._data))
+        self.assertIsNone(mask)
+        self.assertIs(index, arr.value.index)
+
+        with_nulls = KArray(pd.Series([1.5, None], dtype="Float64"))
+        self.assertEqual(with_nulls.buffer[1].tolist(), [False, True])
+
+    def test_fast_path_matches_the_series_path(self):
+        x, y = np.array([1, 2, 3, 4]), np.array([0.5, 0.0, -1.0, 2.0])
+        for script in ["X + Y", "X * 2", "X * Y + 1", "sqrt(X)", "X > Y", "X / Y"]:
+            with self.subTest(script=script):
+                fast = evaluate(script, X=KArray.from_numpy(x), Y=KArray.from_numpy(y))
+                slow = evaluate(script, X=series_path(x), Y=series_path(y))
+                self.assertIsNotNone(fast._buffer)
+                self.assertEqual(fast.lit_type, slow.lit_type)
+                pd.testing.assert_series_equal(fast.value, slow.value)
+
+    def test_nulls_fall_back_to_pandas(self):
+        with_null = KArray(pd.Series([1, None, 3], dtype="Int64"))
+        plain = KArray(pd.Series([10, 20, 30], dtype="Int64"))
+        self.assertIsNone(call_on_buffers(np.add, [with_null, plain]))
+        res = evaluate("X + Y", X=with_null, Y=plain)
+        self.assertEqual(res.value.tolist(), [11, pd.NA, 33])
+        self.assertEqual(res.lit_type, KLiteralType.INTEGER)
+
+        # NaN read from a float buffer is a missing number
+        res = evaluate("X * 2", X=KArray.from_numpy(np.array([1.0, np.nan])))
+        self.assertEqual(res.value.tolist(), [2.0, pd.NA])
+
+    def test_labels_that_differ_fall_back(self):
+        left = KArray(pd.Series([1, 2], dtype="Int64", index=[5, 6]))
+        right = KArray(pd.Series([1, 2], dtype="Int64"))
+        self.assertIsNone(call_on_buffers(np.add, [left, right]))
+        self.assertIsNone(call_on_buffers(np.add, [KLiteral(1), KLiteral(2)]))
+
+    def test_strings_and_objects_never_take_the_fast_path(self):
+        strings = KArray(pd.Series(["a", "b", None]))
+        objects = KArray.from_numpy(np.array(["a", "b"], dtype=object))
+        self.assertEqual((strings.lit_type, objects.lit_type), (KLiteralType.STRING, KLiteralType.STRING))
+        self.assertIsNone(strings.buffer)
+        self.assertIsNone(objects.buffer)
+        self.assertIsNone(call_on_buffers(np.add, [strings, KLiteral(1)]))
+        with mock.patch.object(KArray, "from_numpy", wraps=KArray.from_numpy) as from_numpy:
+            self.assertEqual(evaluate('S + "x"', S=strings).value.tolist(), ["ax", "bx", pd.NA])
+            self.assertEqual(evaluate("S * 2", S=strings).value.tolist(), ["aa", "bb", pd.NA])
+            self.assertEqual(evaluate('S == "a"', S=objects).value.tolist(), [True, False])
+        from_numpy.assert_not_called()
+
+
+class TestDateArrays(unittest.TestCase):
+
+    def test_series_in_seconds_is_a_date_array_only_without_times(self):
+        midnights = pd.Series(pd.to_datetime(["2024-01-31", None, "2024-02-29"])).dt.as_unit("s")
+        self.assertEqual(KArray(midnights).lit_type, KLiteralType.DATE)
+
+        times = pd.Series(pd.to_datetime(["2024-01-31 00:00", None, "2024-02-29 10:30"])).dt.as_unit("s")
+        arr = KArray(times)
+        self.assertEqual(arr.lit_type, KLiteralType.DATETIME)
+        self.assertEqual(str(arr.value.dtype), "datetime64[us]")
+        self.assertEqual(arr.value.iloc[2], pd.Timestamp("2024-02-29 10:30"))
+        # A given type is not checked against the values
+        self.assertEqual(KArray(times, KLiteralType.DATE).lit_type, KLiteralType.DATE)
+
+
+class TestDictionaryStrings(unittest.TestCase):
+
+    N = 2 * DICTIONARY_MIN_LENGTH
+
+    def setUp(self):
+        rows = np.arange(self.N)
+        self.regions = pd.Series(np.array(["north", "south", "east", None], dtype=object)[rows % 4],
+                                 dtype="string", name="region")
+        self.others = pd.Series(np.array(["west", "north", None], dtype=object)[rows % 3], dtype="string")
+
+    def test_low_cardinality_columns_are_encoded_when_loaded(self):
+        df = pd.DataFrame({"region": self.regions, "code": [f"c{i}" for i in range(self.N)], "n": np.arange(self.N)})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.csv")
+            df.to_csv(path, index=False)
+            for lazy in ("false", "true"):
+                with self.subTest(lazy=lazy):
+                    loaded = evaluate(f'load_csv("{path}", ",", {lazy})')
+                    self.assertTrue(is_dictionary_strings(loaded.value["region"].dtype))
+                    self.assertEqual(str(loaded.value["code"].dtype), "string")
+                    pd.testing.assert_series_equal(loaded.value["region"].astype("string"), self.regions)
+
+        self.assertTrue(is_dictionary_strings(dictionary_encode(self.regions).dtype))
+        # Too many distinct values, or too short to be worth it
+        distinct = pd.Series([f"c{i % (self.N // 2 + 1)}" for i in range(self.N)], dtype="string")
+        self.assertIs(dictionary_encode(distinct), distinct)
+        short = self.regions.head(DICTIONARY_MIN_LENGTH - 1)
+        self.assertIs(dictionary_encode(short), short)
+
+    def test_encoded_columns_compute_as_plain_strings(self):
+        encoded = {"X": KArray(dictionary_encode(self.regions)), "Y": KArray(dictionary_encode(self.others))}
+        self.assertTrue(all(is_dictionary_strings(arr.value.dtype) for arr in encoded.values()))
+        plain = {"X": KArray(self.regions), "Y": KArray(self.others)}
+        # Missing values in both: compared as the plain strings compare them
+        for script in ['X == "north"', 'X < "south"', "X == Y", "X != Y", "X == X", "X < Y", "unique(X)", 'X + "!"']:
+            with self.subTest(script=script):
+                res, expected = evaluate(script, **encoded), evaluate(script, **plain)
+                self.assertEqual(res.lit_type, expected.lit_type)
+                pd.testing.assert_series_equal(res.value.astype(expected.value.dtype), expected.value)
+
+    def test_concat_of_encoded_columns_equals_the_plain_strings(self):
+        encoded = [pd.DataFrame({"r": dictionary_encode(s)}) for s in (self.regions, self.others)]
+        plain = [pd.DataFrame({"r": s}) for s in (self.regions, self.others)]
+        res = evaluate("vstack(A, B)", A=KTable(encoded[0]), B=KTable(encoded[1]))
+        expected = evaluate("vstack(A, B)", A=KTable(plain[0]), B=KTable(plain[1]))
+        pd.testing.assert_frame_equal(res.value.astype("string"), expected.value)
+        # Streamed chunks with different dictionaries
+        pd.testing.assert_frame_equal(concat_chunks(encoded).astype("string"), pd.concat(plain))
+
+
+if __name__ == "__main__":
+    unittest.main()
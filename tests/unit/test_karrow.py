@@ -0,0 +1,183 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import pandas as pd
+
+import kira
+import library
+from kira import KContext, KData
+from kira.kdata import karrow, kplan
+from kira.kdata.karrow import KArrowDataset, from_pandas
+from kira.kdata.ktable import KTable, table_backend_scope
+
+# pyarrow is an optional dependency: without it only the error of the loaders is checked
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+SALES_CSV = os.path.join(os.path.dirname(__file__), "..", "test_files", "shared_data", "sales.csv")
+REGIONS_CSV = os.path.join(os.path.dirname(__file__), "..", "test_files", "shared_data", "regions.csv")
+FORMATS = ("parquet", "feather", "arrow")
+
+
+def evaluate(script: str, **tables):
+    """The value of `_r = script` with `tables` in the context."""
+    ctx = KContext(library.get_library_namespace())
+    for name, table in tables.items():
+        ctx.register_object(KData(name, table))
+    kira.keval_script(f"_r = {script}").eval(ctx)
+    return ctx.get_object("_r")
+
+
+def write_arrow_files(df: pd.DataFrame, directory: str) -> dict[str, str]:
+    """Writes `df` as a Parquet (2 rows per row group), a Feather and an Arrow IPC file."""
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    paths = {fmt: os.path.join(directory, f"sales.{fmt}") for fmt in FORMATS}
+    pyarrow.parquet.write_table(table, paths["parquet"], row_group_size=2)
+    pyarrow.feather.write_feather(table, paths["feather"])
+    with pyarrow.ipc.new_file(paths["arrow"], table.schema) as writer:
+        writer.write_table(table)
+    return paths
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrowLoaders(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        cls.expected = evaluate(f'load_csv("{SALES_CSV}")').value.value
+        cls.paths = write_arrow_files(cls.expected, cls.dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def test_loaders_read_the_written_table(self):
+        for fmt, path in self.paths.items():
+            with self.subTest(fmt=fmt):
+                table = evaluate(f'load_{fmt}("{path}")').value
+                self.assertFalse(table.is_lazy)
+                pd.testing.assert_frame_equal(table.value, self.expected)
+
+    def test_usecols_and_nrows(self):
+        for fmt, path in self.paths.items():
+            for lazy in ("false", "true"):
+                with self.subTest(fmt=fmt, lazy=lazy):
+                    df = evaluate(f'load_{fmt}("{path}", {lazy}, ["price", "id"], 4)').value.value
+                    pd.testing.assert_frame_equal(df, self.expected[["price", "id"]].head(4))
+
+    def test_pushed_down_columns_and_predicate_equal_filtering_the_loaded_table(self):
+        script = 'T |> filter($qty >= 3$) |> filter($region != "south"$) |> select(["id", "price"])'
+        eager_df = evaluate(script, T=KTable(self.expected)).value.value
+        read_table = KArrowDataset.read_table
+        for fmt, path in self.paths.items():
+            with self.subTest(fmt=fmt), \
+                    mock.patch.object(KArrowDataset, "read_table", autospec=True, side_effect=read_table) as spy:
+                lazy = evaluate(f'load_{fmt}("{path}", true)').value
+                df = evaluate(script, T=lazy).value.value
+                pd.testing.assert_frame_equal(df, eager_df)
+                # The last read is the plan's: the columns it needs and both predicates
+                _, columns, nrows, predicates = spy.call_args.args
+                self.assertEqual((columns, nrows, len(predicates)), (["id", "region", "qty", "price"], None, 2))
+                self.assertTrue(lazy.is_lazy)
+
+    def test_streamed_batches_equal_the_loaded_table(self):
+        script = 'T |> filter($qty > 1$) |> sort_by("price", false)'
+        eager_df = evaluate(script, T=KTable(self.expected)).value.value
+        for fmt, path in self.paths.items():
+            with self.subTest(fmt=fmt), mock.patch.object(kplan, "PLAN_STREAM_MIN_BYTES", 0):
+                df = evaluate(script, T=evaluate(f'load_{fmt}("{path}", true)').value).value.value
+                pd.testing.assert_frame_equal(df, eager_df)
+
+    def test_missing_or_unreadable_file_is_an_error_value(self):
+        garbage = os.path.join(self.dir.name, "garbage.parquet")
+        with open(garbage, "wb") as f:
+            f.write(b"not a parquet file")
+        for script, message in [
+            (f'load_parquet("{os.path.join(self.dir.name, "missing.parquet")}")', "Error loading Parquet"),
+            (f'load_feather("{os.path.join(self.dir.name, "missing.feather")}", true)', "Error loading Feather"),
+            (f'load_parquet("{garbage}")', "Error loading Parquet"),
+            (f'load_arrow("{garbage}")', "Error loading Arrow IPC"),
+            (f'load_parquet("{self.paths["parquet"]}", false, ["id", "nope"])', "columns not found: nope"),
+            (f'load_feather("{self.paths["feather"]}", false, [1, 2])', "'usecols' must be an array of strings"),
+        ]:
+            with self.subTest(script=script):
+                res = evaluate(script)
+                self.assertFalse(res)
+                self.assertIn(message, repr(res.error))
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrowBackend(unittest.TestCase):
+
+    SCRIPTS = [
+        'filter(T, $qty > 1$)',
+        'filter(T, $region == "north"$) |> select(["id", "price"])',
+        'sort_by(T, "price", false)',
+        'sort_by(T, ["region", "qty"])',
+        'join(T, R, "region")',
+        'join(T, R, "region", "left")',
+        'vstack(T, T |> head(2))',
+    ]
+
+    def setUp(self):
+        self.sales = evaluate(f'load_csv("{SALES_CSV}")').value.value
+        regions = evaluate(f'load_csv("{REGIONS_CSV}")').value.value
+        # price is in both tables: suffixed in the output
+        self.regions = regions.assign(price=pd.array([1.0, 2.0, 3.0], dtype="Float64"))
+
+    def test_arrow_tables_agree_with_the_pandas_backend(self):
+        arrow_tables = {"T": KTable(from_pandas(self.sales)), "R": KTable(from_pandas(self.regions))}
+        for script in self.SCRIPTS:
+            with self.subTest(script=script):
+                res = evaluate(script, **arrow_tables).value
+                self.assertTrue(res.is_arrow)
+                expected = evaluate(script, T=KTable(self.sales), R=KTable(self.regions)).value.value
+                # Arrow tables have no row labels
+                pd.testing.assert_frame_equal(res.value, expected.reset_index(drop=True))
+
+    def test_vstack_promotes_the_column_types(self):
+        ints = pd.DataFrame({"x": pd.array([1, 2], dtype="Int64")})
+        floats = pd.DataFrame({"x": pd.array([1.5, None], dtype="Float64")})
+        res = evaluate("vstack(A, B)", A=KTable(from_pandas(ints)), B=KTable(from_pandas(floats))).value
+        self.assertTrue(res.is_arrow)
+        expected = evaluate("vstack(A, B)", A=KTable(ints), B=KTable(floats)).value.value
+        pd.testing.assert_frame_equal(res.value, expected)
+
+    def test_from_pandas_keeps_dates_as_arrow_dates(self):
+        df = pd.DataFrame({"d": pd.to_datetime(pd.Series(["2024-01-31", None])).dt.as_unit("s"),
+                           "t": pd.to_datetime(pd.Series(["2024-01-31 10:30", None])).dt.as_unit("us")})
+        table = from_pandas(df)
+        self.assertEqual([str(t) for t in table.schema.types], ["date32[day]", "timestamp[us]"])
+        pd.testing.assert_frame_equal(KTable(table).value, KTable(df).value)
+
+    def test_read_csv_table_with_nrows(self):
+        script = f'load_csv("{SALES_CSV}", ",", false, [], 3, ["day:date"])'
+        with table_backend_scope("arrow"):
+            table = evaluate(script).value
+        self.assertTrue(table.is_arrow)
+        self.assertEqual(table.arrow.num_rows, 3)
+        pd.testing.assert_frame_equal(table.value, evaluate(script).value.value)
+
+
+@unittest.skipIf(pyarrow is not None, "pyarrow is installed")
+class TestArrowLoadersWithoutPyarrow(unittest.TestCase):
+
+    def test_loader_is_an_error_value(self):
+        self.assertFalse(karrow.HAS_PYARROW)
+        res = evaluate('load_parquet("sales.parquet")')
+        self.assertFalse(res)
+        self.assertIn("requires pyarrow", repr(res.error))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(ROOT)
+
+import kira
+from kira.core.kformula import KFormula
+from kira.kdata.kdata import KData
+from kira.knodes.knode_instance import KNodeInstance
+
+SOURCE = 'r = f(g(1, "a", $x > 2$), [h(3), y], h(3))'
+
+
+def anonymous_names(obj) -> list[str]:
+    """The names of the anonymous nodes of a built expression, depth first."""
+    names = []
+    children = obj.node_inputs if isinstance(obj, KNodeInstance) else \
+        [obj.expression] if isinstance(obj, KFormula) else []
+    for child in children:
+        if isinstance(child, (KData, KNodeInstance, KFormula)):
+            names.append(child.name)
+        names.extend(anonymous_names(child))
+    return names
+
+
+def names_of(src: str) -> list[str]:
+    return anonymous_names(kira.keval_script(src))
+
+
+class TestMerkleNames(unittest.TestCase):
+
+    def test_names_do_not_depend_on_the_hash_seed(self):
+        script = f"import kira, tests.unit.test_kbuilder as t; print(t.names_of({SOURCE!r}))"
+        outputs = set()
+        for seed in ("0", "1", "12345"):
+            env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=ROOT)
+            out = subprocess.run([sys.executable, "-c", script], env=env, cwd=ROOT, capture_output=True,
+                                 text=True, check=True).stdout
+            outputs.add(out.strip().splitlines()[-1])
+        self.assertEqual(outputs, {str(names_of(SOURCE))})
+
+    def test_identical_subtrees_share_a_digest(self):
+        names = names_of(SOURCE)
+        h_calls = [name for name in names if name.startswith("call_")][-2:]
+        self.assertEqual(h_calls[0], h_calls[1])
+        # Written elsewhere, or with other spacing
+        self.assertIn(h_calls[0], names_of("s = k(0, h( 3 ))"))
+        self.assertEqual(len(set(names)), len(names) - 2)
+
+    def test_changed_leaf_changes_only_its_path(self):
+        before = names_of(SOURCE)
+        after = names_of(SOURCE.replace('"a"', '"b"'))
+        changed = [(old, new) for old, new in zip(before, after) if old != new]
+        # The leaf, then g: f is the assignment target and keeps its name
+        self.assertEqual(len(before), len(after))
+        self.assertEqual([old.split("_")[0] for old, _ in changed], ["call", "lit"])
+        self.assertEqual(before.index(changed[0][0]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from kira.klanguage import kcache
+from kira.klanguage.kcache import KParseCache
+
+LINES = ['a = 1 + 2', 'b = load_csv("x.csv") |> head(3)', 'c = a * b']
+
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = KParseCache()
+
+    def test_hit_returns_the_same_ast_without_parsing(self):
+        first = self.cache.parse(LINES[1])
+        with mock.patch.object(kcache, "kparse", wraps=kcache.kparse) as kparse:
+            second = self.cache.parse("  " + LINES[1] + "\n")
+        kparse.assert_not_called()
+        self.assertIs(second, first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_edited_line_is_the_only_miss(self):
+        asts = [self.cache.parse(line) for line in LINES]
+        edited = LINES[:1] + ['b = load_csv("x.csv") |> head(4)'] + LINES[2:]
+        with mock.patch.object(kcache, "kparse", wraps=kcache.kparse) as kparse:
+            new_asts = [self.cache.parse(line) for line in edited]
+        self.assertEqual(kparse.call_count, 1)
+        self.assertIs(new_asts[0], asts[0])
+        self.assertIs(new_asts[2], asts[2])
+        self.assertIsNot(new_asts[1], asts[1])
+        self.assertEqual(new_asts[1].expression.args[1].value, 4)
+
+    def test_syntax_errors_are_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(SyntaxError):
+                self.cache.parse("x = )")
+        self.assertEqual((len(self.cache), self.cache.misses), (0, 2))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = KParseCache(maxsize=2)
+        cache.parse(LINES[0])
+        cache.parse(LINES[1])
+        cache.parse(LINES[0])
+        cache.parse(LINES[2])
+        self.assertEqual(len(cache), 2)
+        with mock.patch.object(kcache, "kparse", wraps=kcache.kparse) as kparse:
+            cache.parse(LINES[0])
+            cache.parse(LINES[2])
+            kparse.assert_not_called()
+            # Evicted: parsed again, and the size stays bounded
+            cache.parse(LINES[1])
+            self.assertEqual(kparse.call_count, 1)
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
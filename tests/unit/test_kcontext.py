@@ -0,0 +1,68 @@
+import ast
+import inspect
+import os
+import sys
+import textwrap
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from kira import KData, KLiteral, KLiteralType, KSymbol
+from kira.core.kcontext import KContext, KFrame, KFrameLayout, KNamespace
+from kira.core.kformula import KFormulaContext
+
+CONTEXT_CLASSES = [KContext, KFrame, KNamespace, KFormulaContext]
+
+
+def literal(name: str, value: int) -> KData:
+    return KData(name, KLiteral(value, KLiteralType.INTEGER))
+
+
+def slots(cls) -> set[str]:
+    return {name for klass in cls.__mro__ for name in getattr(klass, "__slots__", ())}
+
+
+class TestFrameSlots(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = KContext().register_object(literal("x", 0))
+        self.layout = KFrameLayout(["x", "y"])
+        self.frame = KFrame(self.layout, self.parent)
+
+    def test_layout_names_are_stored_in_slots(self):
+        self.frame.register_object(literal("y", 2))
+        self.frame.register_object(literal("z", 3))
+        self.assertEqual(self.frame.get_slot(self.layout.slot("y")).value.value, 2)
+        self.assertIsNone(self.frame.get_slot(self.layout.slot("x")))
+        # Names outside the layout are kept by name
+        self.assertEqual(self.frame.lookup_local("z").value.value, 3)
+        self.assertEqual(sorted(obj.name for obj in self.frame.local_objects()), ["y", "z"])
+
+    def test_bound_symbol_reads_its_slot(self):
+        symbol = KSymbol("x")
+        symbol.bind(self.layout, 0, self.layout.slot("x"))
+        # Empty slot: resolved by name in the parents
+        self.assertEqual(symbol.eval(self.frame).value.value, 0)
+        self.frame.register_object(literal("x", 1))
+        self.assertEqual(symbol.eval(self.frame).value.value, 1)
+        # One context below the frame
+        symbol.bind(self.layout, 1, self.layout.slot("x"))
+        self.assertEqual(symbol.eval(KContext(self.frame)).value.value, 1)
+
+    def test_undeclared_attribute(self):
+        for context in [self.parent, self.frame, KNamespace([]), KFormulaContext(self.parent)]:
+            with self.subTest(context=type(context).__name__), self.assertRaises(AttributeError):
+                context.cache = {}
+
+    def test_attributes_set_by_the_classes_are_declared(self):
+        for cls in CONTEXT_CLASSES:
+            tree = ast.parse(textwrap.dedent(inspect.getsource(cls)))
+            assigned = {node.attr for node in ast.walk(tree)
+                        if isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Store)
+                        and isinstance(node.value, ast.Name) and node.value.id == "self"}
+            with self.subTest(cls=cls.__name__):
+                self.assertLessEqual(assigned, slots(cls))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from kira.kdata import kcsv, kplan
+from kira.kdata.kcsv import read_csv
+from kira.kdata.kplan import KPlanCsvScan
+
+# b only turns out to be a string column in the second chunk of two rows
+WIDENED_CSV = "a,b\n1,1.5\n2,2\n3,x\n4,3e2\n"
+
+
+class TestChunkedCsv(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as f:
+            f.write(WIDENED_CSV)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_widened_column_keeps_the_text_of_earlier_chunks(self):
+        df = read_csv(self.path, chunk_rows=2)
+        self.assertEqual(list(df["b"]), ["1.5", "2", "x", "3e2"])
+        self.assertEqual(list(df["a"]), [1, 2, 3, 4])
+
+    def test_widened_column_with_row_limit(self):
+        df = read_csv(self.path, nrows=3, chunk_rows=2)
+        self.assertEqual(list(df["b"]), ["1.5", "2", "x"])
+
+    def test_integer_widened_to_number(self):
+        with open(self.path, "w") as f:
+            f.write("a\n1\n2\n2.5\n")
+        df = read_csv(self.path, chunk_rows=2)
+        self.assertEqual(str(df["a"].dtype), "Float64")
+        self.assertEqual(list(df["a"]), [1.0, 2.0, 2.5])
+
+    def test_streamed_plan_keeps_the_text_of_earlier_chunks(self):
+        with mock.patch.object(kplan, "PLAN_STREAM_MIN_BYTES", 0), mock.patch.object(kcsv, "CSV_CHUNK_ROWS", 2):
+            plan = KPlanCsvScan(self.path).rename({"b": "text"}).sort(["a"], ascending=False)
+            df = plan.execute()
+        self.assertEqual(list(df["text"]), ["3e2", "x", "2", "1.5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import pandas as pd
+
+import kira
+import library
+from kira import KContext, KData, KLiteral, KLiteralType
+from kira.core.kformula import KFormulaValue
+from kira.kdata.ktable import KTable
+
+
+def formula_value(ctx: KContext, formula: str) -> KFormulaValue:
+    return KFormulaValue(kira.keval_script(f"f = ${formula}$"), ctx)
+
+
+class TestFormulaValue(unittest.TestCase):
+
+    def setUp(self):
+        self.ctx = KContext(library.get_library_namespace())
+        self.ctx.register_object(KData("k", KLiteral(1, KLiteralType.INTEGER)))
+        self.table = KTable(pd.DataFrame({"a": pd.array([1, 2, 3], dtype="Int64"),
+                                          "b": pd.array(["x", "y", "z"], dtype="string")}))
+
+    def test_columns_are_read_when_looked_up(self):
+        with mock.patch.object(KTable, "column", autospec=True, side_effect=KTable.column) as column:
+            value = formula_value(self.ctx, "a > k")
+            column.assert_not_called()
+            res = value.evaluate(self.table)
+        self.assertEqual(list(res.value.value), [False, True, True])
+        self.assertEqual([call.args[1] for call in column.call_args_list], ["a"])
+
+    def test_reevaluated_after_its_inputs_change(self):
+        value = formula_value(self.ctx, "a > k")
+        self.assertEqual(list(value.evaluate(self.table).value.value), [False, True, True])
+        self.ctx.register_object(KData("k", KLiteral(2, KLiteralType.INTEGER)))
+        self.assertEqual(list(value.evaluate(self.table).value.value), [False, False, True])
+
+    def test_errors_are_error_values(self):
+        res = formula_value(self.ctx, "missing > k").evaluate(self.table)
+        self.assertFalse(res)
+        self.assertIn("'missing' not found", repr(res.error))
+
+        # A node taking the formula returns the error as its value
+        out = self.ctx.get_object("filter")({"x": KData("x", self.table),
+                                             "condition": KData("condition", formula_value(self.ctx, "a + k"))},
+                                            self.ctx)[0]
+        self.assertFalse(out)
+        self.assertIn("array of booleans", repr(out.error))
+
+
+if __name__ == "__main__":
+    unittest.main()
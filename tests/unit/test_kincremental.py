@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from kira.klanguage.kast import AstCall, parse_expression
+from kira.klanguage.kincremental import kparse_pipeline
+from kira.klanguage.ktokenizer import ktokenize
+
+
+class TestParseExpression(unittest.TestCase):
+
+    def test_single_expression(self):
+        expr = parse_expression(ktokenize("t |> head(3)"))
+        self.assertIsInstance(expr, AstCall)
+        self.assertEqual(expr.func_name, "head")
+
+    def test_tokens_left_after_the_expression(self):
+        with self.assertRaises(SyntaxError):
+            parse_expression(ktokenize("t |> head(3)"), pipes=False)
+
+
+class TestPipelineParse(unittest.TestCase):
+
+    def test_unchanged_code_keeps_its_ast(self):
+        first, _ = kparse_pipeline('x = t |> head(3) |> sort_by("a")')
+        second, diff = kparse_pipeline('x = t |> head(3) |> sort_by("a")', first)
+        self.assertTrue(diff.is_empty)
+        self.assertIs(second.ast, first.ast)
+
+    def test_edited_stage_is_the_first_changed(self):
+        first, _ = kparse_pipeline('x = t |> head(3) |> sort_by("a")')
+        _, diff = kparse_pipeline('x = t |> head(4) |> sort_by("a")', first)
+        self.assertEqual(diff.first_changed, 1)
+        self.assertEqual(diff.unchanged, [0])
+
+    def test_moved_stage_gets_its_new_position(self):
+        first, _ = kparse_pipeline('x = t |> head(3) |> sort_by("a")')
+        second, diff = kparse_pipeline('x = table |> head(3) |> sort_by("a")', first)
+        self.assertEqual(diff.first_changed, 0)
+        self.assertEqual(first.stage_keys[1:], second.stage_keys[1:])
+        self.assertEqual(second.stage_asts[2].token.column, first.stage_asts[2].token.column + 4)
+        self.assertEqual(second.ast.expression.token.column, 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
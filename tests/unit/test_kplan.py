@@ -0,0 +1,182 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+import pandas as pd
+
+import kira
+import library
+from kira import KContext, KData
+from kira.kdata import kcsv, kplan
+from kira.kdata.kplan import KPlanCsvScan, KPlanFilter, KPlanJoin, KPlanSort, optimize_plan
+from kira.kdata.ktable import KTable
+
+SALES_CSV = os.path.join(os.path.dirname(__file__), "..", "test_files", "shared_data", "sales.csv")
+REGIONS_CSV = os.path.join(os.path.dirname(__file__), "..", "test_files", "shared_data", "regions.csv")
+
+
+class RecordingCsvScan(KPlanCsvScan):
+    """A CSV scan that records what the plan asks the source for."""
+
+    def __init__(self, filepath: str):
+        super().__init__(filepath)
+        self.reads = []
+
+    def read_chunks(self, columns, nrows=None, predicates=(), widened=None):
+        self.reads.append((list(columns), nrows, len(predicates)))
+        return super().read_chunks(columns, nrows, predicates, widened)
+
+
+def evaluate(script: str, **tables):
+    """The value of `_r = script` with `tables` in the context."""
+    ctx = KContext(library.get_library_namespace())
+    for name, table in tables.items():
+        ctx.register_object(KData(name, table))
+    kira.keval_script(f"_r = {script}").eval(ctx)
+    return ctx.get_object("_r")
+
+
+class TestPlanPushdown(unittest.TestCase):
+
+    def test_projection_reads_only_needed_columns(self):
+        scan = RecordingCsvScan(SALES_CSV)
+        evaluate('T |> filter($qty > 1$) |> select(["product", "price"])', T=KTable(scan)).value.value
+        self.assertEqual(scan.reads, [(["product", "qty", "price"], None, 1)])
+
+    def test_head_is_pushed_into_the_reader(self):
+        scan = RecordingCsvScan(SALES_CSV)
+        df = evaluate('T |> select(["id"]) |> head(2)', T=KTable(scan)).value.value
+        self.assertEqual(scan.reads, [(["id"], 2, 0)])
+        self.assertEqual(list(df["id"]), [1, 2])
+
+    def test_predicate_is_moved_below_sort(self):
+        table = evaluate('T |> sort_by("price") |> filter($qty > 1$)', T=KTable(KPlanCsvScan(SALES_CSV))).value
+        chain = optimize_plan(table.plan)
+        self.assertEqual([type(op) for op in chain[1:]], [KPlanFilter, KPlanSort])
+
+    def test_column_of_lazy_table_reads_one_column(self):
+        scan = RecordingCsvScan(SALES_CSV)
+        table = KTable(scan)
+        self.assertEqual(list(table.column("region")), ["north", "south", "north", "east", "south", "north"])
+        self.assertTrue(table.is_lazy)
+        self.assertEqual(scan.reads, [(["region"], None, 0)])
+
+
+class TestPlanParity(unittest.TestCase):
+
+    SCRIPTS = [
+        'T |> select(["product", "qty", "price"]) |> filter($qty > 1$) |> sort_by("price")',
+        'T |> sort_by("qty", false) |> filter($region == "north"$) |> head(2)',
+        'T |> rename_column("region", "area") |> remove_columns(["day"]) |> tail(3)',
+        'T |> filter([true, false, true, false, true, false])',
+        'T |> filter($price > mean(price)$)',
+    ]
+
+    def test_lazy_and_eager_tables_agree(self):
+        eager = evaluate(f'load_csv("{SALES_CSV}")').value
+        for script in self.SCRIPTS:
+            with self.subTest(script=script):
+                lazy_df = evaluate(script, T=KTable(KPlanCsvScan(SALES_CSV))).value.value
+                eager_df = evaluate(script, T=eager).value.value
+                pd.testing.assert_frame_equal(lazy_df, eager_df)
+
+
+class TestSpilledSort(unittest.TestCase):
+
+    def test_merged_runs_match_a_sort_in_bounded_chunks(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"k": pd.array(rng.integers(0, 5, 50), dtype="Int64"), "i": np.arange(50)})
+        df.loc[[3, 17, 40], "k"] = pd.NA
+        chunks = [df.iloc[start:start + 7] for start in range(0, len(df), 7)]
+        for ascending in (True, False):
+            with self.subTest(ascending=ascending), \
+                    mock.patch.object(kplan, "PLAN_SPILL_ROWS", 10), mock.patch.object(kplan, "PLAN_MERGE_ROWS", 3):
+                out = list(KPlanSort(None, ["k"], ascending).stream(iter(chunks)))
+                expected = df.sort_values("k", ascending=ascending, kind="stable")
+                self.assertEqual(pd.concat(out).index.tolist(), expected.index.tolist())
+                # 5 runs, one piece of 3 rows each
+                self.assertLessEqual(max(len(chunk) for chunk in out), 15)
+
+    def test_streamed_plan_sorts_as_the_eager_table(self):
+        with mock.patch.object(kplan, "PLAN_STREAM_MIN_BYTES", 0), mock.patch.object(kcsv, "CSV_CHUNK_ROWS", 2), \
+                mock.patch.object(kplan, "PLAN_SPILL_ROWS", 2), mock.patch.object(kplan, "PLAN_MERGE_ROWS", 1):
+            lazy_df = evaluate('T |> sort_by(["price", "id"], false)', T=KTable(KPlanCsvScan(SALES_CSV))).value.value
+        self.assertEqual(list(lazy_df["id"]), [6, 5, 3, 2, 4, 1])
+
+
+class TestStreamedJoin(unittest.TestCase):
+
+    SCRIPTS = [
+        'join(T, R, "region")',
+        'join(T, R, "region", "left") |> filter($qty > 1$) |> select(["id", "manager", "price_df1", "price_df2"])',
+        'join(T, R, "region") |> sort_by("price_df2") |> head(3)',
+        'join(T |> filter($price > 1.5$), R, ["region"], "left") |> tail(2)',
+    ]
+    # qty is left out: streamed chunks infer its type from their first rows
+    SPILLED = 'join(T, R, "region", "left") |> sort_by(["price_df2", "id"], false) |> remove_columns(["qty"])'
+
+    def setUp(self):
+        regions = evaluate(f'load_csv("{REGIONS_CSV}")').value.value
+        # price is in both tables: suffixed in the output
+        self.regions = KTable(regions.assign(price=[1.0, 2.0, 3.0]))
+        self.eager = evaluate(f'load_csv("{SALES_CSV}")').value
+
+    def test_lazy_join_extends_the_plan_and_agrees_with_the_eager_join(self):
+        for script in self.SCRIPTS:
+            with self.subTest(script=script):
+                lazy = evaluate(script, T=KTable(KPlanCsvScan(SALES_CSV)), R=self.regions).value
+                self.assertTrue(lazy.is_lazy)
+                self.assertTrue(any(isinstance(op, KPlanJoin) for op in optimize_plan(lazy.plan)))
+                eager_df = evaluate(script, T=self.eager, R=self.regions).value.value
+                pd.testing.assert_frame_equal(lazy.value, eager_df)
+
+    def test_join_over_the_spill_threshold_streams_its_input(self):
+        apply = KPlanJoin.apply
+        with mock.patch.object(kplan, "PLAN_STREAM_MIN_BYTES", 0), mock.patch.object(kcsv, "CSV_CHUNK_ROWS", 2), \
+                mock.patch.object(kplan, "PLAN_SPILL_ROWS", 2), mock.patch.object(kplan, "PLAN_MERGE_ROWS", 1), \
+                mock.patch.object(KPlanJoin, "apply", autospec=True, side_effect=apply) as spy:
+            table = KTable(KPlanCsvScan(SALES_CSV))
+            lazy_df = evaluate(self.SPILLED, T=table, R=self.regions).value.value
+        # The join sees the chunks of the source, never the whole table
+        chunk_rows = [len(call.args[1]) for call in spy.call_args_list]
+        self.assertEqual(sum(chunk_rows), 6)
+        self.assertLessEqual(max(chunk_rows), 2)
+        self.assertTrue(table.is_lazy)
+        eager_df = evaluate(self.SPILLED, T=self.eager, R=self.regions).value.value
+        pd.testing.assert_frame_equal(lazy_df, eager_df)
+
+
+class TestPlanErrors(unittest.TestCase):
+
+    def test_mask_of_wrong_length(self):
+        res = evaluate('filter(T, [true])', T=KTable(KPlanCsvScan(SALES_CSV)))
+        self.assertFalse(res)
+        self.assertIn("same length", repr(res.error))
+
+    def test_formula_that_is_not_boolean(self):
+        res = evaluate('filter(T, $qty + 1$)', T=KTable(KPlanCsvScan(SALES_CSV)))
+        self.assertFalse(res)
+        self.assertIn("array of booleans", repr(res.error))
+
+    def test_mask_after_a_deferred_sort(self):
+        eager = evaluate(f'load_csv("{SALES_CSV}")').value
+        res = evaluate('filter(sort_by(T, "price"), [true, false])', T=eager)
+        self.assertFalse(res)
+        self.assertIn("same length", repr(res.error))
+        # The length of the table is known: the mask is checked without sorting it
+        self.assertTrue(evaluate('filter(nsmallest(sort_by(T, "id"), 3, "price"), [true, false, true])', T=eager).value.is_lazy)
+
+    def test_plan_failing_when_read_gives_an_error_value(self):
+        # A mask added to the plan directly is only checked when the plan runs
+        table = KTable(KPlanCsvScan(SALES_CSV).filter([True, False]))
+        res = evaluate('nrows(T)', T=table)
+        self.assertFalse(res)
+        self.assertIn("same length", repr(res.error))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import unittest
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from library import get_library_namespace
+from kproject.kevent import KEvent, KEventTypes
+from kproject.kpersistence_manager import KPersistenceManager
+from kproject.kproject import KProject
+from kproject.kstatus_bus import KVariableStatus
+
+
+def add_variable(project: KProject, name: str, code: str):
+    project.process_event(KEvent(author="test", timestamp=datetime.now(), type=KEventTypes.AddVariable,
+                                 target=name, body=code))
+
+
+def wait_until_idle(project: KProject, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if all(status not in (KVariableStatus.WAITING, KVariableStatus.PROCESSING)
+               for status in project.get_all_statuses().values()):
+            return
+        time.sleep(0.01)
+    raise TimeoutError(f"Evaluation did not finish: {project.get_all_statuses()}")
+
+
+def snapshot(project: KProject) -> tuple[dict, dict]:
+    """The user objects of the project's root context and its variable states."""
+    objects = {obj.name: obj.value.value for obj in project.context.local_objects()}
+    variables = {name: (state.code, state.dependencies, state.kobject.name)
+                 for name, state in project.state_manager.variables.items()}
+    return objects, variables
+
+
+class TestProjectUndo(unittest.TestCase):
+
+    def setUp(self):
+        self.project = KProject(KPersistenceManager())
+        self.addCleanup(lambda: self.project.evaluator.stop())
+
+    def test_undo_of_a_redefinition_restores_the_previous_state(self):
+        namespace = get_library_namespace()
+        library_objects = dict(namespace._objects)
+        add_variable(self.project, "a", "a = 2")
+        add_variable(self.project, "b", "b = a * 3")
+        wait_until_idle(self.project)
+        before = snapshot(self.project)
+        self.assertEqual(before[0]["b"], 6)
+
+        add_variable(self.project, "a", "a = 10")
+        wait_until_idle(self.project)
+        self.assertEqual(self.project.get_value("b").value.value, 30)
+
+        self.project.undo()
+        wait_until_idle(self.project)
+        self.assertEqual(snapshot(self.project), before)
+        self.assertEqual(self.project.state_manager.variables["a"].code, "a = 2")
+
+        # The libraries are shared, not copied into the new root context
+        self.assertIs(self.project.context.parent, namespace)
+        self.assertEqual(dict(namespace._objects), library_objects)
+        self.assertNotIn("a", namespace._objects)
+
+    def test_redo_after_undo_reapplies_the_redefinition(self):
+        add_variable(self.project, "a", "a = 2")
+        add_variable(self.project, "a", "a = 10")
+        wait_until_idle(self.project)
+        after = snapshot(self.project)
+
+        self.project.undo()
+        self.project.redo()
+        wait_until_idle(self.project)
+        self.assertEqual(snapshot(self.project), after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import marshal
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import closing
+from datetime import datetime
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import kira
+from kira import kbuild_assignment, kparse_cached, KData
+from kira.klanguage import kserializer
+from kira.klanguage.kserializer import kdump_program, kload_program
+from kira.knodes.knode_instance import KNodeInstance
+from kproject import kstate_manager
+from kproject.kevent import KEvent, KEventTypes
+from kproject.kpersistence_manager import KPersistenceManager
+from kproject.kproject import KProject
+from kproject.kstatus_bus import KVariableStatus
+
+SIGNATURE = "signature"
+
+
+def build(src: str):
+    return kbuild_assignment(kparse_cached(src))
+
+
+def round_trip(obj, symbols=frozenset()):
+    return kload_program(kdump_program(obj, set(symbols), SIGNATURE), SIGNATURE)
+
+
+def add_variable(project: KProject, name: str, code: str):
+    project.process_event(KEvent(author="test", timestamp=datetime.now(), type=KEventTypes.AddVariable,
+                                 target=name, body=code))
+
+
+def wait_until_idle(project: KProject, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if all(status not in (KVariableStatus.WAITING, KVariableStatus.PROCESSING)
+               for status in project.get_all_statuses().values()):
+            return
+        time.sleep(0.01)
+    raise TimeoutError(f"Evaluation did not finish: {project.get_all_statuses()}")
+
+
+class TestProgramSerializer(unittest.TestCase):
+
+    def test_values_round_trip(self):
+        for src in ['a = 1', 'a = 2.5', 'a = "hi"', 'a = true', 'a = [1, 2, 3]', 'a = [1.5, 2]',
+                    'a = ["x", "y"]', 'a = []']:
+            with self.subTest(src=src):
+                obj = build(src)
+                loaded, symbols = round_trip(obj)
+                self.assertIsInstance(loaded, KData)
+                self.assertEqual((loaded.name, symbols), (obj.name, set()))
+                self.assertEqual(str(loaded.value.type), str(obj.value.type))
+                if isinstance(obj.value, kira.KLiteral):
+                    self.assertEqual(loaded.value.lit_type, obj.value.lit_type)
+                    self.assertEqual(loaded.value.value, obj.value.value)
+                else:
+                    self.assertEqual(loaded.value.value.dtype, obj.value.value.dtype)
+                    self.assertEqual(loaded.value.value.tolist(), obj.value.value.tolist())
+
+    def test_nodes_round_trip_unresolved(self):
+        obj = build('b = load_csv("x.csv") |> head(3) |> filter($x > k$)')
+        loaded, symbols = round_trip(obj, {"k", "x"})
+        self.assertEqual(symbols, {"k", "x"})
+        self.assertEqual(kserializer._encode(loaded), kserializer._encode(obj))
+        # Library nodes are stored by name and looked up when evaluated
+        self.assertIsInstance(loaded, KNodeInstance)
+        self.assertEqual(loaded.target_name, "filter")
+        self.assertIsNone(loaded._node)
+
+    def test_header_mismatch_is_a_miss(self):
+        blob = kdump_program(build("a = 1"), set(), SIGNATURE)
+        self.assertIsNone(kload_program(blob, "other signature"))
+        with mock.patch.object(kserializer, "KPROGRAM_FORMAT", kserializer.KPROGRAM_FORMAT + 1):
+            self.assertIsNone(kload_program(blob, SIGNATURE))
+        with mock.patch.object(kira, "__version__", kira.__version__ + ".dev"):
+            self.assertIsNone(kload_program(blob, SIGNATURE))
+        with mock.patch.object(kserializer.sys, "version_info", (3, 0, 0)):
+            self.assertIsNone(kload_program(blob, SIGNATURE))
+        self.assertIsNotNone(kload_program(blob, SIGNATURE))
+
+    def test_corrupt_blob_is_a_miss(self):
+        blob = kdump_program(build("a = f(1, [2, 3])"), {"f"}, SIGNATURE)
+        header = kserializer._header(SIGNATURE)
+        for corrupt in [b"", b"KPR", blob[:len(blob) // 2], blob[4:], b"KPRG\xff\x00garbage",
+                        b"KPRG" + marshal.dumps((header, (), ("a", 99))),
+                        b"KPRG" + marshal.dumps((header, (), ("a",)))]:
+            with self.subTest(corrupt=corrupt[:20]):
+                self.assertIsNone(kload_program(corrupt, SIGNATURE))
+
+
+class TestProgramCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "project.kira")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def open(self) -> KProject:
+        project = KProject(KPersistenceManager(self.path))
+        self.addCleanup(project.persistence_manager.close)
+        self.addCleanup(project.evaluator.stop)
+        return project
+
+    def test_event_and_program_are_committed_together(self):
+        project = self.open()
+        conn = project.persistence_manager._KPersistenceManager__conn
+        with mock.patch.object(project.persistence_manager, "_KPersistenceManager__conn", wraps=conn) as spy:
+            add_variable(project, "a", "a = 1 + 2")
+        self.assertEqual(spy.commit.call_count, 1)
+
+        # A second connection sees both
+        with closing(sqlite3.connect(self.path)) as other:
+            self.assertEqual(other.execute("SELECT COUNT(*) FROM events").fetchone()[0], 1)
+            self.assertEqual(other.execute("SELECT COUNT(*) FROM kprogram_storage").fetchone()[0], 1)
+
+    def test_reopening_a_project_loads_the_programs(self):
+        project = self.open()
+        add_variable(project, "a", "a = 1 + 2")
+        add_variable(project, "b", "b = a * 4")
+        wait_until_idle(project)
+        self.assertEqual(project.get_value("b").value.value, 12)
+        project.evaluator.stop()
+        project.persistence_manager.close()
+
+        with mock.patch.object(kstate_manager, "kparse_cached") as kparse:
+            reopened = self.open()
+            wait_until_idle(reopened)
+        kparse.assert_not_called()
+        variables = reopened.state_manager.variables
+        self.assertEqual((variables["a"].ast, variables["b"].ast), (None, None))
+        self.assertEqual(variables["b"].dependencies, {"a"})
+        self.assertEqual(reopened.get_value("b").value.value, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
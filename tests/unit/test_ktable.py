@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+import pandas as pd
+
+import kira
+import library
+from kira import KContext, KData
+from kira.kdata import ktable
+from kira.kdata.ktable import KTable, derived_frame
+
+
+def evaluate(script: str, **tables):
+    """The value of `_r = script` with `tables` in the context."""
+    ctx = KContext(library.get_library_namespace())
+    for name, table in tables.items():
+        ctx.register_object(KData(name, table))
+    kira.keval_script(f"_r = {script}").eval(ctx)
+    return ctx.get_object("_r").value
+
+
+class TestDerivedTables(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = KTable(pd.DataFrame({"a": pd.array([1, 2, 3], dtype="Int64"),
+                                           "b": pd.array(["x", "y", "z"], dtype="string")}))
+        self.before = self.parent.value.copy(deep=True)
+
+    def assert_parent_unchanged(self):
+        pd.testing.assert_frame_equal(self.parent.value, self.before)
+
+    def test_add_column_and_rename_leave_the_parent_unchanged(self):
+        derived = evaluate('add_column(P, "c", [7, 8, 9])', P=self.parent)
+        derived_before = derived.value.copy(deep=True)
+        for script in ['add_column(D, "a", [0, 0, 0])', 'rename_column(D, "a", "n")',
+                       'rename_column(D, "b", "a") |> add_column("b", [true, false, true])']:
+            with self.subTest(script=script):
+                child = evaluate(script, D=derived)
+                # Written in place, as a function that does not copy would
+                child.value.iloc[0, 0] = 100
+                self.assert_parent_unchanged()
+                pd.testing.assert_frame_equal(derived.value, derived_before)
+        self.assertEqual(list(self.parent.value.columns), ["a", "b"])
+
+    def test_without_copy_on_write_derived_frames_are_copies(self):
+        with mock.patch.object(ktable, "_PANDAS_MAJOR", 2), mock.patch.object(pd, "get_option", return_value=False):
+            df = derived_frame(self.parent.value)
+        self.assertFalse(np.shares_memory(df["a"].array._data, self.parent.value["a"].array._data))
+        df.iloc[0, 0] = 100
+        self.assert_parent_unchanged()
+
+    def test_importing_kira_leaves_the_pandas_options_alone(self):
+        if ktable._PANDAS_MAJOR >= 3:
+            self.skipTest("copy-on-write cannot be turned off since pandas 3")
+        self.assertNotEqual(pd.get_option("mode.copy_on_write"), True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from kira.klanguage.ktokenizer import KTokenType, ktokenize
+
+# Sources and their tokens (whitespace left out) as given by the character-by-character
+# tokenizer the regex scanner replaced
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "tokenizer_corpus.json")
+
+
+def kinds(src: str) -> list[tuple[str, KTokenType]]:
+    return [(token.sym_str, token.token_type) for token in ktokenize(src)]
+
+
+class TestTokenizer(unittest.TestCase):
+
+    def test_kinds_and_positions_over_lines(self):
+        tokens = ktokenize('x = load(\n  "a", 2) # note\ny |> f')
+        self.assertEqual([(t.sym_str, t.token_type, t.line, t.column) for t in tokens], [
+            ("x", KTokenType.SYMBOL, 1, 1),
+            ("=", KTokenType.ASSIGN, 1, 3),
+            ("load", KTokenType.SYMBOL, 1, 5),
+            ("(", KTokenType.OPEN_BRACKET, 1, 9),
+            ("\n", KTokenType.END_LINE, 1, 10),
+            ("a", KTokenType.STRING, 2, 3),
+            (",", KTokenType.COMMA, 2, 6),
+            ("2", KTokenType.NUMBER, 2, 8),
+            (")", KTokenType.CLOSE_BRACKET, 2, 9),
+            ("\n", KTokenType.END_LINE, 2, 17),
+            ("y", KTokenType.SYMBOL, 3, 1),
+            ("|>", KTokenType.PIPE, 3, 3),
+            ("f", KTokenType.SYMBOL, 3, 6),
+        ])
+
+    def test_position_after_a_string_over_lines(self):
+        tokens = ktokenize('s = "a\nbc" + 1')
+        self.assertEqual((tokens[2].sym_str, tokens[2].line, tokens[2].column), ("a\nbc", 1, 5))
+        self.assertEqual((tokens[3].line, tokens[3].column), (2, 5))
+
+    def test_strings_keep_backslashes(self):
+        # No escape sequences: the text between the quotes is kept as written
+        self.assertEqual(kinds(r'"a\nb"'), [(r"a\nb", KTokenType.STRING)])
+        self.assertEqual(kinds(r'"a\"'), [("a\\", KTokenType.STRING)])
+        self.assertEqual(kinds("'say \"hi\"'"), [('say "hi"', KTokenType.STRING)])
+        self.assertEqual(kinds('"it\'s"'), [("it's", KTokenType.STRING)])
+
+    def test_numbers(self):
+        for src in ["1", "1.5", ".5", "1e3", "1.5E-2", "2e+3", "3."]:
+            with self.subTest(src=src):
+                self.assertEqual(kinds(src), [(src, KTokenType.NUMBER)])
+        # An exponent without digits is not part of the number
+        self.assertEqual(kinds("2e"), [("2", KTokenType.NUMBER), ("e", KTokenType.SYMBOL)])
+        self.assertEqual(kinds("a.b"), [("a", KTokenType.SYMBOL), (".", KTokenType.DOT), ("b", KTokenType.SYMBOL)])
+
+    def test_unknown_character(self):
+        with self.assertRaisesRegex(SyntaxError, r"Unexpected character '@' at index 10 \(line 2, column 5\)"):
+            ktokenize("x = 1\ny = @")
+        with self.assertRaisesRegex(SyntaxError, r"'\|' at index 2 \(line 1, column 3\)"):
+            ktokenize("a | b")
+        with self.assertRaisesRegex(SyntaxError, r"Unterminated string literal at 4 \(line 1, column 5\)"):
+            ktokenize('s = "abc')
+
+    def test_corpus_matches_the_previous_tokenizer(self):
+        with open(CORPUS, encoding="utf-8") as f:
+            corpus = json.load(f)
+        for i, entry in enumerate(corpus):
+            with self.subTest(entry=i):
+                self.assertEqual([[text, kind.name] for text, kind in kinds(entry["source"])], entry["tokens"])
+
+
+if __name__ == "__main__":
+    unittest.main()
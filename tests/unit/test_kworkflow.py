@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import kira
+import library
+from kira import KContext
+from kira.knodes.kworkflow import KWorkflow
+
+
+def define(ctx: KContext, script: str) -> KWorkflow:
+    workflow = kira.keval_script(script)
+    ctx.register_object(workflow)
+    return workflow
+
+
+def waves(workflow: KWorkflow) -> list[list[str]]:
+    return [[node.name for node in wave] for wave in workflow._waves]
+
+
+class TestWorkflowWaves(unittest.TestCase):
+
+    def setUp(self):
+        self.ctx = KContext(library.get_library_namespace())
+        define(self.ctx, "workflow double(x) -> y: y = x * 2 return y")
+        define(self.ctx, "workflow inc(x) -> y: y = x + 1 return y")
+
+    def test_independent_branches_share_a_wave(self):
+        workflow = define(self.ctx, "workflow w(x) -> z: a = x * 2 b = x + 1 z = inc(double(a + b)) return z")
+        self.assertEqual(waves(workflow), [["a", "b"], ["z"]])
+
+        kira.keval_script("r = w(5)").eval(self.ctx)
+        self.assertEqual(self.ctx.get_object("r").value.value, 33)
+
+    def test_nested_call_of_a_local_name(self):
+        # `g` is called inside the arguments of inc: it is read before it is written below
+        workflow = define(self.ctx, "workflow w(x) -> z: z = inc(g(x)) g = x + 1 return z")
+        self.assertEqual(waves(workflow), [["z"], ["g"]])
+
+    def test_nested_read_in_a_formula(self):
+        workflow = define(self.ctx, "workflow w(t) -> z: k = 2 z = filter(t, $a > double(k)$) return z")
+        self.assertEqual(waves(workflow), [["k"], ["z"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
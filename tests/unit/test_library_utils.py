@@ -0,0 +1,92 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import pandas as pd
+
+import kira
+import library
+from kira import KContext, KData, KLiteral, KLiteralType, K_INTEGER_TYPE
+from kira.core import kexecutor
+from kira.kdata.karray import KArray, K_ARRAY_TYPE
+from kira.kdata.ktable import KTable
+from kira.knodes.kfunction import kfunction
+from kira.library import library_utils
+
+
+# Not vectorizable: map and group_apply call them once per element or group
+@kfunction(inputs=[("x", K_INTEGER_TYPE)], outputs=[("y", K_INTEGER_TYPE)], name="square",
+           use_values=True, use_context=False)
+def k_square(x_obj):
+    return [KLiteral(int(x_obj.value) ** 2, KLiteralType.INTEGER)]
+
+
+@kfunction(inputs=[("x", K_ARRAY_TYPE)], outputs=[("y", K_INTEGER_TYPE)], name="spread",
+           use_values=True, use_context=False)
+def k_spread(x_obj):
+    return [KLiteral(int(x_obj.value.max() - x_obj.value.min()), KLiteralType.INTEGER)]
+
+
+@kfunction(inputs=[("x", K_INTEGER_TYPE)], outputs=[("y", K_INTEGER_TYPE)], name="fail_on_three",
+           use_values=True, use_context=False)
+def k_fail_on_three(x_obj):
+    if x_obj.value == 3:
+        raise RuntimeError("three")
+    return [x_obj]
+
+
+def evaluate(script: str, cpus: int, **values):
+    """The value of `_r = script` when the machine has `cpus` cores."""
+    ctx = KContext(library.get_library_namespace())
+    for node in (k_square, k_spread, k_fail_on_three):
+        ctx.register_object(node)
+    for name, value in values.items():
+        ctx.register_object(KData(name, value))
+    with mock.patch.object(library_utils.os, "cpu_count", return_value=cpus):
+        kira.keval_script(f"_r = {script}").eval(ctx)
+    return ctx.get_object("_r")
+
+
+class TestParallelMap(unittest.TestCase):
+
+    def setUp(self):
+        self.values = KArray(pd.Series(pd.array(list(range(40)) + [None, 7], dtype="Int64")))
+        self.table = KTable(pd.DataFrame({"g": pd.array([i % 5 for i in range(40)], dtype="Int64"),
+                                          "v": pd.array([(i * 7) % 11 for i in range(40)], dtype="Int64")}))
+
+    def test_parallel_map_matches_sequential(self):
+        with mock.patch.object(kexecutor, "get_executor", wraps=kexecutor.get_executor) as executor:
+            parallel = evaluate('map(X, "square")', 4, X=self.values).value.value
+        self.assertTrue(executor.called)
+        sequential = evaluate('map(X, "square")', 1, X=self.values).value.value
+        pd.testing.assert_series_equal(parallel, sequential)
+        self.assertEqual(parallel.tolist()[-3:], [39 ** 2, pd.NA, 49])
+
+    def test_parallel_group_apply_matches_sequential(self):
+        parallel = evaluate('group_apply(T, "g", "v", "spread")', 4, T=self.table).value.value
+        sequential = evaluate('group_apply(T, "g", "v", "spread")', 1, T=self.table).value.value
+        pd.testing.assert_frame_equal(parallel, sequential)
+
+    def test_exception_in_a_worker_is_an_error_value(self):
+        for cpus in (1, 4):
+            with self.subTest(cpus=cpus):
+                res = evaluate('map(X, "fail_on_three")', cpus, X=self.values)
+                self.assertFalse(res)
+                self.assertIn("'fail_on_three' failed: three", repr(res.error))
+
+    def test_empty_input_submits_nothing(self):
+        empty = KArray(pd.Series(pd.array([], dtype="Int64")))
+        missing = KArray(pd.Series(pd.array([None, None], dtype="Int64")))
+        empty_table = KTable(self.table.value.iloc[:0])
+        with mock.patch.object(kexecutor, "get_executor") as executor:
+            self.assertEqual(len(evaluate('map(X, "square")', 4, X=empty).value.value), 0)
+            self.assertEqual(len(evaluate('map(X, "square")', 4, X=missing).value.value), 2)
+            self.assertEqual(len(evaluate('group_apply(T, "g", "v", "spread")', 4, T=empty_table).value.value), 0)
+        executor.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()